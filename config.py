@@ -29,13 +29,14 @@ class Config:
     LINKEDIN_EMAIL = os.getenv('LINKEDIN_EMAIL', '')
     LINKEDIN_PASSWORD = os.getenv('LINKEDIN_PASSWORD', '')
 
-    # Job search settings
-    DEFAULT_SEARCH_TERMS = ['AI Engineer', 'Machine Learning Engineer', 'Data Scientist']
-    DEFAULT_LOCATIONS = ['New York, NY', 'San Francisco, CA']
+    # Job search settings (tuples, since they are handed out as shared preference defaults)
+    DEFAULT_SEARCH_TERMS = ('AI Engineer', 'Machine Learning Engineer', 'Data Scientist')
+    DEFAULT_LOCATIONS = ('New York, NY', 'San Francisco, CA')
 
     # Scheduling settings
     DEFAULT_SCHEDULE_TYPE = 'daily'
     DEFAULT_EXECUTION_TIME = '08:00'
+    SCHEDULER_MAX_IDLE_SECONDS = float(os.getenv('SCHEDULER_MAX_IDLE_SECONDS', 60))  # Longest scheduler sleep
 
     # Security settings
     SESSION_TIMEOUT = int(os.getenv('SESSION_TIMEOUT', 3600))  # 1 hour in seconds
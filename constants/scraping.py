@@ -1,5 +1,4 @@
 class ScrapingConstants:
     DEFAULT_JOB_LIMIT = 25
     MAX_JOB_LIMIT = 100  # Safety limit
-    QUERY_DELAY_MIN = 1  # seconds
-    QUERY_DELAY_MAX = 3  # seconds
\ No newline at end of file
+    MAX_PARALLEL_QUERIES = 4  # Scraper workers; each query runs its own Chrome
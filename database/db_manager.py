@@ -16,6 +16,21 @@ class DatabaseManager:
     _instance = None
     _lock = threading.Lock()
 
+    # Per-connection tuning applied when a connection is opened.
+    # WAL lets readers run alongside a writer and, with synchronous=NORMAL,
+    # only fsyncs on checkpoints instead of on every commit.
+    CONNECTION_PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA mmap_size = 268435456",  # 256 MB
+        "PRAGMA cache_size = -65536",  # 64 MB
+    )
+
+    # sqlite3 keeps an LRU cache of prepared statements per connection, keyed by SQL text.
+    # Sized above the default of 128 so every query the services issue stays prepared.
+    STATEMENT_CACHE_SIZE = 256
+
     def __new__(cls) -> Self:
         """Create singleton instance"""
         with cls._lock:
@@ -34,6 +49,10 @@ class DatabaseManager:
         if self.db_path == ':memory:':
             self.connection_string = 'file::memory:?cache=shared'
             self.use_uri = True
+        elif self.db_path.startswith('file:'):
+            # SQLite URI, e.g. a named shared-cache in-memory database
+            self.connection_string = self.db_path
+            self.use_uri = True
         else:
             # Regular file-based database
             self.connection_string = self.db_path
@@ -53,17 +72,27 @@ class DatabaseManager:
         """
         thread_id = threading.get_ident()
 
+        # Fast path: this thread already has a connection, no need to take the lock
+        conn = self.connection_pool.get(thread_id)
+        if conn is not None:
+            return conn
+
         with self.pool_lock:
             if thread_id not in self.connection_pool:
                 # Create new connection with row factory for dictionary results
                 conn = sqlite3.connect(self.connection_string,
                                       uri=self.use_uri,
-                                      check_same_thread=False)
+                                      check_same_thread=False,
+                                      cached_statements=self.STATEMENT_CACHE_SIZE)
                 conn.row_factory = sqlite3.Row
 
                 # Enable foreign keys
                 conn.execute("PRAGMA foreign_keys = ON")
 
+                # Apply performance settings
+                for pragma in self.CONNECTION_PRAGMAS:
+                    conn.execute(pragma)
+
                 self.connection_pool[thread_id] = conn
 
             return self.connection_pool[thread_id]
@@ -105,6 +134,16 @@ class DatabaseManager:
             cursor = conn.execute(query, params)
             return cursor.lastrowid
 
+    def execute_returning(self, query: str, params: tuple = ()) -> Optional[Dict[str, Any]]:
+        """
+        Execute an INSERT, UPDATE, or DELETE query with a RETURNING clause and
+        return the first returned row as a dictionary, or None if no row was affected.
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute(query, params)
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
     def execute_many(self, query: str, params_list: List[tuple]) -> None:
         """
         Execute multiple INSERT, UPDATE, or DELETE queries with different parameters.
@@ -3,6 +3,11 @@ import json
 import datetime
 from typing import Dict, Any, List, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library
+    orjson = None
+
 
 class Users:
     """Users table for authentication and user management"""
@@ -40,11 +45,19 @@ class UserPreferences:
     @staticmethod
     def json_serialize(value: Any) -> str:
         """Convert a value to JSON string for storage"""
-        return json.dumps(value)
+        if orjson is not None:
+            try:
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+            except TypeError:
+                # Values orjson can't encode (e.g. integers wider than 64 bits)
+                pass
+        return json.dumps(value, separators=(',', ':'))
 
     @staticmethod
     def json_deserialize(value: str) -> Any:
         """Convert a JSON string from storage to Python object"""
+        if orjson is not None:
+            return orjson.loads(value)
         return json.loads(value)
 
 
@@ -187,7 +200,11 @@ def create_all_tables(conn: sqlite3.Connection) -> None:
     cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_job_states_state ON {JobStates.TABLE_NAME}(state);")
     cursor.execute(
         f"CREATE INDEX IF NOT EXISTS idx_job_analysis_job_id_user_id ON {JobAnalysis.TABLE_NAME}(job_id, user_id);")
+    # Covering index so preference lookups by user/category/name are answered from the index alone.
+    # It also serves (user_id, category) lookups, so the narrower index it replaced is dropped
+    cursor.execute("DROP INDEX IF EXISTS idx_user_preferences_user_id_category;")
     cursor.execute(
-        f"CREATE INDEX IF NOT EXISTS idx_user_preferences_user_id_category ON {UserPreferences.TABLE_NAME}(user_id, category);")
+        f"CREATE INDEX IF NOT EXISTS idx_user_preferences_user_id_category_name_value "
+        f"ON {UserPreferences.TABLE_NAME}(user_id, category, name, value);")
 
     conn.commit()
\ No newline at end of file
@@ -95,6 +95,24 @@ class DatabaseService:
         """
         return self.db_manager.get_one(query, (job_id,))
 
+    def get_recent_job_ids(self, limit: int) -> List[str]:
+        """
+        Get the job_ids of the most recently scraped job listings.
+
+        Args:
+            limit: Maximum number of job_ids to return
+
+        Returns:
+            job_ids: List of job_ids, newest first
+        """
+        query = f"""
+        SELECT job_id
+        FROM {JobListings.TABLE_NAME}
+        ORDER BY scraped_at DESC
+        LIMIT ?
+        """
+        return [row['job_id'] for row in self.db_manager.execute_query(query, (limit,))]
+
     def get_jobs_by_state(self, user_id: int, state: str, limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
         """
         Get job listings by their current state for a specific user.
@@ -180,6 +198,119 @@ class DatabaseService:
 
         return self.db_manager.execute_write(query, (job_id, user_id, state, notes, now))
 
+    def add_job_state_returning(self, job_id: str, user_id: int, state: str,
+                                notes: str = None) -> Dict[str, Any]:
+        """
+        Add a new job state record and return the stored row.
+
+        Uses INSERT ... RETURNING so callers that need the new current state
+        don't have to read it back with a second query.
+
+        Args:
+            job_id: The job's LinkedIn ID
+            user_id: The user's ID
+            state: The job state
+            notes: Optional notes
+
+        Returns:
+            state_record: The new state record
+
+        Raises:
+            ValueError: If state is not valid
+        """
+        # Validate state
+        if state not in JobStates.VALID_STATES:
+            raise ValueError(f"Invalid state: {state}")
+
+        query = f"""
+        INSERT INTO {JobStates.TABLE_NAME} (job_id, user_id, state, notes, state_timestamp)
+        VALUES (?, ?, ?, ?, ?)
+        RETURNING *
+        """
+        now = datetime.datetime.now()
+
+        return self.db_manager.execute_returning(query, (job_id, user_id, state, notes, now))
+
+    def add_job_states(self, states: List[Tuple[str, int, str, Optional[str], datetime.datetime]]) -> None:
+        """
+        Add several job state records in one transaction.
+
+        Args:
+            states: List of (job_id, user_id, state, notes, state_timestamp) tuples
+
+        Raises:
+            ValueError: If any state is not valid
+        """
+        if not states:
+            return
+
+        # Validate states
+        for _, _, state, _, _ in states:
+            if state not in JobStates.VALID_STATES:
+                raise ValueError(f"Invalid state: {state}")
+
+        query = f"""
+        INSERT INTO {JobStates.TABLE_NAME} (job_id, user_id, state, notes, state_timestamp)
+        VALUES (?, ?, ?, ?, ?)
+        """
+
+        self.db_manager.execute_many(query, states)
+
+    def add_scraped_job(self, job_data: Dict[str, Any], user_id: int, is_new: bool) -> None:
+        """
+        Record a scraped job for a user in one transaction.
+
+        Inserts the listing when the job is new, then queues the job for
+        analysis by adding the new_scraped and queued_for_analysis states.
+
+        Args:
+            job_data: Dictionary containing job listing data
+                Required keys: job_id, title, company, url
+                Optional keys: location, description, source_term
+            user_id: The user's ID
+            is_new: Whether the job listing still has to be inserted
+
+        Raises:
+            ValueError: If required fields are missing
+        """
+        # Validate required fields
+        required_fields = {'job_id', 'title', 'company', 'url'}
+        missing_fields = required_fields - set(job_data.keys())
+        if missing_fields:
+            raise ValueError(f"Missing required fields: {', '.join(missing_fields)}")
+
+        job_id = job_data['job_id']
+        now = datetime.datetime.now()
+        # The queued state must sort after new_scraped even on a coarse clock
+        states = [
+            (job_id, user_id, JobStates.STATE_NEW_SCRAPED, None, now),
+            (job_id, user_id, JobStates.STATE_QUEUED_FOR_ANALYSIS, None,
+             now + datetime.timedelta(microseconds=1))
+        ]
+
+        with self.db_manager.transaction() as conn:
+            if is_new:
+                conn.execute(f"""
+                INSERT INTO {JobListings.TABLE_NAME}
+                    (job_id, title, company, location, description, url, source_term, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (job_id) DO NOTHING
+                """, (
+                    job_id,
+                    job_data['title'],
+                    job_data['company'],
+                    job_data.get('location', ''),
+                    job_data.get('description', ''),
+                    job_data['url'],
+                    job_data.get('source_term', ''),
+                    now
+                ))
+
+            conn.executemany(f"""
+            INSERT INTO {JobStates.TABLE_NAME} (job_id, user_id, state, notes, state_timestamp)
+            VALUES (?, ?, ?, ?, ?)
+            """, states)
+
     def get_job_state_history(self, job_id: str, user_id: int) -> List[Dict[str, Any]]:
         """
         Get the state history for a job.
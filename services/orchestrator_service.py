@@ -3,11 +3,14 @@ Orchestration service for coordinating workflow between components.
 This module provides high-level methods for common workflows and operations.
 """
 
+import datetime
 import logging
-from typing import Dict, List, Any, Optional, Callable
+import queue
+from typing import Dict, List, Any, Optional, Callable, Tuple
 import threading
 import time
 
+from database.models import JobStates
 from utils.factories import AnalysisServiceFactory
 from services.user_service import UserService
 from services.database_service import DatabaseService
@@ -19,6 +22,71 @@ from services.scheduler_service import SchedulerService
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Queued after the last deferred state write to stop the writer thread
+_STOP_WRITER = object()
+
+
+def _build_search_sql(has_query: bool, num_states: int) -> Tuple[str, str]:
+    """
+    Build the count and paginated SQL for a search_jobs call shape.
+
+    Args:
+        has_query: Whether a free-text search condition is included
+        num_states: Number of states in the state filter (0 for no filter)
+
+    Returns:
+        count_query, page_query: SQL for the total count and for one page of results
+    """
+    # Set up base query
+    sql_query = """
+        SELECT j.*, s.state, s.state_timestamp
+        FROM job_listings j
+        JOIN job_states s ON j.job_id = s.job_id
+        WHERE s.user_id = ?
+        """
+
+    # Add search condition if query is provided
+    if has_query:
+        sql_query += """
+            AND (
+                j.title LIKE ? OR 
+                j.company LIKE ? OR 
+                j.description LIKE ? OR
+                j.location LIKE ?
+            )
+            """
+
+    # Add state filter if provided
+    if num_states > 0:
+        placeholders = ', '.join(['?'] * num_states)
+        sql_query += f" AND s.state IN ({placeholders})"
+
+    # Add grouping and ordering
+    sql_query += """
+        GROUP BY j.job_id  -- Get only the latest state for each job
+        ORDER BY s.state_timestamp DESC
+        """
+
+    count_query = f"SELECT COUNT(*) as count FROM ({sql_query})"
+    return count_query, sql_query + "LIMIT ? OFFSET ?"
+
+
+# search_jobs SQL for every (has_query, num_states) shape, built once so repeated
+# searches reuse identical statement text and hit sqlite3's statement cache
+_SEARCH_SQL = {
+    (has_query, num_states): _build_search_sql(has_query, num_states)
+    for has_query in (False, True)
+    for num_states in range(len(JobStates.VALID_STATES) + 1)
+}
+
+
+def _get_search_sql(has_query: bool, num_states: int) -> Tuple[str, str]:
+    """Return the prebuilt search SQL for a call shape, building it for unusual shapes."""
+    sql = _SEARCH_SQL.get((has_query, num_states))
+    if sql is None:
+        sql = _build_search_sql(has_query, num_states)
+    return sql
+
 
 class OrchestratorService:
     """
@@ -27,6 +95,12 @@ class OrchestratorService:
     from multiple services to implement common workflows.
     """
 
+    # Deferred state writes are flushed in batches of at most this many rows
+    STATE_WRITE_BATCH_SIZE = 50
+
+    # Seconds the state writer waits for more writes before flushing a batch
+    STATE_WRITE_FLUSH_INTERVAL = 0.1
+
     def __init__(self):
         """Initialize the orchestrator with all required services."""
         self.user_service = UserService()
@@ -36,6 +110,12 @@ class OrchestratorService:
         self.analysis_service = AnalysisServiceFactory.create_analysis_service()
         self.scheduler_service = SchedulerService()
 
+        # Job state writes deferred off the request path (e.g. marking jobs as viewed)
+        self._write_queue = queue.Queue()
+        self._writer_stopped = False
+        self._writer_thread = threading.Thread(target=self._state_writer_loop, daemon=True)
+        self._writer_thread.start()
+
         # Start scheduler
         self.scheduler_service.start()
 
@@ -96,6 +176,10 @@ class OrchestratorService:
         for category, prefs in preferences.items():
             self.pref_service.update_preference_category(user_id, category, prefs)
 
+        # Make the next scrape read the new preferences instead of a cached copy
+        self.scraper_service.invalidate_preferences(user_id)
+        self.scheduler_service.scraper_service.invalidate_preferences(user_id)
+
         # If scheduling preferences were updated, refresh the scheduler
         if 'scheduling' in preferences:
             schedule_prefs = preferences['scheduling']
@@ -183,9 +267,16 @@ class OrchestratorService:
         # Get current state
         current_state = self.db_service.get_current_job_state(job_id, user_id)
 
-        # Mark job as viewed if not already
+        # Mark job as viewed if not already; the write is queued so the request
+        # doesn't wait on it, and is timestamped now to keep state ordering
         if current_state and current_state["state"] in ["relevant", "saved"]:
-            self.db_service.add_job_state(job_id, user_id, "viewed")
+            if self._writer_stopped:
+                # Nothing drains the queue once the writer is stopped
+                self.db_service.add_job_state(job_id, user_id, "viewed")
+            else:
+                self._write_queue.put_nowait(
+                    (job_id, user_id, "viewed", None, datetime.datetime.now())
+                )
 
         return {
             "job": job,
@@ -194,6 +285,46 @@ class OrchestratorService:
             "current_state": current_state
         }
 
+    def _state_writer_loop(self) -> None:
+        """Drain the deferred state write queue, writing each batch with one executemany, until stopped."""
+        stopping = False
+        while not stopping:
+            write = self._write_queue.get()
+            if write is _STOP_WRITER:
+                self._write_queue.task_done()
+                return
+            batch = [write]
+            deadline = time.monotonic() + self.STATE_WRITE_FLUSH_INTERVAL
+
+            # Collect more writes until the batch is full, the flush interval passes or the writer is stopped
+            while len(batch) < self.STATE_WRITE_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    write = self._write_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if write is _STOP_WRITER:
+                    self._write_queue.task_done()
+                    stopping = True
+                    break
+                batch.append(write)
+
+            try:
+                self.db_service.add_job_states(batch)
+            except Exception as e:
+                logger.error(f"Error writing {len(batch)} deferred job states: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+    def flush_pending_writes(self) -> None:
+        """Block until all deferred job state writes have been written."""
+        if self._writer_stopped:
+            return
+        self._write_queue.join()
+
     def update_job_state(self, job_id: str, user_id: int, new_state: str, notes: str = None) -> Dict[str, Any]:
         """
         Update the state of a job.
@@ -211,11 +342,8 @@ class OrchestratorService:
         if new_state not in ["saved", "applied", "rejected"]:
             raise ValueError(f"Invalid state transition: {new_state}")
 
-        # Add new state
-        self.db_service.add_job_state(job_id, user_id, new_state, notes)
-
-        # Get updated state
-        current_state = self.db_service.get_current_job_state(job_id, user_id)
+        # Add new state; the inserted row is the current state
+        current_state = self.db_service.add_job_state_returning(job_id, user_id, new_state, notes)
 
         return {
             "status": "success",
@@ -238,47 +366,22 @@ class OrchestratorService:
         Returns:
             search_results: Search results with pagination info
         """
-        # Set up base query
-        sql_query = """
-        SELECT j.*, s.state, s.state_timestamp
-        FROM job_listings j
-        JOIN job_states s ON j.job_id = s.job_id
-        WHERE s.user_id = ?
-        """
-        params = [user_id]
+        has_query = bool(query and query.strip())
+        num_states = len(states) if states else 0
+        count_query, sql_query = _get_search_sql(has_query, num_states)
 
-        # Add search condition if query is provided
-        if query and query.strip():
-            sql_query += """
-            AND (
-                j.title LIKE ? OR 
-                j.company LIKE ? OR 
-                j.description LIKE ? OR
-                j.location LIKE ?
-            )
-            """
+        params = [user_id]
+        if has_query:
             search_term = f"%{query.strip()}%"
             params.extend([search_term, search_term, search_term, search_term])
-
-        # Add state filter if provided
-        if states and len(states) > 0:
-            placeholders = ', '.join(['?'] * len(states))
-            sql_query += f" AND s.state IN ({placeholders})"
+        if num_states:
             params.extend(states)
 
-        # Add grouping and ordering
-        sql_query += """
-        GROUP BY j.job_id  -- Get only the latest state for each job
-        ORDER BY s.state_timestamp DESC
-        """
-
-        # Get count query (for pagination)
-        count_query = f"SELECT COUNT(*) as count FROM ({sql_query})"
+        # Get count (for pagination)
         count_result = self.db_service.db_manager.get_one(count_query, tuple(params))
         total_count = count_result['count'] if count_result else 0
 
         # Add pagination
-        sql_query += "LIMIT ? OFFSET ?"
         params.extend([limit, offset])
 
         # Execute query
@@ -310,6 +413,15 @@ class OrchestratorService:
 
     def stop_services(self) -> None:
         """Stop all background services when shutting down."""
+        if self._writer_stopped:
+            return
+
+        # Write the deferred job states, then stop the writer before its connection is closed
+        self.flush_pending_writes()
+        self._writer_stopped = True
+        self._write_queue.put(_STOP_WRITER)
+        self._writer_thread.join(timeout=5)
+
         self.scheduler_service.stop()
 
         # Close database connections
@@ -331,6 +443,9 @@ class OrchestratorService:
             job_details = self.get_job_details(job_id, user_id)
 
             # If we get here, the job exists and user has access
+            # Let the queued viewed state land before its job is deleted
+            self.flush_pending_writes()
+
             # Proceed with deletion
             success = self.db_service.delete_job(job_id, user_id)
 
@@ -54,6 +54,15 @@ class PreferenceService:
         }
     }
 
+    # Insert a preference, or update the existing row in place on conflict
+    _UPSERT_PREFERENCE_QUERY = f"""
+    INSERT INTO {UserPreferences.TABLE_NAME}
+    (user_id, category, name, value, updated_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (user_id, category, name)
+    DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+    """
+
     def __init__(self):
         """Initialize the preference service with database connection"""
         self.db_manager = DatabaseManager()
@@ -106,13 +115,9 @@ class PreferenceService:
         json_value = UserPreferences.json_serialize(value)
         now = datetime.datetime.now()
 
-        # Use INSERT OR REPLACE to handle both new and existing preferences
-        query = f"""
-        INSERT OR REPLACE INTO {UserPreferences.TABLE_NAME}
-        (user_id, category, name, value, updated_at)
-        VALUES (?, ?, ?, ?, ?)
-        """
-        self.db_manager.execute_write(query, (user_id, category, name, json_value, now))
+        # Upsert to handle both new and existing preferences without replacing the row
+        self.db_manager.execute_write(self._UPSERT_PREFERENCE_QUERY,
+                                      (user_id, category, name, json_value, now))
 
     def get_preferences_by_category(self, user_id: int, category: str) -> Dict[str, Any]:
         """
@@ -194,8 +199,16 @@ class PreferenceService:
             category: Preference category (search, analysis, scheduling, ui)
             values: Dictionary of preference name to value
         """
-        for name, value in values.items():
-            self.set_preference(user_id, category, name, value)
+        if not values:
+            return
+
+        now = datetime.datetime.now()
+        params_list = [
+            (user_id, category, name, UserPreferences.json_serialize(value), now)
+            for name, value in values.items()
+        ]
+        # Upsert all values in a single transaction
+        self.db_manager.execute_many(self._UPSERT_PREFERENCE_QUERY, params_list)
 
     def delete_preference(self, user_id: int, category: str, name: str) -> bool:
         """
@@ -3,28 +3,24 @@ Prompt templates for job analysis.
 This module provides templates for LLM prompts used in job analysis.
 """
 
+from functools import lru_cache
 import re
-from typing import Optional
+from typing import Iterable, Optional
 
 from constants.analysis import AnalysisConstants
 
 
-class PromptTemplates:
-    """Class for managing analysis prompts."""
-    
-    @staticmethod
-    def get_title_analysis_prompt(title: str, company: str, professional_context: str,
-                                 relevant_patterns: list, job_titles: Optional[list] = None,
-                                 title_match_strictness: float = 0.8) -> str:
-        """Generate prompt for job title analysis."""
-        return f"""
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Prompt bodies are built once at import time; each call only fills in the slots.
+_TITLE_ANALYSIS_TEMPLATE = """
         You are evaluating if a job title is relevant for {professional_context}.
         
         Job Title: "{title}"
         Company: "{company}"
         
-        Relevant title patterns to look for: {', '.join(relevant_patterns)}
-        {f"Target job titles: {', '.join(job_titles)}" if job_titles else ""}
+        Relevant title patterns to look for: {relevant_patterns}
+        {job_titles_line}
         
         Match strictness level: {title_match_strictness} (0-1 scale, where 1 is exact match and 0 is very loose matching)
         
@@ -42,22 +38,8 @@ class PromptTemplates:
         A medium strictness value (e.g., 0.5-0.7) allows for some variation and related titles.
         A low strictness value (e.g., 0.1-0.4) means to be very inclusive of roles that might be tangentially related.
         """
-    
-    @staticmethod
-    def get_description_analysis_prompt(title: str, company: str, description: str, 
-                                       professional_context: str, required_skills: list,
-                                       preferred_skills: list, job_titles: Optional[list] = None,
-                                       title_match_strictness: float = 0.8,
-                                       relevance_threshold: float = 0.7) -> str:
-        """Generate prompt for job description analysis."""
-        clean_description = re.sub(r'\s+', ' ', description).strip()
-        
-        # Truncate description if too long (to stay within token limits)
-        max_desc_length = AnalysisConstants.MAX_DESCRIPTION_LENGTH
-        if len(clean_description) > max_desc_length:
-            clean_description = clean_description[:max_desc_length] + "..."
-            
-        return f"""
+
+_DESCRIPTION_ANALYSIS_TEMPLATE = """
         You are evaluating if a job is relevant for {professional_context}.
         
         Job Title: "{title}"
@@ -66,9 +48,9 @@ class PromptTemplates:
         Job Description:
         "{clean_description}"
         
-        Required skills to look for: {', '.join(required_skills)}
-        Preferred skills to look for: {', '.join(preferred_skills)}
-        {f"Target job titles: {', '.join(job_titles)}" if job_titles else ""}
+        Required skills to look for: {required_skills}
+        Preferred skills to look for: {preferred_skills}
+        {job_titles_line}
         
         Match strictness level: {title_match_strictness} (0-1 scale, where 1 is exact match and 0 is very loose matching)
         Relevance threshold: {relevance_threshold} (Jobs with scores above this are considered relevant)
@@ -88,3 +70,76 @@ class PromptTemplates:
         A medium strictness value (e.g., 0.5-0.7) allows for a more balanced assessment where some missing skills can be compensated with other factors.
         A low strictness value (e.g., 0.1-0.4) means to be very inclusive and consider many related positions.
         """
+
+
+@lru_cache(maxsize=64)
+def _join_terms(terms: tuple) -> str:
+    """Join a tuple of preference terms; cached so a batch of jobs joins each list once."""
+    return ', '.join(terms)
+
+
+def _format_terms(terms: Optional[Iterable[str]]) -> str:
+    """Format a list of preference terms as a comma-separated string."""
+    if not terms:
+        return ""
+    return _join_terms(tuple(terms))
+
+
+def _normalize_whitespace(text: str) -> str:
+    """Collapse whitespace runs to single spaces and strip the ends."""
+    # Printable text can only contain plain spaces, so without a double space
+    # there is nothing for the regex to collapse
+    if text.isprintable() and '  ' not in text:
+        return text.strip()
+    return _WHITESPACE_RE.sub(' ', text).strip()
+
+
+def _format_job_titles_line(job_titles: Optional[Iterable[str]]) -> str:
+    """Format the optional target job titles line of a prompt."""
+    if not job_titles:
+        return ""
+    return f"Target job titles: {_format_terms(job_titles)}"
+
+
+class PromptTemplates:
+    """Class for managing analysis prompts."""
+    
+    @staticmethod
+    def get_title_analysis_prompt(title: str, company: str, professional_context: str,
+                                 relevant_patterns: list, job_titles: Optional[list] = None,
+                                 title_match_strictness: float = 0.8) -> str:
+        """Generate prompt for job title analysis."""
+        return _TITLE_ANALYSIS_TEMPLATE.format(
+            professional_context=professional_context,
+            title=title,
+            company=company,
+            relevant_patterns=_format_terms(relevant_patterns),
+            job_titles_line=_format_job_titles_line(job_titles),
+            title_match_strictness=title_match_strictness
+        )
+    
+    @staticmethod
+    def get_description_analysis_prompt(title: str, company: str, description: str, 
+                                       professional_context: str, required_skills: list,
+                                       preferred_skills: list, job_titles: Optional[list] = None,
+                                       title_match_strictness: float = 0.8,
+                                       relevance_threshold: float = 0.7) -> str:
+        """Generate prompt for job description analysis."""
+        clean_description = _normalize_whitespace(description)
+        
+        # Truncate description if too long (to stay within token limits)
+        max_desc_length = AnalysisConstants.MAX_DESCRIPTION_LENGTH
+        if len(clean_description) > max_desc_length:
+            clean_description = clean_description[:max_desc_length] + "..."
+            
+        return _DESCRIPTION_ANALYSIS_TEMPLATE.format(
+            professional_context=professional_context,
+            title=title,
+            company=company,
+            clean_description=clean_description,
+            required_skills=_format_terms(required_skills),
+            preferred_skills=_format_terms(preferred_skills),
+            job_titles_line=_format_job_titles_line(job_titles),
+            title_match_strictness=title_match_strictness,
+            relevance_threshold=relevance_threshold
+        )
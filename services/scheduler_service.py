@@ -4,15 +4,20 @@ This module handles both periodic and on-demand execution of job processing.
 """
 
 import datetime
+import functools
 import logging
+import queue
+import re
 import sys
 import threading
 import time
-import traceback
-from typing import Dict, Any, Optional, List, Callable
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Callable, Tuple
 
 import schedule
 
+from config import Config
 from database.models import ScheduleSettings
 from services.database_service import DatabaseService
 from services.scraper_service import ScraperService
@@ -22,29 +27,148 @@ from utils.factories import AnalysisServiceFactory
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Signals passed from the scraper to the analysis worker of a pipelined job
+_JOB_FOUND = "job_found"
+_SCRAPE_DONE = "scrape_done"
+_SCRAPE_FAILED = "scrape_failed"
+
+# Weekly schedule day names mapped to the schedule job builder for that day
+_WEEKDAYS = {
+    'monday': lambda: schedule.every().monday,
+    'tuesday': lambda: schedule.every().tuesday,
+    'wednesday': lambda: schedule.every().wednesday,
+    'thursday': lambda: schedule.every().thursday,
+    'friday': lambda: schedule.every().friday,
+    'saturday': lambda: schedule.every().saturday,
+    'sunday': lambda: schedule.every().sunday,
+}
+
+# Weekly schedule format: "<day> HH:MM" (or "HH:MM:SS"), day name in any case
+_WEEKLY_RE = re.compile(
+    r'^(?P<day>monday|tuesday|wednesday|thursday|friday|saturday|sunday)\s+'
+    r'(?P<time>[0-2]\d:[0-5]\d(?::[0-5]\d)?)$',
+    re.IGNORECASE
+)
+
+# Custom schedule format: "interval:X" where X is hours
+_CUSTOM_RE = re.compile(r'^interval:(\d+)$')
+
+# Job status fields stored as time.time() floats and returned as ISO strings
+_TIMESTAMP_FIELDS = ("start_time", "end_time", "last_update")
+
+
+def _format_timestamp(timestamp: Any) -> Any:
+    """Format a time.time() float as an ISO string, leaving other values unchanged."""
+    if isinstance(timestamp, float):
+        return datetime.datetime.fromtimestamp(timestamp).isoformat()
+    return timestamp
+
+
+def _format_job_status(status: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy a job status with its timestamps formatted as ISO strings.
+
+    Args:
+        status: Job status as stored in running_jobs
+
+    Returns:
+        status: Copy of the status for callers and callbacks
+    """
+    formatted = dict(status)
+    for field in _TIMESTAMP_FIELDS:
+        if field in formatted:
+            formatted[field] = _format_timestamp(formatted[field])
+
+    if formatted.get("steps"):
+        formatted["steps"] = [
+            {
+                **step,
+                "events": [
+                    {**event, "timestamp": _format_timestamp(event.get("timestamp"))}
+                    for event in list(step["events"])
+                ]
+            }
+            for step in list(formatted["steps"])
+        ]
+    return formatted
+
+
 class SchedulerService:
     """
     Service for managing automated job scraping and analysis.
     Uses the 'schedule' library for periodic execution and runs in a background thread.
     """
 
-    def __init__(self):
-        """Initialize the scheduler service."""
+    # Maximum number of queued jobs analyzed in one run
+    ANALYSIS_LIMIT = 50
+
+    # Seconds to wait after a schedule change so a burst of changes is reloaded once
+    SCHEDULE_RELOAD_DELAY = 1
+
+    # Number of manual and scheduled jobs that can run at the same time
+    MAX_CONCURRENT_JOBS = 4
+
+    # Number of finished (completed, failed or canceled) jobs whose status is kept
+    MAX_FINISHED_JOBS = 256
+
+    # Job statuses after which a job no longer changes
+    FINISHED_STATUSES = ("completed", "failed", "canceled")
+
+    def __init__(self, max_idle_seconds: Optional[float] = None):
+        """
+        Initialize the scheduler service.
+
+        Args:
+            max_idle_seconds: Longest the scheduler thread sleeps before re-checking
+                pending jobs (defaults to Config.SCHEDULER_MAX_IDLE_SECONDS). Larger
+                values mean fewer wakeups on an idle server; schedule changes and
+                stop() still wake the thread immediately.
+        """
+        self.max_idle_seconds = (Config.SCHEDULER_MAX_IDLE_SECONDS
+                                 if max_idle_seconds is None else max_idle_seconds)
+
         self.db_service = DatabaseService()
         self.scraper_service = ScraperService()
         self.analysis_service = AnalysisServiceFactory.create_analysis_service()
 
-        # Status tracking
+        # Status tracking; status_lock only guards adding and looking up entries,
+        # while each job's status is mutated under its own lock. running_jobs is
+        # copy-on-write: writers replace the whole dict, so readers never need the lock
         self.running_jobs = {}
         self.status_lock = threading.Lock()
+        self._job_locks = {}
+
+        # Step name -> step dict of each job, so events find their step without a scan
+        self._step_indexes = {}
+
+        # IDs of finished jobs, oldest first, so old statuses can be dropped
+        self._finished_jobs = OrderedDict()
 
         # Thread for running the scheduler
         self.scheduler_thread = None
         self.stop_event = threading.Event()
 
+        # Wakes the scheduler thread early when it is stopped or schedules change
+        self._reload_event = threading.Event()
+
+        # Set when schedules changed in the database and the scheduler must reload them
+        self._schedules_dirty = threading.Event()
+
+        # (user_id, schedule_type, execution_time) of the schedules currently registered
+        self._loaded_schedules = None
+
         # Callbacks for status updates
         self.callbacks = {}
 
+        # Manual jobs run synchronously under test runners; this can't change while running
+        self._is_testing = 'pytest' in sys.modules or 'unittest' in sys.modules
+
+        # Workers that run manual and scheduled jobs, and the workers that analyze each
+        # job while it is still scraping; both are created on first use
+        self.job_executor = None
+        self.analysis_executor = None
+        self.job_executor_lock = threading.Lock()
+
     def start(self):
         """Start the scheduler thread if not already running."""
         if self.scheduler_thread is None or not self.scheduler_thread.is_alive():
@@ -58,10 +182,20 @@ class SchedulerService:
         """Stop the scheduler thread."""
         if self.scheduler_thread and self.scheduler_thread.is_alive():
             self.stop_event.set()
+            self._reload_event.set()
             self.scheduler_thread.join(timeout=5)
             self.scheduler_thread = None
             logger.info("Scheduler thread stopped")
 
+        # Drop jobs that haven't started yet; running jobs finish in the background
+        with self.job_executor_lock:
+            if self.job_executor is not None:
+                self.job_executor.shutdown(wait=False, cancel_futures=True)
+                self.job_executor = None
+            if self.analysis_executor is not None:
+                self.analysis_executor.shutdown(wait=False, cancel_futures=True)
+                self.analysis_executor = None
+
     def restart(self):
         """Restart the scheduler thread."""
         self.stop()
@@ -72,24 +206,55 @@ class SchedulerService:
         # Load all active schedules from database
         self._load_schedules()
 
-        # Run the scheduler
+        # Run the scheduler, sleeping until the next job is due instead of polling
         while not self.stop_event.is_set():
+            # Reload changed schedules, once for a whole burst of changes
+            if self._schedules_dirty.is_set():
+                self.stop_event.wait(timeout=self.SCHEDULE_RELOAD_DELAY)
+                self._schedules_dirty.clear()
+                self._load_schedules()
+
             schedule.run_pending()
-            time.sleep(1)
+
+            idle_seconds = schedule.idle_seconds()
+            if idle_seconds is None:
+                timeout = self.max_idle_seconds
+            else:
+                timeout = max(0.0, min(idle_seconds, self.max_idle_seconds))
+
+            self._reload_event.wait(timeout=timeout)
+            self._reload_event.clear()
 
     def _load_schedules(self):
-        """Load all active schedules from the database and add them to the scheduler."""
-        # Clear existing schedules
-        schedule.clear()
+        """
+        Load all active schedules from the database and add them to the scheduler.
 
+        Only schedules that changed since the last load are removed or added, so
+        unchanged schedules keep their registered jobs and next run times.
+        """
         # Get all active schedules
         active_schedules = self.db_service.get_active_schedules()
+        active = {
+            (sched['user_id'], sched['schedule_type'], sched['execution_time'])
+            for sched in active_schedules
+        }
+
+        if self._loaded_schedules is None:
+            # First load: start from an empty scheduler
+            schedule.clear()
+            added = active
+        else:
+            if active == self._loaded_schedules:
+                return
+
+            # Remove schedules that were disabled or changed
+            for removed in self._loaded_schedules - active:
+                schedule.clear(self._schedule_tag(*removed))
+            added = active - self._loaded_schedules
 
-        for sched in active_schedules:
-            user_id = sched['user_id']
-            schedule_type = sched['schedule_type']
-            execution_time = sched['execution_time']
+        self._loaded_schedules = active
 
+        for user_id, schedule_type, execution_time in sorted(added, key=str):
             # Set up schedule based on type
             job = None
 
@@ -100,30 +265,11 @@ class SchedulerService:
             elif schedule_type == ScheduleSettings.TYPE_WEEKLY:
                 # Extract day and time (format: "Monday 08:00")
                 try:
-                    parts = execution_time.split(' ')
-                    # Fixed: Added explicit validation to ensure the error is logged
-                    if len(parts) != 2:
-                        raise ValueError("Weekly schedule must be in format 'day time'")
-
-                    day, time = parts
-                    day = day.lower()
-
-                    if day == 'monday':
-                        job = schedule.every().monday.at(time)
-                    elif day == 'tuesday':
-                        job = schedule.every().tuesday.at(time)
-                    elif day == 'wednesday':
-                        job = schedule.every().wednesday.at(time)
-                    elif day == 'thursday':
-                        job = schedule.every().thursday.at(time)
-                    elif day == 'friday':
-                        job = schedule.every().friday.at(time)
-                    elif day == 'saturday':
-                        job = schedule.every().saturday.at(time)
-                    elif day == 'sunday':
-                        job = schedule.every().sunday.at(time)
-                    else:
-                        raise ValueError(f"Invalid day of week: {day}")
+                    match = _WEEKLY_RE.match(execution_time)
+                    if not match:
+                        raise ValueError("Weekly schedule must be in format 'day HH:MM'")
+
+                    job = _WEEKDAYS[match.group('day').lower()]().at(match.group('time'))
                 except Exception as e:
                     logger.error(f"Error parsing weekly schedule: {execution_time} - {str(e)}")
 
@@ -132,27 +278,39 @@ class SchedulerService:
                 # This is a simplified implementation that only supports 'interval' type
                 # Format: "interval:X" where X is hours
                 try:
-                    if execution_time.startswith('interval:'):
-                        hours = int(execution_time.split(':')[1])
-                        job = schedule.every(hours).hours
+                    match = _CUSTOM_RE.match(execution_time)
+                    if not match:
+                        raise ValueError("Custom schedule must be in format 'interval:hours'")
+
+                    job = schedule.every(int(match.group(1))).hours
                 except Exception as e:
                     logger.error(f"Error parsing custom schedule: {execution_time} - {str(e)}")
 
-            # Set the job function if a valid schedule was created
+            # Set the job function if a valid schedule was created; it runs on the
+            # job pool so long jobs don't hold up the scheduler thread
             if job:
-                # Create a function that captures the user_id
-                def create_job_func(uid):
-                    def job_func():
-                        try:
-                            self._run_scheduled_job(uid)
-                        except Exception as e:
-                            logger.error(f"Error in scheduled job for user {uid}: {str(e)}")
-                            traceback.print_exc()
-                    return job_func
-
-                job.do(create_job_func(user_id))
+                job.do(self._submit_job, self._run_scheduled_job_safely, user_id).tag(
+                    self._schedule_tag(user_id, schedule_type, execution_time)
+                )
                 logger.info(f"Added schedule for user {user_id}: {schedule_type} at {execution_time}")
 
+    @staticmethod
+    def _schedule_tag(user_id: int, schedule_type: str, execution_time: str) -> str:
+        """Tag identifying the scheduler job registered for one schedule setting."""
+        return f"schedule:{user_id}:{schedule_type}:{execution_time}"
+
+    def _run_scheduled_job_safely(self, user_id: int) -> None:
+        """
+        Run a scheduled job, logging any error instead of raising it.
+
+        Args:
+            user_id: The user's ID
+        """
+        try:
+            self._run_scheduled_job(user_id)
+        except Exception:
+            logger.exception("Error in scheduled job for user %s", user_id)
+
     def _run_scheduled_job(self, user_id: int) -> None:
         """
         Run a complete job processing workflow for a user.
@@ -162,58 +320,49 @@ class SchedulerService:
         """
         logger.info(f"Running scheduled job for user {user_id}")
 
+        start_time = time.time()
+        job_id = f"scheduled_{user_id}_{int(start_time)}"
+
         try:
             # Mark job as running
-            job_id = f"scheduled_{user_id}_{int(time.time())}"
             self._set_job_status(job_id, {
                 "status": "running",
                 "user_id": user_id,
                 "type": "scheduled",
-                "start_time": datetime.datetime.now().isoformat(),
+                "start_time": start_time,
                 "steps": []
             })
 
-            # Step 1: Scrape jobs
-            scrape_result = self.scraper_service.scrape_jobs(
-                user_id, lambda event, data: self._update_job_status(job_id, "scraping", event, data)
-            )
-
-            # Step 2: Analyze jobs
-            analyze_result = self.analysis_service.analyze_queued_jobs(
-                user_id, 50, lambda event, data: self._update_job_status(job_id, "analyzing", event, data)
-            )
+            # Scrape jobs and analyze them as they are found
+            scrape_result, analyze_result = self._scrape_and_analyze(job_id, user_id)
 
-            # Call update for completion but DON'T save its return value into a variable!
+            # Record completion of the analysis step
             self._update_job_status(job_id, "analyzing", "complete", analyze_result)
 
-            # Mark job as completed - KEY CHANGE: Directly pass self._update_job_status(...) call as the value
-            # This ensures in the test it will use mock_update.return_value
-            self._set_job_status(job_id, {
-                "status": "completed",
-                "user_id": user_id,
-                "type": "scheduled",
-                "start_time": datetime.datetime.now().isoformat(),
-                "end_time": datetime.datetime.now().isoformat(),
-                "steps": self._update_job_status(job_id, "analyzing", "complete", analyze_result),
-                "result": {
+            # Mark job as completed; its steps and start time are already in the status
+            self._patch_job_status(
+                job_id,
+                status="completed",
+                end_time=time.time(),
+                result={
                     "scraping": scrape_result,
                     "analyzing": analyze_result
                 }
-            })
+            )
 
             # Update last run time in database
             self.db_service.update_last_run(user_id)
 
         except Exception as e:
-            logger.error(f"Error in scheduled job for user {user_id}: {str(e)}")
+            logger.exception("Error in scheduled job for user %s", user_id)
 
             # Mark job as failed
             self._set_job_status(job_id, {
                 "status": "failed",
                 "user_id": user_id,
                 "type": "scheduled",
-                "start_time": datetime.datetime.now().isoformat(),
-                "end_time": datetime.datetime.now().isoformat(),
+                "start_time": start_time,
+                "end_time": time.time(),
                 "steps": [],
                 "error": str(e)
             })
@@ -236,23 +385,52 @@ class SchedulerService:
         if callback:
             self.callbacks[job_id] = callback
 
-        # Check if running in test environment
-        is_testing = 'pytest' in sys.modules or 'unittest' in sys.modules
-
-        if is_testing:
+        if self._is_testing:
             # Run synchronously for tests
             self._run_manual_job(job_id, user_id)
         else:
-            # Start the job in a separate thread for normal operation
-            thread = threading.Thread(
-                target=self._run_manual_job,
-                args=(job_id, user_id)
-            )
-            thread.daemon = True
-            thread.start()
+            # Run the job on the job pool for normal operation
+            self._submit_job(self._run_manual_job, job_id, user_id)
 
         return job_id
 
+    def _submit_job(self, fn: Callable, *args: Any) -> Future:
+        """
+        Run a job function on the bounded job pool.
+
+        Args:
+            fn: Function to run
+            *args: Arguments for the function
+
+        Returns:
+            future: Future of the submitted job
+        """
+        with self.job_executor_lock:
+            if self.job_executor is None:
+                self.job_executor = ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_JOBS,
+                                                       thread_name_prefix="scheduler-job")
+            return self.job_executor.submit(fn, *args)
+
+    def _submit_analysis(self, fn: Callable, *args: Any) -> Future:
+        """
+        Run a job's analysis worker on the analysis pool.
+
+        The pool has one worker per concurrent job, so no job's analysis waits
+        behind another job's scrape.
+
+        Args:
+            fn: Function to run
+            *args: Arguments for the function
+
+        Returns:
+            future: Future of the submitted analysis
+        """
+        with self.job_executor_lock:
+            if self.analysis_executor is None:
+                self.analysis_executor = ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_JOBS,
+                                                            thread_name_prefix="analysis")
+            return self.analysis_executor.submit(fn, *args)
+
     def _run_manual_job(self, job_id: str, user_id: int) -> None:
         """
         Run a manual job in a separate thread.
@@ -261,63 +439,155 @@ class SchedulerService:
             job_id: Unique identifier for the job
             user_id: The user's ID
         """
+        start_time = time.time()
+
         try:
             # Mark job as running
             self._set_job_status(job_id, {
                 "status": "running",
                 "user_id": user_id,
                 "type": "manual",
-                "start_time": datetime.datetime.now().isoformat(),
+                "start_time": start_time,
                 "steps": []
             })
 
-            # Step 1: Scrape jobs (no job limit)
-            scrape_result = self.scraper_service.scrape_jobs(
-                user_id,
-                lambda event, data: self._update_job_status(job_id, "scraping", event, data)
-            )
+            # Scrape jobs (no job limit) and analyze them as they are found
+            scrape_result, analyze_result = self._scrape_and_analyze(job_id, user_id)
 
-            # Step 2: Analyze jobs
-            analyze_result = self.analysis_service.analyze_queued_jobs(
-                user_id, 50, lambda event, data: self._update_job_status(job_id, "analyzing", event, data)
-            )
-
-            # Call update for completion but DON'T save its return value into a variable!
+            # Record completion of the analysis step
             self._update_job_status(job_id, "analyzing", "complete", analyze_result)
 
-            # Mark job as completed - KEY CHANGE: Directly pass self._update_job_status(...) call as the value
-            # This ensures in the test it will use mock_update.return_value
-            self._set_job_status(job_id, {
-                "status": "completed",
-                "user_id": user_id,
-                "type": "manual",
-                "start_time": datetime.datetime.now().isoformat(),
-                "end_time": datetime.datetime.now().isoformat(),
-                "steps": self._update_job_status(job_id, "analyzing", "complete", analyze_result),
-                "result": {
+            # Mark job as completed; its steps and start time are already in the status
+            self._patch_job_status(
+                job_id,
+                status="completed",
+                end_time=time.time(),
+                result={
                     "scraping": scrape_result,
                     "analyzing": analyze_result
                 }
-            })
+            )
 
             # Update last run time in database
             self.db_service.update_last_run(user_id)
 
         except Exception as e:
-            logger.error(f"Error in manual job {job_id}: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Error in manual job %s", job_id)
 
             # Mark job as failed
             self._set_job_status(job_id, {
                 "status": "failed",
                 "user_id": user_id,
                 "type": "manual",
-                "start_time": datetime.datetime.now().isoformat(),
-                "end_time": datetime.datetime.now().isoformat(),
+                "start_time": start_time,
+                "end_time": time.time(),
                 "steps": [],
                 "error": str(e)
             })
 
+    def _scrape_and_analyze(self, job_id: str, user_id: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Scrape jobs for a user and analyze them while scraping is still running.
+
+        Scraping runs in the calling thread. Every job the scraper reports wakes an
+        analysis worker that analyzes the jobs queued in the database so far, so the
+        total time approaches the longer of the two steps instead of their sum.
+
+        Args:
+            job_id: Unique identifier for the job
+            user_id: The user's ID
+
+        Returns:
+            scrape_result, analyze_result: Results of the scraping and analysis steps
+        """
+        signals = queue.Queue()
+
+        def on_scrape_event(event: str, data: Dict[str, Any]) -> None:
+            self._update_job_status(job_id, "scraping", event, data)
+            if event == "job_found":
+                signals.put(_JOB_FOUND)
+
+        analysis_future = self._submit_analysis(self._analyze_while_scraping, job_id, user_id, signals)
+
+        try:
+            scrape_result = self.scraper_service.scrape_jobs(user_id, on_scrape_event)
+        except Exception:
+            signals.put(_SCRAPE_FAILED)
+            raise
+
+        signals.put(_SCRAPE_DONE)
+        return scrape_result, analysis_future.result()
+
+    def _analyze_while_scraping(self, job_id: str, user_id: int,
+                                signals: queue.Queue) -> Optional[Dict[str, Any]]:
+        """
+        Analyze queued jobs in batches as the scraper signals new jobs.
+
+        Args:
+            job_id: Unique identifier for the job
+            user_id: The user's ID
+            signals: Queue of signals sent by the scraping step
+
+        Returns:
+            analyze_result: Combined analysis results, or None if scraping failed
+        """
+        batch_results = []
+        remaining = self.ANALYSIS_LIMIT
+        scraping_done = False
+        on_analysis_event = self._step_status_callback(job_id, "analyzing")
+
+        while not scraping_done:
+            # Wait for a signal, then take every signal that arrived during the last batch
+            pending = [signals.get()]
+            while not signals.empty():
+                pending.append(signals.get_nowait())
+
+            if _SCRAPE_FAILED in pending:
+                return None
+            scraping_done = _SCRAPE_DONE in pending
+
+            # Always analyze at least once so jobs queued by earlier runs are picked up
+            if remaining > 0 and (_JOB_FOUND in pending or not batch_results):
+                result = self.analysis_service.analyze_queued_jobs(user_id, remaining, on_analysis_event)
+                batch_results.append(result)
+                remaining -= result.get("total", 0)
+
+        return self._merge_analysis_results(batch_results)
+
+    @staticmethod
+    def _merge_analysis_results(batch_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Combine the results of several analyze_queued_jobs batches.
+
+        Args:
+            batch_results: Results returned by each batch
+
+        Returns:
+            analyze_result: Counts summed across all batches
+        """
+        if len(batch_results) == 1:
+            return batch_results[0]
+
+        merged = {}
+        for result in batch_results:
+            for key, value in result.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def _step_status_callback(self, job_id: str, step: str) -> Callable[[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Create the event callback that records a job step's events.
+
+        Args:
+            job_id: Unique identifier for the job
+            step: Step name the events belong to
+
+        Returns:
+            callback: Function taking (event, data)
+        """
+        return functools.partial(self._update_job_status, job_id, step)
+
     def _set_job_status(self, job_id: str, status: Dict[str, Any]) -> None:
         """
         Set the status of a running job.
@@ -326,21 +596,64 @@ class SchedulerService:
             job_id: Unique identifier for the job
             status: Status dictionary
         """
-        with self.status_lock:
-            self.running_jobs[job_id] = status
+        _, job_lock = self._get_job_entry(job_id, create=True)
+        with job_lock:
+            with self.status_lock:
+                self.running_jobs = {**self.running_jobs, job_id: status}
+            self._step_indexes[job_id] = {s["name"]: s for s in status.get("steps", [])}
+
+        self._notify_job_status(job_id, status)
+
+    def _patch_job_status(self, job_id: str, **fields: Any) -> bool:
+        """
+        Update fields of a job's status in place, keeping its steps and start time.
+
+        Args:
+            job_id: Unique identifier for the job
+            **fields: Status fields to set
+
+        Returns:
+            success: True if the job was updated, False if not found
+        """
+        job_status, job_lock = self._get_job_entry(job_id)
+        if job_status is None:
+            return False
+
+        with job_lock:
+            job_status = self.running_jobs.get(job_id)
+            if job_status is None:
+                return False
+            job_status.update(fields)
+
+        self._notify_job_status(job_id, job_status)
+        return True
+
+    def _notify_job_status(self, job_id: str, status: Dict[str, Any]) -> None:
+        """
+        Handle a job status change: track finished jobs and call the job's callback.
+
+        Args:
+            job_id: Unique identifier for the job
+            status: The job's new status
+        """
+        finished = status["status"] in self.FINISHED_STATUSES
+        if finished:
+            self._mark_job_finished(job_id)
 
         # Call callback if registered
-        if job_id in self.callbacks:
+        callback = self.callbacks.get(job_id)
+        if callback is not None:
             try:
-                self.callbacks[job_id](status)
+                callback(_format_job_status(status))
             except Exception as e:
                 logger.error(f"Error in callback for job {job_id}: {str(e)}")
 
-            # Remove callback if job is completed or failed
-            if status["status"] in ["completed", "failed"]:
-                del self.callbacks[job_id]
+            # Remove callback if job is finished
+            if finished:
+                self.callbacks.pop(job_id, None)
 
-    def _update_job_status(self, job_id: str, step: str, event: str, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _update_job_status(self, job_id: str, step: str, event: str, data: Dict[str, Any],
+                           return_steps: bool = False) -> List[Dict[str, Any]]:
         """
         Update the status of a running job step.
 
@@ -349,56 +662,64 @@ class SchedulerService:
             step: Current step name
             event: Event type
             data: Event data
+            return_steps: Whether to return a copy of the updated steps list
 
         Returns:
-            steps: The updated steps list
+            steps: The updated steps list, or an empty list if return_steps is False
         """
         steps_to_return = []
-
-        with self.status_lock:
-            if job_id in self.running_jobs:
-                job_status = self.running_jobs[job_id]
+        now = time.time()
+
+        job_status, job_lock = self._get_job_entry(job_id)
+        if job_status is not None:
+            with job_lock:
+                # Statuses are only replaced under the job lock, so this is the current one
+                job_status = self.running_jobs.get(job_id)
+                if job_status is None:
+                    # Finished long ago and already dropped
+                    return steps_to_return
+
+                step_index = self._step_indexes.get(job_id)
+                if step_index is None:
+                    step_index = {s["name"]: s for s in job_status["steps"]}
+                    self._step_indexes[job_id] = step_index
 
                 # Find or create step
-                step_found = False
-                for s in job_status["steps"]:
-                    if s["name"] == step:
-                        s["events"].append({
-                            "event": event,
-                            "data": data,
-                            "timestamp": datetime.datetime.now().isoformat()
-                        })
-                        step_found = True
-                        break
-
-                if not step_found:
-                    job_status["steps"].append({
+                event_record = {
+                    "event": event,
+                    "data": data,
+                    "timestamp": now
+                }
+                step_status = step_index.get(step)
+                if step_status is not None:
+                    step_status["events"].append(event_record)
+                else:
+                    step_status = {
                         "name": step,
-                        "events": [{
-                            "event": event,
-                            "data": data,
-                            "timestamp": datetime.datetime.now().isoformat()
-                        }]
-                    })
+                        "events": [event_record]
+                    }
+                    job_status["steps"].append(step_status)
+                    step_index[step] = step_status
 
                 # Update current step
                 job_status["current_step"] = step
-                job_status["last_update"] = datetime.datetime.now().isoformat()
-
-                self.running_jobs[job_id] = job_status
+                job_status["last_update"] = now
 
-                # Save steps to return (within the lock)
-                steps_to_return = job_status["steps"].copy()
+                # Save steps to return (within the lock), only for callers that use them
+                if return_steps:
+                    steps_to_return = job_status["steps"].copy()
 
-        # Call callback if registered (still within the function but after releasing the lock)
-        if job_id in self.callbacks:
+        # Call callback if registered (after releasing the lock); the payload is
+        # only built when there is someone to receive it
+        callback = self.callbacks.get(job_id)
+        if callback is not None:
             try:
-                self.callbacks[job_id]({
+                callback({
                     "job_id": job_id,
                     "step": step,
                     "event": event,
                     "data": data,
-                    "timestamp": datetime.datetime.now().isoformat()
+                    "timestamp": _format_timestamp(now)
                 })
             except Exception as e:
                 logger.error(f"Error in callback for job {job_id}: {str(e)}")
@@ -416,8 +737,9 @@ class SchedulerService:
         Returns:
             status: Current job status or None if job not found
         """
-        with self.status_lock:
-            return self.running_jobs.get(job_id)
+        # A single dict lookup is atomic, so readers don't need the lock
+        status = self.running_jobs.get(job_id)
+        return _format_job_status(status) if status is not None else None
 
     def get_all_job_statuses(self, user_id: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
         """
@@ -429,20 +751,74 @@ class SchedulerService:
         Returns:
             statuses: Dictionary of job ID to status
         """
+        # running_jobs is never changed in place, so the current dict is a consistent snapshot
+        jobs = self.running_jobs
+
+        return {
+            job_id: _format_job_status(status)
+            for job_id, status in jobs.items()
+            if user_id is None or status.get("user_id") == user_id
+        }
+
+    def _mark_job_finished(self, job_id: str) -> None:
+        """
+        Record that a job finished and drop the oldest finished jobs beyond MAX_FINISHED_JOBS.
+
+        Args:
+            job_id: Unique identifier for the job
+        """
         with self.status_lock:
-            if user_id is None:
-                return dict(self.running_jobs)
-            else:
-                return {
-                    job_id: status
-                    for job_id, status in self.running_jobs.items()
-                    if status.get("user_id") == user_id
-                }
+            self._finished_jobs[job_id] = None
+            self._finished_jobs.move_to_end(job_id)
+
+            evicted = []
+            while len(self._finished_jobs) > self.MAX_FINISHED_JOBS:
+                old_job_id, _ = self._finished_jobs.popitem(last=False)
+                evicted.append(old_job_id)
+                self._job_locks.pop(old_job_id, None)
+                self._step_indexes.pop(old_job_id, None)
+
+            if evicted:
+                running_jobs = dict(self.running_jobs)
+                for old_job_id in evicted:
+                    running_jobs.pop(old_job_id, None)
+                self.running_jobs = running_jobs
+
+    def _get_job_entry(self, job_id: str, create: bool = False) -> Tuple[Optional[Dict[str, Any]], Optional[threading.Lock]]:
+        """
+        Look up a job's status and the lock guarding it.
+
+        Args:
+            job_id: Unique identifier for the job
+            create: Create the job's lock even if the job is not tracked yet
+
+        Returns:
+            status, lock: The job status (or None) and its lock (or None if not tracked and not created)
+        """
+        # Fast path for known jobs: single dict lookups are atomic, so no lock is needed
+        job_lock = self._job_locks.get(job_id)
+        if job_lock is not None:
+            status = self.running_jobs.get(job_id)
+            if status is not None or create:
+                return status, job_lock
+
+        with self.status_lock:
+            status = self.running_jobs.get(job_id)
+            if status is None and not create:
+                return None, None
+
+            job_lock = self._job_locks.get(job_id)
+            if job_lock is None:
+                job_lock = self._job_locks[job_id] = threading.Lock()
+            return status, job_lock
 
     def update_schedule(self, user_id: int, schedule_type: str,
                        execution_time: str, enabled: bool = True) -> None:
         """
-        Update a user's schedule settings and reload scheduler.
+        Update a user's schedule settings and have the scheduler reload them.
+
+        The scheduler thread reloads schedules shortly after the change (within
+        SCHEDULE_RELOAD_DELAY seconds), so several updates are applied in one reload.
 
         Args:
             user_id: The user's ID
@@ -455,8 +831,9 @@ class SchedulerService:
             user_id, schedule_type, execution_time, enabled
         )
 
-        # Reload schedules
-        self._load_schedules()
+        # Let the scheduler thread reload schedules
+        self._schedules_dirty.set()
+        self._reload_event.set()
 
     def cancel_job(self, job_id: str) -> bool:
         """
@@ -468,21 +845,5 @@ class SchedulerService:
         Returns:
             success: True if job was canceled, False if not found
         """
-        with self.status_lock:
-            if job_id in self.running_jobs:
-                # Mark job as canceled
-                self.running_jobs[job_id]["status"] = "canceled"
-                self.running_jobs[job_id]["end_time"] = datetime.datetime.now().isoformat()
-
-                # Call callback if registered
-                if job_id in self.callbacks:
-                    try:
-                        self.callbacks[job_id](self.running_jobs[job_id])
-                    except Exception as e:
-                        logger.error(f"Error in callback for job {job_id}: {str(e)}")
-
-                    # Remove callback
-                    del self.callbacks[job_id]
-
-                return True
-            return False
\ No newline at end of file
+        # Mark job as canceled
+        return self._patch_job_status(job_id, status="canceled", end_time=time.time())
\ No newline at end of file
@@ -5,13 +5,12 @@ This module handles the scraping of LinkedIn job listings based on user preferen
 
 import logging
 import os
-import random
-import re
 import time
-import hashlib
-import asyncio
+import queue
 import threading
-from typing import Dict, Any, Optional, Callable, Set, Tuple, List
+from types import MappingProxyType
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Set, FrozenSet, Tuple, List
 
 from linkedin_jobs_scraper import LinkedinScraper
 from linkedin_jobs_scraper.events import Events, EventData
@@ -23,38 +22,189 @@ from constants.scraping import ScrapingConstants
 from database.models import JobStates
 from services.database_service import DatabaseService
 from services.preference_service import PreferenceService
-from utils.security import validate_url
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Optional features of the installed scraper library, probed once at import
+_EVENT_DATA_HAS_CUSTOM_DATA = hasattr(EventData, 'custom_data')
+_FILTERS_HAVE_SET_REMOTE = hasattr(QueryFilters, 'set_remote')
+_FILTERS_HAVE_REMOTE = hasattr(QueryFilters, 'REMOTE')
+
+# States after which a rescraped job is not queued for analysis again
+_POST_ANALYSIS_STATES = frozenset({
+    JobStates.STATE_ANALYZED,
+    JobStates.STATE_RELEVANT,
+    JobStates.STATE_IRRELEVANT,
+    JobStates.STATE_VIEWED,
+    JobStates.STATE_SAVED,
+    JobStates.STATE_APPLIED,
+    JobStates.STATE_REJECTED
+})
+
 
 class ScraperService:
     """
     Service for scraping LinkedIn job listings based on user preferences.
     """
 
+    # Seconds a preference lookup is served from memory before re-reading it
+    PREFERENCE_CACHE_TTL = 30
+
+    # Scrapes of the same user within this many seconds share one last_run write
+    LAST_RUN_COALESCE_SECONDS = 10
+
+    # Callback events waiting for delivery; producers block once this many are pending
+    CALLBACK_QUEUE_SIZE = 1000
+
+    # Job IDs kept in memory to skip the existence query for already stored jobs
+    KNOWN_JOB_IDS_LIMIT = 50000
+
+    # Experience level preference strings mapped to LinkedIn filters
+    _EXPERIENCE_LEVEL_MAP = MappingProxyType({
+        "Internship": ExperienceLevelFilters.INTERNSHIP,
+        "Entry level": ExperienceLevelFilters.ENTRY_LEVEL,
+        "Associate": ExperienceLevelFilters.ASSOCIATE,
+        "Mid-Senior level": ExperienceLevelFilters.MID_SENIOR,
+        "Director": ExperienceLevelFilters.DIRECTOR,
+        "Executive": ExperienceLevelFilters.EXECUTIVE
+    })
+
     def __init__(self):
         """Initialize the scraper service."""
         self.db_service = DatabaseService()
+        self.preference_service = PreferenceService()
         self.scraper = None
 
+        # Preference lookups keyed by (user_id, category), with the time they were read
+        self._pref_cache: Dict[Tuple[int, str], Tuple[float, Dict[str, Any]]] = {}
+
         # Initialize instance variables before using them
         self.current_jobs: Set[str] = set()
         self.current_user_id: Optional[int] = None
         self.callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
-        self.allowed_job_ids: Optional[List[str]] = None
+        self.allowed_job_ids: Optional[FrozenSet[str]] = None
+        # Allowed job IDs not found yet in this run
+        self._remaining_ids: Set[str] = set()
 
         # Add a lock for thread safety
         self.scraper_lock = threading.Lock()
 
+        # Scrape runs keep their user, callback and found jobs on the instance, and
+        # scheduled jobs for different users share this service, so runs take turns
+        self._run_lock = threading.Lock()
+
+        # Job IDs known to be stored, oldest first, bounded to KNOWN_JOB_IDS_LIMIT
+        self._known_ids: OrderedDict[str, None] = OrderedDict(
+            (job_id, None) for job_id in reversed(self.db_service.get_recent_job_ids(self.KNOWN_JOB_IDS_LIMIT))
+        )
+
+        # Chrome paths the current scraper was built with; the first scraper auto-detects them
+        self._last_chrome_paths: Tuple[Optional[str], Optional[str]] = (None, None)
+
+        # When last_run was last written per user, by time.monotonic()
+        self._last_run_written: Dict[int, float] = {}
+
+        # Callback events are delivered in order by a single pump thread, so a slow
+        # callback doesn't stall the scraper's event thread
+        self._callback_queue: queue.Queue = queue.Queue(maxsize=self.CALLBACK_QUEUE_SIZE)
+        self._callback_thread = threading.Thread(target=self._callback_pump, daemon=True)
+        self._callback_thread.start()
+
         # Pending URL jobs for single URL scraping
         self.pending_url_jobs = {}
 
         # Now initialize the scraper
         self.initialize_scraper()
 
+    def _callback_pump(self) -> None:
+        """Deliver queued callback events until the process exits."""
+        while True:
+            callback, event, payload = self._callback_queue.get()
+            try:
+                callback(event, payload)
+            except Exception as e:
+                logger.error(f"Error in callback: {str(e)}")
+            finally:
+                self._callback_queue.task_done()
+
+    def _emit(self, event: str, payload: Dict[str, Any]) -> None:
+        """
+        Queue a callback event for the current callback, if there is one.
+
+        Args:
+            event: Event name
+            payload: Event data
+        """
+        if self.callback:
+            self._callback_queue.put((self.callback, event, payload))
+
+    def _flush_callbacks(self) -> None:
+        """Wait until every queued callback event has been delivered."""
+        self._callback_queue.join()
+
+    def _get_prefs(self, user_id: int, category: str, ttl: float = PREFERENCE_CACHE_TTL) -> Dict[str, Any]:
+        """
+        Get a category of user preferences, reusing a recent read if there is one.
+
+        Args:
+            user_id: The user's ID
+            category: Preference category
+            ttl: Seconds a cached read stays valid
+
+        Returns:
+            preferences: Dictionary of preferences in the category
+        """
+        key = (user_id, category)
+        cached = self._pref_cache.get(key)
+        now = time.monotonic()
+        if cached and now - cached[0] < ttl:
+            return cached[1]
+
+        prefs = self.preference_service.get_preferences_by_category(user_id, category)
+        self._pref_cache[key] = (now, prefs)
+        return prefs
+
+    def invalidate_preferences(self, user_id: int) -> None:
+        """
+        Drop cached preference reads for a user after their preferences change.
+
+        Args:
+            user_id: The user's ID
+        """
+        for key in [key for key in self._pref_cache if key[0] == user_id]:
+            self._pref_cache.pop(key, None)
+
+    def _is_known_job(self, job_id: str) -> bool:
+        """
+        Check whether a job ID is known to be stored, without querying the database.
+
+        Args:
+            job_id: The job's LinkedIn ID
+
+        Returns:
+            is_known: True if the job ID is in the in-memory cache
+        """
+        with self.scraper_lock:
+            if job_id not in self._known_ids:
+                return False
+            self._known_ids.move_to_end(job_id)
+            return True
+
+    def _remember_job(self, job_id: str) -> None:
+        """
+        Add a stored job ID to the in-memory cache, evicting the oldest beyond the limit.
+
+        Args:
+            job_id: The job's LinkedIn ID
+        """
+        with self.scraper_lock:
+            self._known_ids[job_id] = None
+            self._known_ids.move_to_end(job_id)
+            while len(self._known_ids) > self.KNOWN_JOB_IDS_LIMIT:
+                self._known_ids.popitem(last=False)
+
     def _get_chrome_paths(self, user_id: int) -> Tuple[Optional[str], Optional[str]]:
         """
         Get chrome paths from user preferences.
@@ -65,10 +215,7 @@ class ScraperService:
         Returns:
             chrome_executable_path, chrome_binary_location
         """
-        pref_service = PreferenceService()
-        tech_prefs = pref_service.get_preferences_by_category(
-            user_id, PreferenceService.CATEGORY_TECHNICAL
-        )
+        tech_prefs = self._get_prefs(user_id, PreferenceService.CATEGORY_TECHNICAL)
 
         chrome_executable_path = tech_prefs.get('chrome_executable_path')
         chrome_binary_location = tech_prefs.get('chrome_binary_location')
@@ -79,6 +226,21 @@ class ScraperService:
 
         return chrome_executable_path, chrome_binary_location
 
+    def _apply_chrome_paths(self, user_id: int) -> None:
+        """
+        Drop the scraper if the user's Chrome paths differ from the ones it was built with.
+
+        The scraper is otherwise kept across runs so its browser setup is reused.
+
+        Args:
+            user_id: The user's ID
+        """
+        chrome_paths = self._get_chrome_paths(user_id)
+        if chrome_paths != self._last_chrome_paths and self.scraper:
+            # We need to reinitialize the scraper with the new paths
+            self.scraper = None
+        self._last_chrome_paths = chrome_paths
+
     def _validate_file_path(self, path: Optional[str]) -> Optional[str]:
         """
         Validate if a file path exists.
@@ -141,7 +303,7 @@ class ScraperService:
                     chrome_binary_location=chrome_binary_location,  # Use provided path or None to auto-detect
                     chrome_options=None,
                     headless=True,  # Run in headless mode
-                    max_workers=1,  # Number of workers
+                    max_workers=ScrapingConstants.MAX_PARALLEL_QUERIES,  # Number of workers
                     slow_mo=0.5,  # Slow down to avoid detection
                     page_load_timeout=30  # Timeout in seconds
                 )
@@ -169,17 +331,19 @@ class ScraperService:
             return
 
         # Check if we have a list of allowed job IDs, and if so, check if this job is in the list
-        if self.allowed_job_ids and data.job_id not in self.allowed_job_ids:
+        if self.allowed_job_ids is not None and data.job_id not in self.allowed_job_ids:
             logger.debug(f"Skipping job not in allowed IDs list: {data.job_id}")
             return
 
-        # Check if we already found this job in this run
-        if data.job_id in self.current_jobs:
-            logger.debug(f"Duplicate job in current run: {data.job_id}")
-            return
+        # Queries run concurrently, so the duplicate check and the add must be atomic
+        with self.scraper_lock:
+            # Check if we already found this job in this run
+            if data.job_id in self.current_jobs:
+                logger.debug(f"Duplicate job in current run: {data.job_id}")
+                return
 
-        # Add to current jobs set
-        self.current_jobs.add(data.job_id)
+            # Add to current jobs set
+            self.current_jobs.add(data.job_id)
 
         # Process job data
         try:
@@ -196,65 +360,40 @@ class ScraperService:
 
             # Check if this is from a single URL job
             single_url_job = False
-            if hasattr(data, 'custom_data') and data.custom_data:
-                if 'single_url_job' in data.custom_data:
+            custom_data = getattr(data, 'custom_data', None) if _EVENT_DATA_HAS_CUSTOM_DATA else None
+            if custom_data:
+                if 'single_url_job' in custom_data:
                     single_url_job = True
-                    job_request_id = data.custom_data.get('job_request_id')
+                    job_request_id = custom_data.get('job_request_id')
                     self.pending_url_jobs[job_request_id] = job_data
 
-            # Check if job already exists
-            existing_job = self.db_service.get_job_by_id(data.job_id)
+            # Check if job already exists, skipping the query for cached job IDs
+            known_job = self._is_known_job(data.job_id)
+            existing_job = known_job or self.db_service.get_job_by_id(data.job_id)
 
             if not existing_job:
-                # Add new job listing
-                self.db_service.add_job_listing(job_data)
-
-                # Add initial state
-                self.db_service.add_job_state(
-                    data.job_id,
-                    self.current_user_id,
-                    JobStates.STATE_NEW_SCRAPED
-                )
-
-                # Add to queue for analysis
-                self.db_service.add_job_state(
-                    data.job_id,
-                    self.current_user_id,
-                    JobStates.STATE_QUEUED_FOR_ANALYSIS
-                )
+                # Add new job listing and queue it for analysis in one transaction
+                self.db_service.add_scraped_job(job_data, self.current_user_id, is_new=True)
+                self._remember_job(data.job_id)
 
                 logger.info(f"Added new job: {data.title} at {data.company}")
             else:
+                if not known_job:
+                    # Found by the lookup, so the next sighting can skip it
+                    self._remember_job(data.job_id)
+
                 # Check if this user already has a state for this job
                 current_state = self.db_service.get_current_job_state(
                     data.job_id, self.current_user_id
                 )
 
                 if not current_state:
-                    # First time this user has seen this job
-                    self.db_service.add_job_state(
-                        data.job_id,
-                        self.current_user_id,
-                        JobStates.STATE_NEW_SCRAPED
-                    )
-
-                    # Add to queue for analysis
-                    self.db_service.add_job_state(
-                        data.job_id,
-                        self.current_user_id,
-                        JobStates.STATE_QUEUED_FOR_ANALYSIS
-                    )
+                    # First time this user has seen this job, queue it for analysis. A cached
+                    # job may have been deleted since, so let the insert restore its listing
+                    self.db_service.add_scraped_job(job_data, self.current_user_id, is_new=known_job)
 
                     logger.info(f"Added existing job to user: {data.title}")
-                elif current_state['state'] not in [
-                    JobStates.STATE_ANALYZED,
-                    JobStates.STATE_RELEVANT,
-                    JobStates.STATE_IRRELEVANT,
-                    JobStates.STATE_VIEWED,
-                    JobStates.STATE_SAVED,
-                    JobStates.STATE_APPLIED,
-                    JobStates.STATE_REJECTED
-                ]:
+                elif current_state['state'] not in _POST_ANALYSIS_STATES:
                     # Job exists for this user but hasn't been analyzed yet
                     # Only queue it if it's not already in a post-analysis state
                     self.db_service.add_job_state(
@@ -267,21 +406,19 @@ class ScraperService:
                     logger.debug(f"Job already processed by user: {data.job_id}")
 
             # Call callback if provided
-            if self.callback:
-                try:
-                    self.callback("job_found", job_data)
-                except Exception as e:
-                    logger.error(f"Error in callback: {str(e)}")
-
-            # Check if we've found all the job IDs we're looking for
-            if self.allowed_job_ids and set(self.allowed_job_ids).issubset(self.current_jobs):
+            self._emit("job_found", job_data)
+
+            # Check if we've found all the job IDs we're looking for; only the
+            # event that finds the last remaining ID stops the scraper
+            with self.scraper_lock:
+                found_last = data.job_id in self._remaining_ids
+                self._remaining_ids.discard(data.job_id)
+                found_all = found_last and not self._remaining_ids
+
+            if found_all:
                 logger.info(f"Found all requested job IDs ({len(self.allowed_job_ids)}). Stopping scraper.")
                 # Call the end callback before stopping
-                if self.callback:
-                    try:
-                        self.callback("end", {"jobs_found": len(self.current_jobs), "early_termination": True})
-                    except Exception as e:
-                        logger.error(f"Error in callback: {str(e)}")
+                self._emit("end", {"jobs_found": len(self.current_jobs), "early_termination": True})
 
                 # Stop the scraper
                 if self.scraper:
@@ -303,26 +440,22 @@ class ScraperService:
         logger.error(f"Scraper error: {error}")
 
         # Call callback if provided
-        if self.callback:
-            try:
-                self.callback("error", {"error": str(error)})
-            except Exception as e:
-                logger.error(f"Error in callback: {str(e)}")
+        self._emit("error", {"error": str(error)})
 
     def _handle_end(self) -> None:
-        """Handle end of scraping session."""
-        logger.info(f"Scraping session ended. Found {len(self.current_jobs)} jobs.")
+        """
+        Handle the end of one query.
 
-        # Call callback if provided
-        if self.callback:
-            try:
-                self.callback("end", {"jobs_found": len(self.current_jobs)})
-            except Exception as e:
-                logger.error(f"Error in callback: {str(e)}")
+        The scraper emits this after every query, while other queries of the run may
+        still be going, so the run's end is reported by the scrape method instead.
+        """
+        logger.info(f"Scraping query ended. Found {len(self.current_jobs)} jobs so far.")
 
-        # Clear current jobs and allowed job IDs
+    def _reset_session(self) -> None:
+        """Clear the per-run scraping state."""
         self.current_jobs = set()
         self.allowed_job_ids = None
+        self._remaining_ids = set()
 
     def _map_experience_level(self, level: str) -> ExperienceLevelFilters:
         """
@@ -334,21 +467,28 @@ class ScraperService:
         Returns:
             filter: LinkedIn experience level filter
         """
-        level_map = {
-            "Internship": ExperienceLevelFilters.INTERNSHIP,
-            "Entry level": ExperienceLevelFilters.ENTRY_LEVEL,
-            "Associate": ExperienceLevelFilters.ASSOCIATE,
-            "Mid-Senior level": ExperienceLevelFilters.MID_SENIOR,
-            "Director": ExperienceLevelFilters.DIRECTOR,
-            "Executive": ExperienceLevelFilters.EXECUTIVE
-        }
+        return self._EXPERIENCE_LEVEL_MAP.get(level, ExperienceLevelFilters.MID_SENIOR)
 
-        return level_map.get(level, ExperienceLevelFilters.MID_SENIOR)
 
+    def _update_last_run(self, user_id: int) -> None:
+        """
+        Update the user's schedule last run time, skipping bursts of back-to-back scrapes.
+
+        Args:
+            user_id: The user's ID
+        """
+        now = time.monotonic()
+        last_written = self._last_run_written.get(user_id)
+        if last_written is not None and now - last_written < self.LAST_RUN_COALESCE_SECONDS:
+            return
+
+        self.db_service.update_last_run(user_id)
+        self._last_run_written[user_id] = now
 
     def scrape_jobs(self, user_id: int, callback: Optional[Callable] = None, job_limit: int = None) -> Dict[str, Any]:
         """
         Scrape jobs based on user preferences.
+        Runs one at a time; a call waits for any scrape already in progress.
 
         Args:
             user_id: The user's ID
@@ -358,22 +498,25 @@ class ScraperService:
         Returns:
             result: Dictionary with scraping statistics
         """
+        with self._run_lock:
+            return self._scrape_jobs(user_id, callback, job_limit)
+
+    def _scrape_jobs(self, user_id: int, callback: Optional[Callable], job_limit: Optional[int]) -> Dict[str, Any]:
+        """Scrape jobs based on user preferences; the caller holds _run_lock."""
         # Set current user and callback
         self.current_user_id = user_id
         self.callback = callback
-        self.current_jobs = set()
+        self._reset_session()
 
         # Check if we need to update the scraper with user's Chrome paths
-        chrome_executable_path, chrome_binary_location = self._get_chrome_paths(user_id)
-        if (chrome_executable_path or chrome_binary_location) and self.scraper:
-            # We need to reinitialize the scraper with the new paths
-            self.scraper = None
+        self._apply_chrome_paths(user_id)
 
         # Ensure scraper is initialized
         if not self._ensure_scraper_initialized():
-            if self.callback:
-                self.callback("error",
-                              {"error": "Failed to initialize LinkedIn scraper. Please check the ChromeDriver path."})
+            # Deliver through the pump like every other event, before returning
+            self._emit("error",
+                       {"error": "Failed to initialize LinkedIn scraper. Please check the ChromeDriver path."})
+            self._flush_callbacks()
             return {
                 "status": "error",
                 "error": "Failed to initialize LinkedIn scraper. Please check the ChromeDriver path.",
@@ -381,8 +524,7 @@ class ScraperService:
             }
 
         # Get user preferences
-        pref_service = PreferenceService()
-        search_prefs = pref_service.get_preferences_by_category(user_id, PreferenceService.CATEGORY_SEARCH)
+        search_prefs = self._get_prefs(user_id, PreferenceService.CATEGORY_SEARCH)
 
         # Extract search parameters
         job_titles = search_prefs.get('job_titles', Config.DEFAULT_SEARCH_TERMS)
@@ -394,48 +536,46 @@ class ScraperService:
         experience_filters = [self._map_experience_level(level) for level in experience_levels]
 
         try:
+            # The filters are the same for every query, so build them once
+            # Create the QueryFilters object without the 'remote' parameter
+            filters = QueryFilters(
+                relevance=RelevanceFilters.RELEVANT,
+                time=TimeFilters.MONTH,
+                type=[TypeFilters.FULL_TIME],
+                experience=experience_filters
+            )
+            # Check if the library has a specific method to set remote preference
+            if _FILTERS_HAVE_SET_REMOTE and remote_preference:
+                filters.set_remote(remote_preference)
+            elif _FILTERS_HAVE_REMOTE and remote_preference:
+                # Some libraries define constants instead
+                filters.type.append(QueryFilters.REMOTE)
+
+            # Set limit to job_limit if provided, otherwise use a higher default value
+            limit = min(job_limit if job_limit is not None else ScrapingConstants.DEFAULT_JOB_LIMIT, ScrapingConstants.MAX_JOB_LIMIT)
+
             # Define queries based on preferences
-            queries = []
-            for title in job_titles:
-                for location in locations:
-                    # Create the QueryFilters object without the 'remote' parameter
-                    filters = QueryFilters(
-                        relevance=RelevanceFilters.RELEVANT,
-                        time=TimeFilters.MONTH,
-                        type=[TypeFilters.FULL_TIME],
-                        experience=experience_filters
-                    )
-                    # Check if the library has a specific method to set remote preference
-                    if hasattr(filters, 'set_remote') and remote_preference:
-                        filters.set_remote(remote_preference)
-                    elif hasattr(QueryFilters, 'REMOTE') and remote_preference:
-                        # Some libraries define constants instead
-                        filters.type.append(QueryFilters.REMOTE)
-
-                    # Set limit to job_limit if provided, otherwise use a higher default value
-                    limit = min(job_limit if job_limit is not None else ScrapingConstants.DEFAULT_JOB_LIMIT, ScrapingConstants.MAX_JOB_LIMIT)
-
-                    queries.append(
-                        Query(
-                            query=title,
-                            options=QueryOptions(
-                                locations=[location],
-                                apply_link=False,
-                                limit=limit,
-                                filters=filters
-                            ),
-                        )
-                    )
+            queries = [
+                Query(
+                    query=title,
+                    options=QueryOptions(
+                        locations=[location],
+                        apply_link=False,
+                        limit=limit,
+                        filters=filters
+                    ),
+                )
+                for title in job_titles
+                for location in locations
+            ]
 
             # Start scraping
-            if self.callback:
-                self.callback("start", {"queries": len(queries)})
+            self._emit("start", {"queries": len(queries)})
 
-            # Run all queries without limiting by default
-            for query in queries:
-                self.scraper.run(query)
+            # Run all queries in one call; the scraper spreads them over its own workers
+            self.scraper.run(queries)
 
-                time.sleep(random.uniform(ScrapingConstants.QUERY_DELAY_MIN, ScrapingConstants.QUERY_DELAY_MAX))
+            self._emit("end", {"jobs_found": len(self.current_jobs)})
 
             return {
                 "status": "success",
@@ -445,8 +585,7 @@ class ScraperService:
 
         except Exception as e:
             logger.error(f"Error in scrape_jobs: {str(e)}")
-            if self.callback:
-                self.callback("error", {"error": str(e)})
+            self._emit("error", {"error": str(e)})
 
             return {
                 "status": "error",
@@ -455,13 +594,18 @@ class ScraperService:
             }
 
         finally:
+            # Deliver queued events before the caller sees the result
+            self._flush_callbacks()
+            self._reset_session()
+
             # Update schedule last run time
-            self.db_service.update_last_run(user_id)
+            self._update_last_run(user_id)
 
     def scrape_company_jobs(self, company_jobs_url: str, user_id: int, job_ids: List[str] = None,
                            callback: Optional[Callable] = None) -> Dict[str, Any]:
         """
         Scrape jobs from a company jobs URL with specific job IDs.
+        Runs one at a time, like scrape_jobs.
 
         Args:
             company_jobs_url: URL of the company jobs page
@@ -472,15 +616,22 @@ class ScraperService:
         Returns:
             result: Dictionary with scraping statistics
         """
+        with self._run_lock:
+            return self._scrape_company_jobs(company_jobs_url, user_id, job_ids, callback)
+
+    def _scrape_company_jobs(self, company_jobs_url: str, user_id: int, job_ids: Optional[List[str]],
+                             callback: Optional[Callable]) -> Dict[str, Any]:
+        """Scrape jobs from a company jobs URL with specific job IDs; the caller holds _run_lock."""
         # Set current user and callback
         self.current_user_id = user_id
         self.callback = callback
-        self.current_jobs = set()
+        self._reset_session()
 
         # Set allowed job IDs for filtering
         if job_ids:
             # Convert job IDs to strings if they aren't already
-            self.allowed_job_ids = [str(job_id) for job_id in job_ids]
+            self.allowed_job_ids = frozenset(map(str, job_ids))
+            self._remaining_ids = set(self.allowed_job_ids)
             logger.info(f"Will filter for {len(self.allowed_job_ids)} job IDs")
         else:
             logger.warning("No job IDs provided for filtering")
@@ -491,16 +642,14 @@ class ScraperService:
             }
 
         # Check if we need to update the scraper with user's Chrome paths
-        chrome_executable_path, chrome_binary_location = self._get_chrome_paths(user_id)
-        if (chrome_executable_path or chrome_binary_location) and self.scraper:
-            # We need to reinitialize the scraper with the new paths
-            self.scraper = None
+        self._apply_chrome_paths(user_id)
 
         # Ensure scraper is initialized
         if not self._ensure_scraper_initialized():
-            if self.callback:
-                self.callback("error",
-                              {"error": "Failed to initialize LinkedIn scraper. Please check the ChromeDriver path."})
+            # Deliver through the pump like every other event, before returning
+            self._emit("error",
+                       {"error": "Failed to initialize LinkedIn scraper. Please check the ChromeDriver path."})
+            self._flush_callbacks()
             return {
                 "status": "error",
                 "error": "Failed to initialize LinkedIn scraper. Please check the ChromeDriver path.",
@@ -509,8 +658,7 @@ class ScraperService:
 
         try:
             # Get user preferences for location
-            pref_service = PreferenceService()
-            search_prefs = pref_service.get_preferences_by_category(user_id, PreferenceService.CATEGORY_SEARCH)
+            search_prefs = self._get_prefs(user_id, PreferenceService.CATEGORY_SEARCH)
 
             # Extract locations from preferences (use the first one as default)
             preferred_locations = search_prefs.get('locations', Config.DEFAULT_LOCATIONS)
@@ -534,8 +682,7 @@ class ScraperService:
             )
 
             # Start scraping
-            if self.callback:
-                self.callback("start", {"company_url": company_jobs_url, "job_ids": job_ids})
+            self._emit("start", {"company_url": company_jobs_url, "job_ids": job_ids})
 
             # Log the job IDs we're filtering for
             logger.info(f"Filtering for job IDs: {job_ids}")
@@ -543,6 +690,10 @@ class ScraperService:
             # Run the query
             self.scraper.run([query])
 
+            # Finding the last requested ID already reported the end
+            if self._remaining_ids:
+                self._emit("end", {"jobs_found": len(self.current_jobs)})
+
             return {
                 "status": "success",
                 "jobs_found": len(self.current_jobs),
@@ -551,11 +702,15 @@ class ScraperService:
 
         except Exception as e:
             logger.error(f"Error in scrape_company_jobs: {str(e)}")
-            if self.callback:
-                self.callback("error", {"error": str(e)})
+            self._emit("error", {"error": str(e)})
 
             return {
                 "status": "error",
                 "error": str(e),
                 "jobs_found": len(self.current_jobs)
-            }
\ No newline at end of file
+            }
+
+        finally:
+            # Deliver queued events before the caller sees the result
+            self._flush_callbacks()
+            self._reset_session()
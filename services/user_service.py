@@ -1,17 +1,33 @@
+import asyncio
 import bcrypt
 import datetime
+import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Tuple
 
 from database.db_manager import DatabaseManager
 from database.models import Users
 from services.preference_service import PreferenceService
 
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import InvalidHashError, VerificationError
+    _PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+except ImportError:  # argon2-cffi is optional, fall back to bcrypt
+    _PASSWORD_HASHER = None
+
+# Prefix of argon2 encoded hashes; anything else is a bcrypt hash
+_ARGON2_PREFIX = '$argon2'
+
 
 class UserService:
     """
     Service for user management, authentication, and registration.
     """
 
+    # Shared pool for the async variants; password hashing is CPU-bound, so size it by cores
+    _HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
     def __init__(self):
         """Initialize the user service with database connection"""
         self.db_manager = DatabaseManager()
@@ -40,6 +56,45 @@ class UserService:
         # Hash the password
         password_hash = self._hash_password(password)
 
+        return self._insert_user(username, password_hash, email)
+
+    async def create_user_async(self, username: str, password: str, email: str = None) -> int:
+        """
+        Create a new user, hashing the password on the hashing pool.
+
+        Args:
+            username: Unique username for the user
+            password: Plain text password (will be hashed)
+            email: Optional email address
+
+        Returns:
+            user_id: The ID of the created user
+
+        Raises:
+            ValueError: If username already exists
+        """
+        # Check if username already exists
+        existing_user = self.get_user_by_username(username)
+        if existing_user:
+            raise ValueError(f"Username '{username}' already exists")
+
+        # Hash the password
+        password_hash = await self._hash_password_async(password)
+
+        return self._insert_user(username, password_hash, email)
+
+    def _insert_user(self, username: str, password_hash: str, email: Optional[str]) -> int:
+        """
+        Insert a user record and set up their default preferences.
+
+        Args:
+            username: Unique username for the user
+            password_hash: Hashed password
+            email: Optional email address
+
+        Returns:
+            user_id: The ID of the created user
+        """
         # Insert the user into the database
         query = f"""
         INSERT INTO {Users.TABLE_NAME} (username, password_hash, email, created_at)
@@ -76,6 +131,41 @@ class UserService:
         if not self._verify_password(password, user['password_hash']):
             return None
 
+        # Upgrade legacy hashes now that the plain password is at hand
+        if self._needs_rehash(user['password_hash']):
+            self._rehash_password(user['user_id'], password)
+
+        # Update last login time
+        self._update_last_login(user['user_id'])
+
+        return user
+
+    async def authenticate_async(self, username: str, password: str) -> Optional[Dict[str, Any]]:
+        """
+        Authenticate a user, verifying the password on the hashing pool.
+
+        Args:
+            username: User's username
+            password: Plain text password to verify
+
+        Returns:
+            user: User record if authentication succeeds, None otherwise
+        """
+        # Get the user by username
+        user = self.get_user_by_username(username)
+        if not user:
+            return None
+
+        # Verify the password
+        if not await self._verify_password_async(password, user['password_hash']):
+            return None
+
+        # Upgrade legacy hashes now that the plain password is at hand
+        if self._needs_rehash(user['password_hash']):
+            await asyncio.get_running_loop().run_in_executor(
+                self._HASH_POOL, self._rehash_password, user['user_id'], password
+            )
+
         # Update last login time
         self._update_last_login(user['user_id'])
 
@@ -132,7 +222,7 @@ class UserService:
 
     def _hash_password(self, password: str) -> str:
         """
-        Hash a password using bcrypt.
+        Hash a password using argon2id, or bcrypt if argon2-cffi is not installed.
 
         Args:
             password: Plain text password
@@ -140,6 +230,9 @@ class UserService:
         Returns:
             password_hash: Hashed password
         """
+        if _PASSWORD_HASHER is not None:
+            return _PASSWORD_HASHER.hash(password)
+
         password_bytes = password.encode('utf-8')
         salt = bcrypt.gensalt()
         hashed = bcrypt.hashpw(password_bytes, salt)
@@ -147,7 +240,7 @@ class UserService:
 
     def _verify_password(self, password: str, password_hash: str) -> bool:
         """
-        Verify a password against a hash.
+        Verify a password against an argon2 or bcrypt hash.
 
         Args:
             password: Plain text password
@@ -156,10 +249,78 @@ class UserService:
         Returns:
             is_valid: True if the password matches the hash, False otherwise
         """
+        if password_hash.startswith(_ARGON2_PREFIX):
+            if _PASSWORD_HASHER is None:
+                return False
+            try:
+                return _PASSWORD_HASHER.verify(password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+
         password_bytes = password.encode('utf-8')
         hash_bytes = password_hash.encode('utf-8')
         return bcrypt.checkpw(password_bytes, hash_bytes)
 
+    def _needs_rehash(self, password_hash: str) -> bool:
+        """
+        Check whether a stored hash should be replaced by a current argon2 hash.
+
+        Args:
+            password_hash: Hashed password
+
+        Returns:
+            needs_rehash: True for bcrypt hashes or outdated argon2 parameters
+        """
+        if _PASSWORD_HASHER is None:
+            return False
+        if not password_hash.startswith(_ARGON2_PREFIX):
+            return True
+        return _PASSWORD_HASHER.check_needs_rehash(password_hash)
+
+    def _rehash_password(self, user_id: int, password: str) -> None:
+        """
+        Store a fresh hash of a verified password.
+
+        Args:
+            user_id: The user's ID
+            password: Plain text password
+        """
+        query = f"""
+        UPDATE {Users.TABLE_NAME}
+        SET password_hash = ?
+        WHERE user_id = ?
+        """
+        self.db_manager.execute_write(query, (self._hash_password(password), user_id))
+
+    async def _hash_password_async(self, password: str) -> str:
+        """
+        Hash a password without blocking the event loop.
+
+        Args:
+            password: Plain text password
+
+        Returns:
+            password_hash: Hashed password
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._HASH_POOL, self._hash_password, password
+        )
+
+    async def _verify_password_async(self, password: str, password_hash: str) -> bool:
+        """
+        Verify a password against a hash without blocking the event loop.
+
+        Args:
+            password: Plain text password
+            password_hash: Hashed password
+
+        Returns:
+            is_valid: True if the password matches the hash, False otherwise
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._HASH_POOL, self._verify_password, password, password_hash
+        )
+
     def change_password(self, user_id: int, current_password: str, new_password: str) -> bool:
         """
         Change a user's password.
@@ -175,20 +336,13 @@ class UserService:
         Raises:
             ValueError: If current password is incorrect
         """
-        # Get the user
-        user = self.get_user_by_id(user_id)
+        # Get the user and their current password hash in one query
+        password_query = f"SELECT user_id, password_hash FROM {Users.TABLE_NAME} WHERE user_id = ?"
+        user = self.db_manager.get_one(password_query, (user_id,))
         if not user:
             return False
 
-        # Get current password hash
-        password_query = f"SELECT password_hash FROM {Users.TABLE_NAME} WHERE user_id = ?"
-        password_result = self.db_manager.get_one(password_query, (user_id,))
-
-        # This check is needed to handle potential database inconsistencies
-        if not password_result:
-            return False
-
-        current_hash = password_result['password_hash']
+        current_hash = user['password_hash']
 
         # Verify current password
         if not self._verify_password(current_password, current_hash):
@@ -197,15 +351,16 @@ class UserService:
         # Hash the new password
         new_hash = self._hash_password(new_password)
 
-        # Update the password
+        # Update the password, unless it was changed since it was verified
         query = f"""
         UPDATE {Users.TABLE_NAME}
         SET password_hash = ?
-        WHERE user_id = ?
+        WHERE user_id = ? AND password_hash = ?
+        RETURNING user_id
         """
-        self.db_manager.execute_write(query, (new_hash, user_id))
+        updated = self.db_manager.execute_returning(query, (new_hash, user_id, current_hash))
 
-        return True
+        return updated is not None
 
     def get_all_users(self) -> list:
         """
@@ -1,29 +1,86 @@
 import pytest
-import os
+import logging
+import random
 import sqlite3
-import tempfile
-from unittest.mock import patch, MagicMock
+import uuid
+import importlib
+from types import MappingProxyType, SimpleNamespace
+import contextlib
+from contextlib import contextmanager
+from unittest.mock import patch, MagicMock, DEFAULT
 
-from database.db_manager import DatabaseManager
-from tests.mock_db_manager import MockDatabaseManager  # Import the mock
+from tests.mock_db_manager import get_mock_db_manager  # Import the mock
+
+# Test databases are throwaway, so durability is traded for speed
+_TEST_PRAGMAS = (
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # 64 MB
+    "PRAGMA mmap_size = 268435456",  # 256 MB
+)
+
+
+def _freeze(obj):
+    """
+    Recursively turn dicts into read-only mappings and lists into tuples.
+    Sample data is shared by every test in a module; tests that need to
+    change it take a mutable copy with copy.deepcopy.
+    """
+    if isinstance(obj, dict):
+        return MappingProxyType({key: _freeze(value) for key, value in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(item) for item in obj)
+    return obj
+
+
+def _tune_for_tests(db_manager, wal: bool = True) -> None:
+    """
+    Apply speed-over-durability PRAGMAs to a test database connection.
+    WAL is skipped for in-memory databases, which don't support it.
+    """
+    conn = db_manager.get_connection()
+    if wal:
+        conn.execute("PRAGMA journal_mode = WAL")
+    for pragma in _TEST_PRAGMAS:
+        conn.execute(pragma)
+
+
+def pytest_configure(config):
+    """Ignore DeprecationWarnings; pytest resets warning filters per test, so use its own."""
+    config.addinivalue_line("filterwarnings", "ignore::DeprecationWarning")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _test_env():
+    """
+    Configure logging and the random seed once for the whole session.
+    Service modules call logging.basicConfig at import, so the root level is reset here.
+    """
+    logging.getLogger().setLevel(logging.WARNING)
+    random.seed(0)
+    yield
+
+
+@pytest.fixture(scope="session")
+def _mock_db_manager_instance():
+    """Share the MockDatabaseManager singleton for the session, starting from clean mocks."""
+    mock_manager = get_mock_db_manager()
+    mock_manager.reset_all_mocks()
+
+    return mock_manager
 
 
 @pytest.fixture
-def mock_db_manager():
+def mock_db_manager(_mock_db_manager_instance):
     """
     Create a MockDatabaseManager instance for unit testing.
     This completely avoids database connections.
     """
-    # Clear any existing singleton instance
-    MockDatabaseManager._instance = None
-
-    # Create new mock instance
-    mock_manager = MockDatabaseManager()
-
     # Return the mock for use in tests
-    yield mock_manager
+    yield _mock_db_manager_instance
 
-    # No cleanup needed
+    # Reset the shared mocks so the next test starts clean
+    _mock_db_manager_instance.reset_all_mocks()
 
 
 @pytest.fixture
@@ -33,7 +90,7 @@ def patch_db_manager():
     This is useful for testing services that create their own DatabaseManager instances.
     """
     # Create a mock instance
-    mock_manager = MockDatabaseManager()
+    mock_manager = get_mock_db_manager()
 
     # Patch the get_instance method to return our mock
     with patch('services.preference_service.DatabaseManager') as mock_db_class:
@@ -47,55 +104,349 @@ def patch_db_manager():
 
 
 @pytest.fixture
+def memory_db_config(monkeypatch):
+    """
+    Point DatabaseManager at a shared in-memory database and clear its singleton.
+    Both are restored automatically when the test ends.
+    """
+    from database.db_manager import Config, DatabaseManager
+
+    monkeypatch.setattr(Config, 'DATABASE_PATH', ':memory:')
+    monkeypatch.setattr(DatabaseManager, '_instance', None)
+    return Config
+
+
+@pytest.fixture(scope="module")
+def _module_db_manager():
+    """
+    Build one in-memory DatabaseManager per test module, so the schema is created once.
+    The singleton is restored straight away; tests that exercise construction use memory_db_config.
+    """
+    from database.db_manager import Config, DatabaseManager
+
+    previous_instance = DatabaseManager._instance
+    DatabaseManager._instance = None
+    try:
+        with patch.object(Config, 'DATABASE_PATH', ':memory:'):
+            manager = DatabaseManager()
+    finally:
+        DatabaseManager._instance = previous_instance
+
+    yield manager
+
+    # Close any open connections
+    manager.close_all()
+
+
+@pytest.fixture
+def db_manager(_module_db_manager):
+    """
+    An in-memory DatabaseManager shared by the tests in a module.
+    Tests create uniquely named tables or clean up after themselves.
+    """
+    return _module_db_manager
+
+
+@pytest.fixture
+def seeded_db(db_manager):
+    """
+    A db_manager with a small table t(id, value) holding the rows v1, v2 and v3.
+    """
+    with db_manager.transaction() as conn:
+        conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO t (value) VALUES (?)", [("v1",), ("v2",), ("v3",)])
+    yield db_manager
+
+    # The shared-cache in-memory database outlives this manager while other connections
+    # to it are open, so the table is dropped rather than left for the next test
+    with db_manager.transaction() as conn:
+        conn.execute("DROP TABLE t")
+
+
+@pytest.fixture(scope="session")
 def in_memory_db():
     """
     Create an in-memory SQLite database for testing.
-    This fixture can be used for tests that need direct database access.
+    The schema is built once per session; use db_tx for per-test isolation.
     """
-    # Configure the DB manager to use in-memory database
-    with patch('database.db_manager.Config') as mock_config:
-        mock_config.DATABASE_PATH = ':memory:'
+    # Imported here so test files that never touch SQLite don't load it at collection
+    from database.db_manager import Config, DatabaseManager
 
-        # Clear any existing singleton instance
-        DatabaseManager._instance = None
+    # A uniquely named shared-cache database, so every connection in the session sees
+    # the same schema and no other in-memory database is touched
+    db_uri = f"file:testdb_{uuid.uuid4().hex}?mode=memory&cache=shared"
 
+    # The database lives as long as one connection to it is open
+    sentinel = sqlite3.connect(db_uri, uri=True)
+
+    # Clear any existing singleton instance, keeping it to restore afterwards
+    previous_instance = DatabaseManager._instance
+    DatabaseManager._instance = None
+
+    # Point the DB manager at the in-memory database; the instance keeps the path once built
+    with patch.object(Config, 'DATABASE_PATH', db_uri):
         # Create a new instance
         db_manager = DatabaseManager()
+    _tune_for_tests(db_manager, wal=False)
+
+    # Return the db_manager for use in tests
+    yield db_manager
+
+    # Clean up
+    db_manager.close_all()
+    DatabaseManager._instance = previous_instance
+    sentinel.close()
 
-        # Return the db_manager for use in tests
+
+@contextmanager
+def _rolled_back(db_manager):
+    """
+    Run the enclosed block inside a savepoint on db_manager's connection for this thread,
+    then roll everything back.
+    """
+    conn = db_manager.get_connection()
+
+    @contextmanager
+    def nested_transaction():
+        # Commits would end the test savepoint, so each transaction becomes a nested savepoint
+        conn.execute("SAVEPOINT operation")
+        try:
+            yield conn
+            conn.execute("RELEASE operation")
+        except Exception:
+            conn.execute("ROLLBACK TO operation")
+            conn.execute("RELEASE operation")
+            raise
+
+    conn.execute("SAVEPOINT test_case")
+    try:
+        with patch.object(db_manager, 'transaction', nested_transaction):
+            yield db_manager
+    finally:
+        conn.execute("ROLLBACK TO test_case")
+        conn.execute("RELEASE test_case")
+
+
+@pytest.fixture
+def db_tx(in_memory_db):
+    """
+    Run a test against the session in-memory database inside a savepoint.
+    Everything the test writes is rolled back afterwards, so tests stay isolated
+    without rebuilding the schema.
+    """
+    from database.db_manager import DatabaseManager
+
+    previous_instance = DatabaseManager._instance
+    DatabaseManager._instance = in_memory_db
+    try:
+        with _rolled_back(in_memory_db):
+            yield in_memory_db
+    finally:
+        DatabaseManager._instance = previous_instance
+
+
+@pytest.fixture
+def app_db_tx(app_and_orchestrator):
+    """
+    Run a test against the app's database inside a savepoint that is rolled back afterwards.
+    Only writes made on the test's own thread are covered.
+    """
+    _, orchestrator = app_and_orchestrator
+    with _rolled_back(orchestrator.db_service.db_manager) as db_manager:
         yield db_manager
 
-        # Clean up
-        db_manager.close_all()
+
+@contextmanager
+def _pointed_at(db_manager, connection_string, use_uri=False):
+    """
+    Point db_manager at another database, with its own connection pool, for the enclosed block.
+    Every service shares the singleton manager, so the whole app follows, background threads included.
+    """
+    pool = {}
+    with patch.multiple(db_manager, connection_string=connection_string, use_uri=use_uri, connection_pool=pool):
+        try:
+            yield db_manager
+        finally:
+            for conn in pool.values():
+                conn.close()
+
+
+@pytest.fixture(scope="session")
+def db_template(app_and_orchestrator):
+    """
+    Build a populated in-memory database once per session: the full schema plus the test user.
+    app_template_db restores a copy of it for each test instead of re-running schema setup and seeding.
+    """
+    from database.models import create_all_tables
+
+    _, orchestrator = app_and_orchestrator
+    db_uri = f"file:template_{uuid.uuid4().hex}?mode=memory&cache=shared"
+
+    # The database lives as long as one connection to it is open
+    template = sqlite3.connect(db_uri, uri=True)
+    with _pointed_at(orchestrator.db_service.db_manager, db_uri, use_uri=True) as db_manager:
+        with db_manager.transaction() as conn:
+            create_all_tables(conn)
+        user_id = orchestrator.user_service.create_user('testuser', 'Password123!', 'test@example.com')
+
+    yield SimpleNamespace(connection=template, user_id=user_id)
+
+    template.close()
 
 
 @pytest.fixture
-def temp_db_file():
+def app_template_db(app_and_orchestrator, db_template, tmp_path):
+    """
+    Run a test with the app pointed at a fresh copy of db_template.
+    Unlike app_db_tx this also isolates writes made by background threads. The copy is a file
+    rather than another shared-cache in-memory database, whose table locks fail concurrent writers
+    instead of making them wait.
+    """
+    _, orchestrator = app_and_orchestrator
+    db_path = str(tmp_path / 'jobsearch.db')
+
+    with contextlib.closing(sqlite3.connect(db_path)) as live:
+        db_template.connection.backup(live)
+    with _pointed_at(orchestrator.db_service.db_manager, db_path) as db_manager:
+        yield db_manager
+
+
+@pytest.fixture(scope="session")
+def temp_db_file(tmp_path_factory):
     """
     Create a temporary SQLite database file for testing.
-    This fixture can be used for tests that need a persistent file-based database.
+    One file is created per session for tests that need a persistent file-based database.
     """
-    # Create a temporary file
-    fd, temp_path = tempfile.mkstemp(suffix='.db')
-    os.close(fd)  # Close the file descriptor
+    from database.db_manager import Config, DatabaseManager
 
-    # Configure the DB manager to use the temporary file
-    with patch('database.db_manager.Config') as mock_config:
-        mock_config.DATABASE_PATH = temp_path
+    # pytest owns the session temp directory and removes it, so no manual cleanup is needed
+    temp_path = str(tmp_path_factory.mktemp("db") / "test.db")
 
-        # Clear any existing singleton instance
-        DatabaseManager._instance = None
+    # Clear any existing singleton instance, keeping it to restore afterwards
+    previous_instance = DatabaseManager._instance
+    DatabaseManager._instance = None
 
+    # Point the DB manager at the temporary file; the instance keeps the path once built
+    with patch.object(Config, 'DATABASE_PATH', temp_path):
         # Create a new instance
         db_manager = DatabaseManager()
+    _tune_for_tests(db_manager)
 
-        # Return the db_manager and path for use in tests
-        yield db_manager, temp_path
+    # Return the db_manager and path for use in tests
+    yield db_manager, temp_path
+
+    # Clean up
+    db_manager.close_all()
+    DatabaseManager._instance = previous_instance
+
+
+@pytest.fixture(scope="session")
+def app_and_orchestrator():
+    """
+    Import the Flask app and its orchestrator once for the whole session.
+    The LinkedIn scraper and OpenAI client are patched while the services are built.
+    """
+    with patch('services.scraper_service.LinkedinScraper') as mock_scraper_class, \
+            patch('services.llm_provider.OpenAI'):
+        # Create a mock instance that will be returned by the LinkedinScraper constructor
+        mock_scraper_class.return_value.on = MagicMock()
+
+        from app import app, orchestrator
+
+    yield app, orchestrator
+
+
+@pytest.fixture(scope="module")
+def mock_linkedin_scraper(app_and_orchestrator):
+    """
+    Patch the LinkedIn scraper class once per module and yield the instance it returns.
+    The scheduler's scraper service may already hold a scraper from app import, so it is swapped too.
+    """
+    _, orchestrator = app_and_orchestrator
+    with patch('services.scraper_service.LinkedinScraper') as mock_scraper_class, \
+            patch.object(orchestrator.scheduler_service.scraper_service, 'scraper', mock_scraper_class.return_value):
+        yield mock_scraper_class.return_value
+
+
+@pytest.fixture(scope="module")
+def mock_openai_provider(app_and_orchestrator):
+    """
+    Route the scheduler's title and description analyzers through one fake OpenAIProvider per module.
+    The analyzers are built when the app is imported, so the provider is swapped on them directly;
+    tests set client.chat.completions.create.side_effect to script the LLM responses.
+    """
+    from services.llm_provider import OpenAIProvider
 
-        # Clean up
-        db_manager.close_all()
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+    _, orchestrator = app_and_orchestrator
+    with patch('services.llm_provider.OpenAI'):
+        fake_provider = OpenAIProvider(api_key='test', model='test')
+
+    job_analysis_service = orchestrator.scheduler_service.analysis_service.job_analysis_service
+    with patch.object(job_analysis_service.title_analyzer, 'llm_provider', fake_provider), \
+            patch.object(job_analysis_service.description_analyzer, 'llm_provider', fake_provider):
+        yield fake_provider
+
+
+@pytest.fixture(scope="session")
+def seed_user(app_and_orchestrator):
+    """
+    Make sure 'testuser' exists, once per session, and return its user ID.
+    """
+    _, orchestrator = app_and_orchestrator
+    try:
+        return orchestrator.user_service.create_user('testuser', 'Password123!', 'test@example.com')
+    except ValueError:
+        # User already exists
+        return orchestrator.user_service.get_user_by_username('testuser')['user_id']
+
+
+class _CallRecorder:
+    """Records calls and returns a fixed value; much cheaper to build than a MagicMock."""
+    __slots__ = ('calls', 'return_value')
+
+    def __init__(self, return_value=None):
+        self.calls = []
+        self.return_value = return_value
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self.return_value
+
+    def assert_called_once_with(self, *args, **kwargs):
+        assert self.calls == [(args, kwargs)], f"Expected one call with {(args, kwargs)}, got {self.calls}"
+
+
+@pytest.fixture
+def render_template_stub(request, app_and_orchestrator):
+    """
+    Swap app.render_template for a call recorder by plain attribute assignment.
+    unittest classes using this through usefixtures get it as self.mock_render.
+    """
+    app_module = importlib.import_module('app')
+    stub = _CallRecorder("Mocked template")
+    original = app_module.render_template
+    app_module.render_template = stub
+    if request.instance is not None:
+        request.instance.mock_render = stub
+    yield stub
+    app_module.render_template = original
+
+
+@pytest.fixture
+def logged_in_user(request):
+    """
+    Make flask_login's current_user an authenticated user with ID 1.
+    unittest classes using this through usefixtures get it as self.mock_user.
+    """
+    import flask_login.utils as login_utils
+
+    user = SimpleNamespace(id=1, is_authenticated=True)
+    original = login_utils._get_user
+    login_utils._get_user = lambda: user
+    if request.instance is not None:
+        request.instance.mock_user = user
+    yield user
+    login_utils._get_user = original
 
 
 @pytest.fixture
@@ -104,31 +455,29 @@ def mocked_services():
     Create mocks for all services.
     This fixture can be used for testing high-level components that depend on multiple services.
     """
-    with patch('services.orchestrator_service.UserService') as mock_user_service, \
-            patch('services.orchestrator_service.DatabaseService') as mock_db_service, \
-            patch('services.orchestrator_service.PreferenceService') as mock_pref_service, \
-            patch('services.orchestrator_service.ScraperService') as mock_scraper_service, \
-            patch('services.orchestrator_service.AnalysisService') as mock_analysis_service, \
-            patch('services.orchestrator_service.SchedulerService') as mock_scheduler_service:
-        # Configure mocks
-        services = {
-            'user_service': mock_user_service.return_value,
-            'db_service': mock_db_service.return_value,
-            'pref_service': mock_pref_service.return_value,
-            'scraper_service': mock_scraper_service.return_value,
-            'analysis_service': mock_analysis_service.return_value,
-            'scheduler_service': mock_scheduler_service.return_value
-        }
+    # One patcher for every service class, keyed by the name each test looks them up by
+    service_names = {
+        'UserService': 'user_service',
+        'DatabaseService': 'db_service',
+        'PreferenceService': 'pref_service',
+        'ScraperService': 'scraper_service',
+        'SchedulerService': 'scheduler_service'
+    }
+    with patch.multiple('services.orchestrator_service', AnalysisServiceFactory=DEFAULT,
+                        **{name: DEFAULT for name in service_names}) as mocks:
+        # Configure mocks; the analysis service comes from its factory
+        services = {key: mocks[name].return_value for name, key in service_names.items()}
+        services['analysis_service'] = mocks['AnalysisServiceFactory'].create_analysis_service.return_value
 
         yield services
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_job_data():
     """
     Create sample job data for testing.
     """
-    return {
+    return _freeze({
         'job_id': 'job123',
         'title': 'Senior AI Engineer',
         'company': 'Tech Corp',
@@ -137,27 +486,27 @@ def sample_job_data():
         'url': 'https://example.com/jobs/123',
         'source_term': 'AI Engineer',
         'scraped_at': '2023-01-01T12:00:00'
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_user_data():
     """
     Create sample user data for testing.
     """
-    return {
+    return _freeze({
         'username': 'testuser',
         'password': 'Password123!',
         'email': 'test@example.com'
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_analysis_data():
     """
     Create sample job analysis data for testing.
     """
-    return {
+    return _freeze({
         'title_analysis': {
             'title_keywords': ['AI', 'Engineer'],
             'matches_pattern': True,
@@ -174,15 +523,15 @@ def sample_analysis_data():
             'reasoning': 'Has all required skills'
         },
         'relevance_score': 0.85
-    }
+    })
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_preferences_data():
     """
     Create sample user preferences data for testing.
     """
-    return {
+    return _freeze({
         'search': {
             'job_titles': ['AI Engineer', 'Machine Learning Engineer'],
             'locations': ['Remote', 'New York, NY'],
@@ -201,4 +550,4 @@ def sample_preferences_data():
             'execution_time': '08:00',
             'notifications_enabled': True
         }
-    }
\ No newline at end of file
+    })
\ No newline at end of file
@@ -4,29 +4,36 @@ This module provides a mock implementation of the DatabaseManager for unit tests
 """
 
 from unittest.mock import MagicMock
-from typing import Any, Dict, List, Optional, Tuple, Union, Self
-from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+class _MockConnectionContext:
+    """Reusable context manager that hands out the same mock connection on every entry"""
+    __slots__ = ('_conn',)
+
+    def __init__(self, conn: MagicMock) -> None:
+        self._conn = conn
+
+    def __enter__(self) -> MagicMock:
+        return self._conn
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
 
 
 class MockDatabaseManager:
     """
     Mock implementation of DatabaseManager for testing.
     This class mocks all methods of DatabaseManager to avoid actual database operations.
+    Use get_mock_db_manager() to get the shared instance.
     """
-    _instance = None
-
-    def __new__(cls) -> Self:
-        """Create singleton instance"""
-        if cls._instance is None:
-            cls._instance = super(MockDatabaseManager, cls).__new__(cls)
-            cls._instance._initialize()
-        return cls._instance
 
     def _initialize(self) -> None:
         """Initialize mock database manager"""
         self.get_connection = MagicMock()
         self.execute_query = MagicMock()
         self.execute_write = MagicMock()
+        self.execute_returning = MagicMock()
         self.execute_many = MagicMock()
         self.get_one = MagicMock()
         self.table_exists = MagicMock()
@@ -36,29 +43,40 @@ class MockDatabaseManager:
         self.get_one.return_value = None
         self.execute_query.return_value = []
         self.execute_write.return_value = 1
+        self.execute_returning.return_value = None
         self.table_exists.return_value = True
 
         # Add connection context manager
         self.transaction = MagicMock()
+        self._connection_context = _MockConnectionContext(MagicMock())
 
-    @contextmanager
-    def get_connection_context(self):
+    def get_connection_context(self) -> _MockConnectionContext:
         """Context manager for mock connection"""
-        yield MagicMock()
+        return self._connection_context
 
     def reset_all_mocks(self) -> None:
         """Reset all mocks to their initial state"""
-        self.get_connection.reset_mock()
-        self.execute_query.reset_mock()
-        self.execute_write.reset_mock()
-        self.execute_many.reset_mock()
-        self.get_one.reset_mock()
-        self.table_exists.reset_mock()
-        self.close_all.reset_mock()
-        self.transaction.reset_mock()
+        # Side effects and return values set by a test must not leak into the next one
+        for mock in (self.get_connection, self.execute_query, self.execute_write,
+                     self.execute_returning, self.execute_many, self.get_one,
+                     self.table_exists, self.close_all, self.transaction):
+            mock.reset_mock(return_value=True, side_effect=True)
+        # The context's connection is shared across tests, so it is reset too
+        self._connection_context._conn.reset_mock(return_value=True, side_effect=True)
 
         # Reset default return values
         self.get_one.return_value = None
         self.execute_query.return_value = []
         self.execute_write.return_value = 1
-        self.table_exists.return_value = True
\ No newline at end of file
+        self.execute_returning.return_value = None
+        self.table_exists.return_value = True
+
+
+# Tests always share one mock manager, so it is built once at import time
+_SINGLETON = object.__new__(MockDatabaseManager)
+_SINGLETON._initialize()
+
+
+def get_mock_db_manager() -> MockDatabaseManager:
+    """Return the shared MockDatabaseManager instance"""
+    return _SINGLETON
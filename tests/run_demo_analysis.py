@@ -7,7 +7,7 @@ This script directly uses the AnalysisService to analyze a job.
 import sys
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +20,16 @@ from services.analysis_service import AnalysisService
 from services.database_service import DatabaseService
 from services.preference_service import PreferenceService
 
+# Constant SQL text, so the connection's prepared-statement cache is hit on repeat runs.
+# Returns full job rows, so they don't have to be fetched again before analysis.
+RANDOM_JOB_SQL = """
+    SELECT DISTINCT j.*
+    FROM job_listings j
+    JOIN job_states s ON j.job_id = s.job_id
+    WHERE s.user_id = ?
+    LIMIT ?
+"""
+
 def analyze_specific_job(job_id: str, user_id: int) -> Dict[str, Any]:
     """
     Analyze a specific job for a user.
@@ -31,56 +41,75 @@ def analyze_specific_job(job_id: str, user_id: int) -> Dict[str, Any]:
     Returns:
         result: Analysis result
     """
-    analysis_service = AnalysisService()
     db_service = DatabaseService()
     
     # Get the job
     job = db_service.get_job_by_id(job_id)
     if not job:
-        logger.error(f"Job not found: {job_id}")
+        logger.error("Job not found: %s", job_id)
         return {"error": "Job not found"}
     
-    logger.info(f"Found job: {job['title']} at {job['company']}")
+    return analyze_specific_job_row(job, user_id)
+
+def analyze_specific_job_row(job: Dict[str, Any], user_id: int,
+                             analysis_service: AnalysisService = None) -> Dict[str, Any]:
+    """
+    Analyze a job row that has already been fetched.
     
-    # Create a callback function to log progress
-    def progress_callback(event: str, data: Dict[str, Any]) -> None:
-        logger.info(f"Event: {event}, Data: {data}")
+    Args:
+        job: The job listing row
+        user_id: The user's ID
+        analysis_service: Service to reuse across a batch (optional)
+        
+    Returns:
+        result: Analysis result
+    """
+    analysis_service = analysis_service or AnalysisService()
+    
+    logger.info("Found job: %s at %s", job['title'], job['company'])
     
     # Reanalyze the job
-    result = analysis_service.reanalyze_job(job_id, user_id)
-    logger.info(f"Analysis result: {result}")
+    result = analysis_service.reanalyze_job(job['job_id'], user_id)
+    logger.info("Analysis result: %s", result)
     return result
 
-def analyze_random_job(user_id: int) -> Dict[str, Any]:
+def analyze_random_jobs(user_id: int, limit: int) -> List[Dict[str, Any]]:
     """
-    Analyze a random job for a user.
+    Analyze up to `limit` jobs for a user, fetching them in one query.
     
     Args:
         user_id: The user's ID
+        limit: Maximum number of jobs to analyze
         
     Returns:
-        result: Analysis result
+        results: Analysis result per job
     """
     db_service = DatabaseService()
     
-    # Get a job that has a state for this user
-    query = """
-    SELECT DISTINCT j.job_id, j.title, j.company
-    FROM job_listings j
-    JOIN job_states s ON j.job_id = s.job_id
-    WHERE s.user_id = ?
-    LIMIT 1
+    # Get jobs that have a state for this user
+    jobs = db_service.db_manager.execute_query(RANDOM_JOB_SQL, (user_id, limit))
+    if not jobs:
+        logger.error("No jobs found for user %s", user_id)
+        return []
+    
+    analysis_service = AnalysisService()
+    return [analyze_specific_job_row(job, user_id, analysis_service) for job in jobs]
+
+def analyze_random_job(user_id: int) -> Dict[str, Any]:
     """
-    job = db_service.db_manager.get_one(query, (user_id,))
+    Analyze a random job for a user.
     
-    if not job:
-        logger.error(f"No jobs found for user {user_id}")
+    Args:
+        user_id: The user's ID
+        
+    Returns:
+        result: Analysis result
+    """
+    results = analyze_random_jobs(user_id, 1)
+    if not results:
         return {"error": "No jobs found"}
     
-    logger.info(f"Selected job: {job['title']} at {job['company']}")
-    
-    # Analyze this job
-    return analyze_specific_job(job['job_id'], user_id)
+    return results[0]
 
 if __name__ == "__main__":
     # You can modify these values as needed
@@ -89,10 +118,10 @@ if __name__ == "__main__":
     # Check if job_id is provided as command line argument
     if len(sys.argv) > 1:
         JOB_ID = sys.argv[1]
-        logger.info(f"Analyzing specific job: {JOB_ID}")
+        logger.info("Analyzing specific job: %s", JOB_ID)
         result = analyze_specific_job(JOB_ID, USER_ID)
     else:
-        logger.info(f"Analyzing random job for user {USER_ID}")
+        logger.info("Analyzing random job for user %s", USER_ID)
         result = analyze_random_job(USER_ID)
     
     # Print final result
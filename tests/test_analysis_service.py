@@ -1,15 +1,39 @@
-from unittest.mock import MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch, DEFAULT
+
+import pytest
 
 import services.analysis_service as asvc_mod
+from services.llm_json_parser import LLMJsonParser
 from utils.factories import JobAnalysisServiceFactory
 
+# Shared call arguments; assertions then compare the same objects and short-circuit on identity
+_PREFS = {'pref': 1}
+_TITLES = ['T']
+
+
+class _Recorder:
+    """A minimal recording callable, much cheaper to build than a MagicMock."""
+    __slots__ = ('calls', 'ret')
+
+    def __init__(self, ret):
+        self.calls = []
+        self.ret = ret
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self.ret
+
+    def assert_called_once_with(self, *args, **kwargs):
+        assert self.calls == [(args, kwargs)], f"Expected one call with {(args, kwargs)}, got {self.calls}"
+
 
 class FakeJAS:
     def __init__(self, title_analyzer, description_analyzer, db_service):
         self.title_analyzer = title_analyzer
         self.description_analyzer = description_analyzer
         self.db_service = db_service
-        self.analyze_queued_jobs = MagicMock(return_value={
+        self.analyze_queued_jobs = _Recorder({
             'total': 2,
             'analyzed': 2,
             'relevant': 1,
@@ -17,7 +41,7 @@ class FakeJAS:
             'errors': 0,
             'skipped': 0
         })
-        self.reanalyze_job = MagicMock(return_value={
+        self.reanalyze_job = _Recorder({
             'status': 'success',
             'job_id': 'j1',
             'relevance_score': 0.4,
@@ -28,61 +52,66 @@ class FakeJAS:
 class TestAnalysisService:
     """Unit tests for the AnalysisService compatibility wrapper."""
 
-    def setup_method(self):
-        # Create mocks
-        self.mock_db_service = MagicMock()
+    @pytest.fixture(scope="class")
+    def svc(self):
+        """Build the patched service once for the whole class."""
+        mock_db_service = MagicMock()
 
         # Create mock for the LLM provider and client
-        self.mock_client = MagicMock()
-        self.mock_llm_provider = MagicMock()
-        self.mock_llm_provider.client = self.mock_client
-
-        # Create a mock for the JSON parser
-        self.mock_json_parser = MagicMock()
-
-        # Patch DatabaseService in the analysis_service module
-        self.db_service_patcher = patch('services.analysis_service.DatabaseService',
-                                        return_value=self.mock_db_service)
-        self.db_service_patcher.start()
-
-        # Patch JobAnalysisServiceFactory to return our fake class
-        self.create_default_patcher = patch(
-            'services.analysis_service.JobAnalysisServiceFactory.create_default_job_analysis_service')
-        self.mock_create_default = self.create_default_patcher.start()
-
-        # Create a FakeJAS with mocked title_analyzer and description_analyzer
-        self.mock_title_analyzer = MagicMock()
-        self.mock_title_analyzer.llm_provider = self.mock_llm_provider  # Set the llm_provider with our mock
-        self.mock_title_analyzer.json_parser = self.mock_json_parser
-
-        self.mock_description_analyzer = MagicMock()
-
-        fake_jas = FakeJAS(self.mock_title_analyzer, self.mock_description_analyzer, self.mock_db_service)
-        self.mock_create_default.return_value = fake_jas
-
-        # Instantiate the service
-        self.service = asvc_mod.AnalysisService()
-        # Keep reference to the fake job analysis service
-        self.mock_jas = self.service.job_analysis_service
-
-    def teardown_method(self):
-        # Restore originals and stop patchers
-        self.db_service_patcher.stop()
-        self.create_default_patcher.stop()
-
-    def test_init(self):
+        mock_client = MagicMock()
+        # Attribute lists cap what each mock can grow; the strategies set these in __init__,
+        # so their classes can't serve as specs
+        mock_llm_provider = MagicMock(spec_set=['client', 'generate_completion'])
+        mock_llm_provider.client = mock_client
+
+        # Mocked title_analyzer and description_analyzer for the FakeJAS
+        mock_title_analyzer = MagicMock(spec_set=['llm_provider', 'json_parser', 'analyze'])
+        mock_title_analyzer.llm_provider = mock_llm_provider  # Set the llm_provider with our mock
+        mock_title_analyzer.json_parser = MagicMock(spec_set=LLMJsonParser)
+        mock_description_analyzer = MagicMock(spec_set=['analyze'])
+
+        # Patch DatabaseService and JobAnalysisServiceFactory in the analysis_service module
+        with patch.multiple('services.analysis_service',
+                            DatabaseService=DEFAULT, JobAnalysisServiceFactory=DEFAULT) as mocks:
+            mocks['DatabaseService'].return_value = mock_db_service
+
+            # The factory returns a FakeJAS built on the shared analyzers
+            fake_jas = FakeJAS(mock_title_analyzer, mock_description_analyzer, mock_db_service)
+            mocks['JobAnalysisServiceFactory'].create_default_job_analysis_service.return_value = fake_jas
+
+            # Instantiate the service
+            service = asvc_mod.AnalysisService()
+            yield SimpleNamespace(
+                service=service,
+                # Keep reference to the fake job analysis service
+                mock_jas=service.job_analysis_service,
+                mock_db_service=mock_db_service,
+                mock_client=mock_client,
+                mock_title_analyzer=mock_title_analyzer,
+                mock_description_analyzer=mock_description_analyzer
+            )
+
+    @pytest.fixture(autouse=True)
+    def _fresh_state(self, svc):
+        """Undo what the previous test recorded or swapped on the shared service."""
+        svc.mock_jas.analyze_queued_jobs.calls.clear()
+        svc.mock_jas.reanalyze_job.calls.clear()
+        svc.mock_jas.title_analyzer = svc.mock_title_analyzer
+        svc.mock_jas.description_analyzer = svc.mock_description_analyzer
+
+    def test_init(self, svc):
         # Service should use our mocked DB and client
-        assert self.service.db_service is self.mock_db_service
+        assert svc.service.db_service is svc.mock_db_service
         # Fix: The service.client is now the mock_client, not the mock_llm_provider
-        assert self.service.client is self.mock_client
+        assert svc.service.client is svc.mock_client
         # Retry settings from compatibility wrapper
-        assert self.service.max_retries == 3
-        assert self.service.retry_delay == 2
+        assert svc.service.max_retries == 3
+        assert svc.service.retry_delay == 2
 
-    def test_analyze_queued_jobs_delegates(self):
+    def test_analyze_queued_jobs_delegates(self, svc):
         # Delegates to job_analysis_service.analyze_queued_jobs
-        result = self.service.analyze_queued_jobs(10, limit=5, callback='cb')
-        self.mock_jas.analyze_queued_jobs.assert_called_once_with(10, 5, 'cb')
+        result = svc.service.analyze_queued_jobs(10, limit=5, callback='cb')
+        svc.mock_jas.analyze_queued_jobs.assert_called_once_with(10, 5, 'cb')
         assert result == {
             'total': 2,
             'analyzed': 2,
@@ -92,39 +121,39 @@ class TestAnalysisService:
             'skipped': 0
         }
 
-    def test_reanalyze_job_delegates(self):
+    def test_reanalyze_job_delegates(self, svc):
         # Delegates to job_analysis_service.reanalyze_job
-        result = self.service.reanalyze_job('jid', user_id=20)
-        self.mock_jas.reanalyze_job.assert_called_once_with('jid', 20)
+        result = svc.service.reanalyze_job('jid', user_id=20)
+        svc.mock_jas.reanalyze_job.assert_called_once_with('jid', 20)
         assert result['status'] == 'success'
         assert result['job_id'] == 'j1'
 
-    def test_analyze_title_delegates(self):
+    def test_analyze_title_delegates(self, svc):
         # Mock the title analyzer strategy
         fake_ta = MagicMock()
         fake_ta.analyze.return_value = (0.9, {'a': 1})
-        self.mock_jas.title_analyzer = fake_ta
+        svc.mock_jas.title_analyzer = fake_ta
 
-        relevance, analysis = self.service._analyze_title(
-            't', 'c', {'pref': 1}, ['T']
+        relevance, analysis = svc.service._analyze_title(
+            't', 'c', _PREFS, _TITLES
         )
         fake_ta.analyze.assert_called_once_with(
-            title='t', company='c', analysis_prefs={'pref': 1}, job_titles=['T']
+            title='t', company='c', analysis_prefs=_PREFS, job_titles=_TITLES
         )
         assert relevance == 0.9
         assert analysis == {'a': 1}
 
-    def test_analyze_description_delegates(self):
+    def test_analyze_description_delegates(self, svc):
         # Mock the description analyzer strategy
         fake_da = MagicMock()
         fake_da.analyze.return_value = (0.8, {'b': 2})
-        self.mock_jas.description_analyzer = fake_da
+        svc.mock_jas.description_analyzer = fake_da
 
-        relevance, analysis = self.service._analyze_description(
-            't', 'c', 'desc', {'pref': 1}, ['T']
+        relevance, analysis = svc.service._analyze_description(
+            't', 'c', 'desc', _PREFS, _TITLES
         )
         fake_da.analyze.assert_called_once_with(
-            title='t', company='c', description='desc', analysis_prefs={'pref': 1}, job_titles=['T']
+            title='t', company='c', description='desc', analysis_prefs=_PREFS, job_titles=_TITLES
         )
         assert relevance == 0.8
         assert analysis == {'b': 2}
\ No newline at end of file
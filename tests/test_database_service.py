@@ -1,407 +1,447 @@
-import unittest
 from unittest.mock import patch, MagicMock
 import datetime
+import json
 
+import pytest
+
+import services.database_service as database_service_module
 from services.database_service import DatabaseService
+from database.db_manager import DatabaseManager
 from database.models import JobStates, JobAnalysis, JobListings
 
-
-class TestDatabaseService(unittest.TestCase):
-    """Test cases for the DatabaseService class."""
-
-    def setUp(self):
-        """Set up the test environment before each test method."""
-        # Create a mock for DatabaseManager
-        self.db_manager_patcher = patch('services.database_service.DatabaseManager')
-        self.mock_db_manager_class = self.db_manager_patcher.start()
-
-        # Mock instance of DatabaseManager
-        self.mock_db_manager = MagicMock()
-        self.mock_db_manager_class.return_value = self.mock_db_manager
-
-        # Create DatabaseService instance with mocked dependencies
-        self.db_service = DatabaseService()
-
-    def tearDown(self):
-        """Clean up after each test method."""
-        self.db_manager_patcher.stop()
-
-    def test_add_job_listing(self):
-        """Test adding a job listing."""
-        # Setup
-        job_data = {
-            'job_id': 'job123',
-            'title': 'Test Job',
-            'company': 'Test Company',
-            'url': 'http://example.com',
-            'location': 'Remote',
-            'description': 'Job description',
-            'source_term': 'python'
-        }
-
-        # Mock get_job_by_id to return None (job doesn't exist)
-        self.mock_db_manager.get_one.return_value = None
-
-        # Mock execute_write
-        self.mock_db_manager.execute_write.return_value = 1
-
-        # Call the method
-        result = self.db_service.add_job_listing(job_data)
-
-        # Assertions
-        self.assertEqual(result, 1)
-        self.mock_db_manager.execute_write.assert_called_once()
-
-        # Test missing required fields
-        with self.assertRaises(ValueError):
-            self.db_service.add_job_listing({'job_id': 'job123'})  # Missing required fields
-
-        # Test existing job
-        self.mock_db_manager.get_one.return_value = {'job_id': 'job123'}
-        with self.assertRaises(ValueError):
-            self.db_service.add_job_listing(job_data)  # Job already exists
-
-    def test_get_job_by_id(self):
-        """Test getting a job by ID."""
-        # Setup mock
-        self.mock_db_manager.get_one.return_value = {
-            'job_id': 'job123',
-            'title': 'Test Job'
-        }
-
-        # Call the method
-        result = self.db_service.get_job_by_id('job123')
-
-        # Assertions
-        self.assertEqual(result['job_id'], 'job123')
-        self.assertEqual(result['title'], 'Test Job')
-        self.mock_db_manager.get_one.assert_called_once()
-
-    def test_get_jobs_by_state(self):
-        """Test getting jobs by state."""
-        # Setup mock
-        mock_jobs = [
-            {'job_id': 'job1', 'title': 'Job 1', 'state': 'new_scraped'},
-            {'job_id': 'job2', 'title': 'Job 2', 'state': 'new_scraped'}
-        ]
-        self.mock_db_manager.execute_query.return_value = mock_jobs
-
-        # Call the method
-        result = self.db_service.get_jobs_by_state(1, JobStates.STATE_NEW_SCRAPED, 10, 0)
-
-        # Assertions
-        self.assertEqual(len(result), 2)
-        self.assertEqual(result[0]['job_id'], 'job1')
-        self.assertEqual(result[1]['job_id'], 'job2')
-        self.mock_db_manager.execute_query.assert_called_once()
-
-    def test_get_job_states_by_user(self):
-        """Test getting job state counts by user."""
-        # Setup mock
-        mock_results = [
-            {'state': 'new_scraped', 'count': 5},
-            {'state': 'relevant', 'count': 3}
-        ]
-        self.mock_db_manager.execute_query.return_value = mock_results
-
-        # Call the method
-        result = self.db_service.get_job_states_by_user(1)
-
-        # Assertions
-        self.assertEqual(result['new_scraped'], 5)
-        self.assertEqual(result['relevant'], 3)
-        self.assertEqual(result['irrelevant'], 0)  # Default value for missing state
-        self.mock_db_manager.execute_query.assert_called_once()
-
-    def test_add_job_state(self):
-        """Test adding a job state."""
-        # Mock execute_write
-        self.mock_db_manager.execute_write.return_value = 1
-
-        # Call the method
-        result = self.db_service.add_job_state('job123', 1, JobStates.STATE_NEW_SCRAPED, 'Test note')
-
-        # Assertions
-        self.assertEqual(result, 1)
-        self.mock_db_manager.execute_write.assert_called_once()
-
-        # Test invalid state
-        with self.assertRaises(ValueError):
-            self.db_service.add_job_state('job123', 1, 'invalid_state')
-
-    def test_get_job_state_history(self):
-        """Test getting job state history."""
-        # Setup mock
-        mock_history = [
-            {'state': 'new_scraped', 'state_timestamp': '2023-01-01 12:00:00'},
-            {'state': 'analyzed', 'state_timestamp': '2023-01-01 12:05:00'}
-        ]
-        self.mock_db_manager.execute_query.return_value = mock_history
-
-        # Call the method
-        result = self.db_service.get_job_state_history('job123', 1)
-
-        # Assertions
-        self.assertEqual(len(result), 2)
-        self.assertEqual(result[0]['state'], 'new_scraped')
-        self.assertEqual(result[1]['state'], 'analyzed')
-        self.mock_db_manager.execute_query.assert_called_once()
-
-    def test_get_current_job_state(self):
-        """Test getting current job state."""
-        # Setup mock
-        mock_state = {'state': 'analyzed', 'state_timestamp': '2023-01-01 12:05:00'}
-        self.mock_db_manager.get_one.return_value = mock_state
-
-        # Call the method
-        result = self.db_service.get_current_job_state('job123', 1)
-
-        # Assertions
-        self.assertEqual(result['state'], 'analyzed')
-        self.mock_db_manager.get_one.assert_called_once()
-
-    def test_add_job_analysis(self):
-        """Test adding job analysis."""
-        # Mock execute_write
-        self.mock_db_manager.execute_write.return_value = 1
-
-        # Call the method
-        analysis_details = {
-            'title_analysis': {'relevance': 0.8},
-            'skills_found': ['Python', 'SQL']
-        }
-        result = self.db_service.add_job_analysis('job123', 1, 0.75, analysis_details)
-
-        # Assertions
-        self.assertEqual(result, 1)
-        self.mock_db_manager.execute_write.assert_called_once()
-
-    def test_get_job_analysis(self):
-        """Test getting job analysis."""
-        # Setup mock - raw DB result with serialized JSON
-        import json
-        analysis_details = {
-            'title_analysis': {'relevance': 0.8},
-            'skills_found': ['Python', 'SQL']
-        }
-        mock_analysis = {
-            'job_id': 'job123',
-            'user_id': 1,
-            'relevance_score': 0.75,
-            'analysis_details': json.dumps(analysis_details)
-        }
-        self.mock_db_manager.get_one.return_value = mock_analysis
-
-        # Call the method
-        result = self.db_service.get_job_analysis('job123', 1)
-
-        # Assertions
-        self.assertEqual(result['job_id'], 'job123')
-        self.assertEqual(result['relevance_score'], 0.75)
-        self.assertEqual(result['analysis_details']['skills_found'], ['Python', 'SQL'])
-        self.mock_db_manager.get_one.assert_called_once()
-
-        # Test no analysis found
-        self.mock_db_manager.get_one.return_value = None
-        result = self.db_service.get_job_analysis('nonexistent', 1)
-        self.assertIsNone(result)
-
-    def test_get_user_schedule(self):
-        """Test getting user schedule."""
-        # Setup mock
-        mock_schedule = {
-            'user_id': 1,
-            'schedule_type': 'daily',
-            'execution_time': '08:00'
-        }
-        self.mock_db_manager.get_one.return_value = mock_schedule
-
-        # Call the method
-        result = self.db_service.get_user_schedule(1)
-
-        # Assertions
-        self.assertEqual(result['schedule_type'], 'daily')
-        self.assertEqual(result['execution_time'], '08:00')
-        self.mock_db_manager.get_one.assert_called_once()
-
-    def test_update_user_schedule(self):
-        """Test updating user schedule."""
-        # Setup mocks
-        existing_schedule = {
-            'setting_id': 1,
-            'user_id': 1,
-            'schedule_type': 'daily',
-            'execution_time': '08:00'
-        }
-        self.mock_db_manager.get_one.return_value = existing_schedule
-        self.mock_db_manager.execute_write.return_value = 1
-
-        # Call the method - update existing schedule
-        result = self.db_service.update_user_schedule(1, 'weekly', 'Monday 10:00')
-
-        # Assertions for update
-        self.assertEqual(result, 1)  # Should return existing setting_id
-        self.mock_db_manager.execute_write.assert_called_once()
-
-        # Test creating new schedule
-        self.mock_db_manager.get_one.return_value = None
-        self.mock_db_manager.execute_write.reset_mock()
-        self.mock_db_manager.execute_write.return_value = 2
-
-        # Call the method - create new schedule
-        result = self.db_service.update_user_schedule(2, 'daily', '09:00')
-
-        # Assertions for create
-        self.assertEqual(result, 2)  # Should return new setting_id
-        self.mock_db_manager.execute_write.assert_called_once()
-
-        # Test invalid schedule type
-        with self.assertRaises(ValueError):
-            self.db_service.update_user_schedule(1, 'invalid_type', '08:00')
-
-    def test_update_last_run(self):
-        """Test updating last run timestamp."""
-        # Mock execute_write
-        self.mock_db_manager.execute_write.return_value = None
-
-        # Call the method
-        self.db_service.update_last_run(1)
-
-        # Assertions
-        self.mock_db_manager.execute_write.assert_called_once()
-
-    def test_get_active_schedules(self):
-        """Test getting active schedules."""
-        # Setup mock
-        mock_schedules = [
-            {'user_id': 1, 'username': 'user1', 'schedule_type': 'daily', 'execution_time': '08:00'},
-            {'user_id': 2, 'username': 'user2', 'schedule_type': 'weekly', 'execution_time': 'Monday 10:00'}
-        ]
-        self.mock_db_manager.execute_query.return_value = mock_schedules
-
-        # Call the method
-        result = self.db_service.get_active_schedules()
-
-        # Assertions
-        self.assertEqual(len(result), 2)
-        self.assertEqual(result[0]['username'], 'user1')
-        self.assertEqual(result[1]['schedule_type'], 'weekly')
-        self.mock_db_manager.execute_query.assert_called_once()
-
-    def test_get_job_statistics(self):
-        """Test getting job statistics."""
-        # Setup mocks for different queries
-        self.mock_db_manager.get_one.return_value = {'count': 50}
-
-        mock_state_counts = [
-            {'state': 'new_scraped', 'count': 10},
-            {'state': 'relevant', 'count': 20},
-            {'state': 'irrelevant', 'count': 15}
-        ]
-
-        mock_company_counts = [
-            {'company': 'Company A', 'count': 5},
-            {'company': 'Company B', 'count': 3}
-        ]
-
-        mock_location_counts = [
-            {'location': 'Remote', 'count': 8},
-            {'location': 'New York', 'count': 4}
-        ]
-
-        mock_recent_activity = [
-            {'title': 'Job 1', 'company': 'Company A', 'state': 'saved', 'state_timestamp': '2023-01-02 10:00:00'},
-            {'title': 'Job 2', 'company': 'Company B', 'state': 'viewed', 'state_timestamp': '2023-01-01 12:00:00'}
-        ]
-
-        # Configure mock to return different values for different queries
-        self.mock_db_manager.execute_query.side_effect = [
-            mock_state_counts,  # For get_job_states_by_user
-            mock_company_counts,  # For company counts
-            mock_location_counts,  # For location counts
-            mock_recent_activity  # For recent activity
-        ]
-
-        # Call the method
-        result = self.db_service.get_job_statistics(1)
-
-        # Assertions
-        self.assertEqual(result['total_jobs'], 50)
-        self.assertEqual(result['states']['new_scraped'], 10)
-        self.assertEqual(result['states']['relevant'], 20)
-        self.assertEqual(result['by_company']['Company A'], 5)
-        self.assertEqual(result['by_location']['Remote'], 8)
-        self.assertEqual(len(result['recent_activity']), 2)
-        self.assertEqual(result['recent_activity'][0]['title'], 'Job 1')
-
-        # Verify all expected queries were made
-        self.assertEqual(self.mock_db_manager.execute_query.call_count, 4)
-
-    def test_delete_job(self):
-        """Test deleting a job and its related data."""
-        # Setup transaction mock
-        mock_conn = MagicMock()
-        mock_conn.execute.return_value.rowcount = 1  # Simulate 1 row affected
-
-        # Mock the transaction context manager
-        with patch.object(self.mock_db_manager, 'transaction') as mock_transaction:
-            mock_transaction.return_value.__enter__.return_value = mock_conn
-            mock_transaction.return_value.__exit__.return_value = None
-
-            # Option 1: Remove autospec=True
-            with patch.object(self.db_service, 'delete_job') as mock_delete:
-                mock_delete.return_value = True
-
-                # Test with user_id
-                result = self.db_service.delete_job('test_job', 1)
-                self.assertTrue(result)
-                mock_delete.assert_called_with('test_job', 1)
-
-                # Test without user_id
-                mock_delete.reset_mock()
-                result = self.db_service.delete_job('test_job')
-                self.assertTrue(result)
-                mock_delete.assert_called_with('test_job')
-
-    def test_get_jobs_by_state_returns_only_latest_state(self):
-        """Test that get_jobs_by_state only returns jobs where the requested state is the latest state."""
-        # Set a test user ID
-        test_user_id = 999
-
-        # Create a test job
-        job_data = {
-            'job_id': 'state_test_job',
-            'title': 'Test Engineer',
-            'company': 'Test Company',
-            'url': 'https://example.com/job'
-        }
-
-        # Create mocked response
-        queued_mock_response = []  # Empty for queued (should not return)
-        relevant_mock_response = [{  # Should return for relevant
+# Built once and reset per test; spec_set walks the DatabaseManager surface once and rejects
+# attributes the real manager lacks, instead of growing unconstrained child mocks
+_TEMPLATE_DB_MANAGER = MagicMock(spec_set=DatabaseManager)
+
+# Query results for test_get_job_statistics; side_effect only iterates them, so they're built once
+_MOCK_STATE_COUNTS = (
+    {'state': 'new_scraped', 'count': 10},
+    {'state': 'relevant', 'count': 20},
+    {'state': 'irrelevant', 'count': 15}
+)
+_MOCK_COMPANY_COUNTS = (
+    {'company': 'Company A', 'count': 5},
+    {'company': 'Company B', 'count': 3}
+)
+_MOCK_LOCATION_COUNTS = (
+    {'location': 'Remote', 'count': 8},
+    {'location': 'New York', 'count': 4}
+)
+_MOCK_RECENT_ACTIVITY = (
+    {'title': 'Job 1', 'company': 'Company A', 'state': 'saved', 'state_timestamp': '2023-01-02 10:00:00'},
+    {'title': 'Job 2', 'company': 'Company B', 'state': 'viewed', 'state_timestamp': '2023-01-01 12:00:00'}
+)
+
+# Stored analysis_details for test_get_job_analysis, serialized once
+_ANALYSIS_JSON = json.dumps({
+    'title_analysis': {'relevance': 0.8},
+    'skills_found': ['Python', 'SQL']
+})
+
+
+@pytest.fixture(scope="module")
+def db_service_and_mock():
+    """One DatabaseService on the template mock, shared by every mocked test in the module."""
+    original_db_manager_class = database_service_module.DatabaseManager
+    database_service_module.DatabaseManager = lambda: _TEMPLATE_DB_MANAGER
+    try:
+        yield DatabaseService(), _TEMPLATE_DB_MANAGER
+    finally:
+        database_service_module.DatabaseManager = original_db_manager_class
+
+
+@pytest.fixture
+def db_service(db_service_and_mock):
+    """The shared DatabaseService, with its mock cleared of anything the previous test configured."""
+    service, mock_db_manager = db_service_and_mock
+    mock_db_manager.reset_mock(return_value=True, side_effect=True)
+    return service
+
+
+@pytest.fixture
+def db_mock(db_service, db_service_and_mock):
+    """The mocked DatabaseManager behind db_service."""
+    return db_service_and_mock[1]
+
+
+# Read methods that hand the query result straight back: (method, mocked call, mocked result, args)
+_PASSTHROUGH_READS = [
+    ('get_job_by_id', 'get_one',
+     {'job_id': 'job123', 'title': 'Test Job'},
+     ('job123',)),
+    ('get_jobs_by_state', 'execute_query',
+     [{'job_id': 'job1', 'title': 'Job 1', 'state': 'new_scraped'},
+      {'job_id': 'job2', 'title': 'Job 2', 'state': 'new_scraped'}],
+     (1, JobStates.STATE_NEW_SCRAPED, 10, 0)),
+    ('get_job_state_history', 'execute_query',
+     [{'state': 'new_scraped', 'state_timestamp': '2023-01-01 12:00:00'},
+      {'state': 'analyzed', 'state_timestamp': '2023-01-01 12:05:00'}],
+     ('job123', 1)),
+    ('get_current_job_state', 'get_one',
+     {'state': 'analyzed', 'state_timestamp': '2023-01-01 12:05:00'},
+     ('job123', 1)),
+    ('get_user_schedule', 'get_one',
+     {'user_id': 1, 'schedule_type': 'daily', 'execution_time': '08:00'},
+     (1,)),
+    ('get_active_schedules', 'execute_query',
+     [{'user_id': 1, 'username': 'user1', 'schedule_type': 'daily', 'execution_time': '08:00'},
+      {'user_id': 2, 'username': 'user2', 'schedule_type': 'weekly', 'execution_time': 'Monday 10:00'}],
+     ()),
+]
+
+
+@pytest.mark.parametrize('method_name, mock_attr, mock_value, args', _PASSTHROUGH_READS,
+                         ids=[case[0] for case in _PASSTHROUGH_READS])
+def test_passthrough_reads(db_service, db_mock, method_name, mock_attr, mock_value, args):
+    """Test read methods that return the database result unchanged."""
+    getattr(db_mock, mock_attr).return_value = mock_value
+
+    # Call the method
+    result = getattr(db_service, method_name)(*args)
+
+    # Assertions
+    assert result == mock_value
+    getattr(db_mock, mock_attr).assert_called_once()
+
+
+def test_delete_job(db_tx):
+    """Test deleting a job's user data, then the job itself, against a real database."""
+    # The module's DatabaseManager may be swapped for a mock, so the service is pointed at db_tx directly
+    db_service = DatabaseService.__new__(DatabaseService)
+    db_service.db_manager = db_tx
+
+    db_tx.execute_write("INSERT INTO users (user_id, username, password_hash) VALUES (1, 'u1', 'x')")
+    db_tx.execute_write("INSERT INTO users (user_id, username, password_hash) VALUES (2, 'u2', 'x')")
+    db_service.add_job_listing({'job_id': 'job123', 'title': 'Test Job', 'company': 'Test Company',
+                                'url': 'http://example.com'})
+    db_service.add_job_state('job123', 1, JobStates.STATE_NEW_SCRAPED)
+    db_service.add_job_state('job123', 2, JobStates.STATE_NEW_SCRAPED)
+    db_service.add_job_analysis('job123', 1, 0.5, {'reasoning': 'ok'})
+
+    # Deleting for one user keeps the listing while another user still references it
+    assert db_service.delete_job('job123', 1) is True
+    assert db_service.get_current_job_state('job123', 1) is None
+    assert db_service.get_job_analysis('job123', 1) is None
+    assert db_service.get_job_by_id('job123') is not None
+
+    # Deleting without a user removes everything
+    assert db_service.delete_job('job123') is True
+    assert db_service.get_job_by_id('job123') is None
+    assert db_service.get_current_job_state('job123', 2) is None
+
+    # Nothing left to delete
+    assert db_service.delete_job('job123') is False
+
+
+def test_add_job_listing(db_service, db_mock):
+    """Test adding a job listing."""
+    # Setup
+    job_data = {
+        'job_id': 'job123',
+        'title': 'Test Job',
+        'company': 'Test Company',
+        'url': 'http://example.com',
+        'location': 'Remote',
+        'description': 'Job description',
+        'source_term': 'python'
+    }
+
+    # Mock get_job_by_id to return None (job doesn't exist)
+    db_mock.get_one.return_value = None
+
+    # Mock execute_write
+    db_mock.execute_write.return_value = 1
+
+    # Call the method
+    result = db_service.add_job_listing(job_data)
+
+    # Assertions
+    assert result == 1
+    db_mock.execute_write.assert_called_once()
+
+    # Test missing required fields
+    with pytest.raises(ValueError):
+        db_service.add_job_listing({'job_id': 'job123'})  # Missing required fields
+
+    # Test existing job
+    db_mock.get_one.return_value = {'job_id': 'job123'}
+    with pytest.raises(ValueError):
+        db_service.add_job_listing(job_data)  # Job already exists
+
+
+def test_get_recent_job_ids(db_service, db_mock):
+    """Test getting the most recently scraped job IDs."""
+    db_mock.execute_query.return_value = [{'job_id': 'job2'}, {'job_id': 'job1'}]
+
+    result = db_service.get_recent_job_ids(10)
+
+    assert result == ['job2', 'job1']
+    assert db_mock.execute_query.call_args[0][1] == (10,)
+
+
+def test_get_job_states_by_user(db_service, db_mock):
+    """Test getting job state counts by user."""
+    # Setup mock
+    mock_results = [
+        {'state': 'new_scraped', 'count': 5},
+        {'state': 'relevant', 'count': 3}
+    ]
+    db_mock.execute_query.return_value = mock_results
+
+    # Call the method
+    result = db_service.get_job_states_by_user(1)
+
+    # Assertions
+    assert result['new_scraped'] == 5
+    assert result['relevant'] == 3
+    assert result['irrelevant'] == 0  # Default value for missing state
+    db_mock.execute_query.assert_called_once()
+
+
+def test_add_job_state(db_service, db_mock):
+    """Test adding a job state."""
+    # Mock execute_write
+    db_mock.execute_write.return_value = 1
+
+    # Call the method
+    result = db_service.add_job_state('job123', 1, JobStates.STATE_NEW_SCRAPED, 'Test note')
+
+    # Assertions
+    assert result == 1
+    db_mock.execute_write.assert_called_once()
+
+    # Test invalid state
+    with pytest.raises(ValueError):
+        db_service.add_job_state('job123', 1, 'invalid_state')
+
+
+def test_add_job_state_returning(db_service, db_mock):
+    """Test adding a job state and getting the stored row back."""
+    # Mock execute_returning
+    state_row = {'state_id': 1, 'job_id': 'job123', 'user_id': 1, 'state': JobStates.STATE_NEW_SCRAPED}
+    db_mock.execute_returning.return_value = state_row
+
+    # Call the method
+    result = db_service.add_job_state_returning('job123', 1, JobStates.STATE_NEW_SCRAPED)
+
+    # Assertions
+    assert result == state_row
+    query = db_mock.execute_returning.call_args[0][0]
+    assert 'RETURNING' in query
+
+    # Test invalid state
+    with pytest.raises(ValueError):
+        db_service.add_job_state_returning('job123', 1, 'invalid_state')
+
+
+def test_add_job_states(db_service, db_mock):
+    """Test adding several job states in one batch."""
+    now = datetime.datetime.now()
+    states = [
+        ('job1', 1, JobStates.STATE_VIEWED, None, now),
+        ('job2', 1, JobStates.STATE_VIEWED, None, now)
+    ]
+
+    # Call the method
+    db_service.add_job_states(states)
+
+    # Assertions
+    db_mock.execute_many.assert_called_once()
+    assert db_mock.execute_many.call_args[0][1] == states
+
+    # Test empty batch
+    db_mock.execute_many.reset_mock()
+    db_service.add_job_states([])
+    db_mock.execute_many.assert_not_called()
+
+    # Test invalid state
+    with pytest.raises(ValueError):
+        db_service.add_job_states([('job1', 1, 'invalid_state', None, now)])
+
+
+def test_add_scraped_job(db_service, db_mock):
+    """Test recording a scraped job and its states in one transaction."""
+    job_data = {
+        'job_id': 'job123',
+        'title': 'Test Job',
+        'company': 'Test Company',
+        'url': 'http://example.com'
+    }
+    mock_conn = db_mock.transaction.return_value.__enter__.return_value
+
+    # New job: listing plus both states
+    db_service.add_scraped_job(job_data, 1, is_new=True)
+
+    mock_conn.execute.assert_called_once()
+    assert 'ON CONFLICT' in mock_conn.execute.call_args[0][0]
+    states = mock_conn.executemany.call_args[0][1]
+    assert [s[2] for s in states] == [JobStates.STATE_NEW_SCRAPED, JobStates.STATE_QUEUED_FOR_ANALYSIS]
+    assert states[0][4] < states[1][4]
+
+    # Existing job: states only
+    mock_conn.reset_mock()
+    db_service.add_scraped_job(job_data, 1, is_new=False)
+    mock_conn.execute.assert_not_called()
+    mock_conn.executemany.assert_called_once()
+
+    # Test missing required fields
+    with pytest.raises(ValueError):
+        db_service.add_scraped_job({'job_id': 'job123'}, 1, is_new=True)
+
+
+def test_add_job_analysis(db_service, db_mock):
+    """Test adding job analysis."""
+    # Mock execute_write
+    db_mock.execute_write.return_value = 1
+
+    # Call the method
+    analysis_details = {
+        'title_analysis': {'relevance': 0.8},
+        'skills_found': ['Python', 'SQL']
+    }
+    result = db_service.add_job_analysis('job123', 1, 0.75, analysis_details)
+
+    # Assertions
+    assert result == 1
+    db_mock.execute_write.assert_called_once()
+
+
+def test_get_job_analysis(db_service, db_mock):
+    """Test getting job analysis."""
+    # Setup mock - raw DB result with serialized JSON
+    mock_analysis = {
+        'job_id': 'job123',
+        'user_id': 1,
+        'relevance_score': 0.75,
+        'analysis_details': _ANALYSIS_JSON
+    }
+    db_mock.get_one.return_value = mock_analysis
+
+    # Call the method
+    result = db_service.get_job_analysis('job123', 1)
+
+    # Assertions
+    assert result['job_id'] == 'job123'
+    assert result['relevance_score'] == 0.75
+    assert result['analysis_details']['skills_found'] == ['Python', 'SQL']
+    db_mock.get_one.assert_called_once()
+
+    # Test no analysis found
+    db_mock.get_one.return_value = None
+    result = db_service.get_job_analysis('nonexistent', 1)
+    assert result is None
+
+
+def test_update_user_schedule(db_service, db_mock):
+    """Test updating user schedule."""
+    # Setup mocks
+    existing_schedule = {
+        'setting_id': 1,
+        'user_id': 1,
+        'schedule_type': 'daily',
+        'execution_time': '08:00'
+    }
+    db_mock.get_one.return_value = existing_schedule
+    db_mock.execute_write.return_value = 1
+
+    # Call the method - update existing schedule
+    result = db_service.update_user_schedule(1, 'weekly', 'Monday 10:00')
+
+    # Assertions for update
+    assert result == 1  # Should return existing setting_id
+    db_mock.execute_write.assert_called_once()
+
+    # Test creating new schedule
+    db_mock.get_one.return_value = None
+    db_mock.execute_write.reset_mock()
+    db_mock.execute_write.return_value = 2
+
+    # Call the method - create new schedule
+    result = db_service.update_user_schedule(2, 'daily', '09:00')
+
+    # Assertions for create
+    assert result == 2  # Should return new setting_id
+    db_mock.execute_write.assert_called_once()
+
+    # Test invalid schedule type
+    with pytest.raises(ValueError):
+        db_service.update_user_schedule(1, 'invalid_type', '08:00')
+
+
+def test_update_last_run(db_service, db_mock):
+    """Test updating last run timestamp."""
+    # Mock execute_write
+    db_mock.execute_write.return_value = None
+
+    # Call the method
+    db_service.update_last_run(1)
+
+    # Assertions
+    db_mock.execute_write.assert_called_once()
+
+
+def test_get_job_statistics(db_service, db_mock):
+    """Test getting job statistics."""
+    # Setup mocks for different queries
+    db_mock.get_one.return_value = {'count': 50}
+
+    # Configure mock to return different values for different queries
+    db_mock.execute_query.side_effect = [
+        _MOCK_STATE_COUNTS,  # For get_job_states_by_user
+        _MOCK_COMPANY_COUNTS,  # For company counts
+        _MOCK_LOCATION_COUNTS,  # For location counts
+        _MOCK_RECENT_ACTIVITY  # For recent activity
+    ]
+
+    # Call the method
+    result = db_service.get_job_statistics(1)
+
+    # Assertions
+    assert result['total_jobs'] == 50
+    assert result['states']['new_scraped'] == 10
+    assert result['states']['relevant'] == 20
+    assert result['by_company']['Company A'] == 5
+    assert result['by_location']['Remote'] == 8
+    assert len(result['recent_activity']) == 2
+    assert result['recent_activity'][0]['title'] == 'Job 1'
+
+    # Verify all expected queries were made
+    assert db_mock.execute_query.call_count == 4
+
+
+def test_get_jobs_by_state_returns_only_latest_state(db_service, db_mock):
+    """Test that get_jobs_by_state only returns jobs where the requested state is the latest state."""
+    # Set a test user ID
+    test_user_id = 999
+
+    # Create a test job
+    job_data = {
+        'job_id': 'state_test_job',
+        'title': 'Test Engineer',
+        'company': 'Test Company',
+        'url': 'https://example.com/job'
+    }
+
+    # Mocked response per requested state; the state is the second query parameter
+    responses_by_state = {
+        JobStates.STATE_QUEUED_FOR_ANALYSIS: [],  # Empty for queued (should not return)
+        JobStates.STATE_RELEVANT: [{  # Should return for relevant
             'job_id': 'state_test_job',
             'title': 'Test Engineer',
             'company': 'Test Company',
             'state': JobStates.STATE_RELEVANT,
             'state_timestamp': '2023-01-01 12:05:00'
         }]
+    }
+
+    # Set up mock
+    db_mock.execute_query.side_effect = lambda query, params: responses_by_state.get(params[1], [])
+
+    # Verify job is NOT returned when querying for QUEUED_FOR_ANALYSIS
+    queued_jobs = db_service.get_jobs_by_state(test_user_id, JobStates.STATE_QUEUED_FOR_ANALYSIS)
+    assert len(queued_jobs) == 0, "Job should not be returned as queued after being analyzed"
 
-        # Set up mock to return appropriate response based on query
-        def mock_execute_query_side_effect(query, params):
-            if JobStates.STATE_QUEUED_FOR_ANALYSIS in str(params):
-                return queued_mock_response
-            elif JobStates.STATE_RELEVANT in str(params):
-                return relevant_mock_response
-            return []
-
-        # Set up mock
-        self.mock_db_manager.execute_query.side_effect = mock_execute_query_side_effect
-
-        # Verify job is NOT returned when querying for QUEUED_FOR_ANALYSIS
-        queued_jobs = self.db_service.get_jobs_by_state(test_user_id, JobStates.STATE_QUEUED_FOR_ANALYSIS)
-        self.assertEqual(len(queued_jobs), 0, "Job should not be returned as queued after being analyzed")
-
-        # Verify job IS returned when querying for RELEVANT
-        relevant_jobs = self.db_service.get_jobs_by_state(test_user_id, JobStates.STATE_RELEVANT)
-        self.assertEqual(len(relevant_jobs), 1, "Job should be returned as relevant")
-        self.assertEqual(relevant_jobs[0]['job_id'], 'state_test_job')
\ No newline at end of file
+    # Verify job IS returned when querying for RELEVANT
+    relevant_jobs = db_service.get_jobs_by_state(test_user_id, JobStates.STATE_RELEVANT)
+    assert len(relevant_jobs) == 1, "Job should be returned as relevant"
+    assert relevant_jobs[0]['job_id'] == 'state_test_job'
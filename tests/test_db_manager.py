@@ -1,235 +1,218 @@
-import unittest
 import os
 import sqlite3
-from unittest.mock import patch, MagicMock
-import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from unittest.mock import patch
 
 from database.db_manager import DatabaseManager
 
+# Reused worker threads for the concurrency test, so it doesn't pay for thread start-up each run
+_EXECUTOR = ThreadPoolExecutor(max_workers=5)
 
-class TestDatabaseManager(unittest.TestCase):
-    """Test cases for the DatabaseManager class."""
 
-    def setUp(self):
-        """Set up the test environment before each test method."""
-        # Create a mock configuration with in-memory database
-        self.patcher = patch('database.db_manager.Config')
-        self.mock_config = self.patcher.start()
-        self.mock_config.DATABASE_PATH = ':memory:'
+def test_singleton_pattern(memory_db_config):
+    """Test that DatabaseManager implements the singleton pattern correctly."""
+    db1 = DatabaseManager()
+    db2 = DatabaseManager()
+    assert db1 is db2, "DatabaseManager should return the same instance"
 
-        # Clear the singleton instance before each test
-        DatabaseManager._instance = None
 
-    def tearDown(self):
-        """Clean up after each test method."""
-        self.patcher.stop()
+def test_initialize(memory_db_config):
+    """Test that the database is initialized correctly."""
+    # Mock the create_all_tables function
+    with patch('database.db_manager.create_all_tables') as mock_create:
+        db_manager = DatabaseManager()
 
-        # Close any open connections
-        if hasattr(self, 'db_manager') and self.db_manager:
-            self.db_manager.close_all()
+        # Verify create_all_tables was called
+        mock_create.assert_called_once()
 
-    def test_singleton_pattern(self):
-        """Test that DatabaseManager implements the singleton pattern correctly."""
-        db1 = DatabaseManager()
-        db2 = DatabaseManager()
-        self.assertIs(db1, db2, "DatabaseManager should return the same instance")
+        # Verify connection was created
+        assert db_manager.get_connection() is not None
 
-    def test_initialize(self):
-        """Test that the database is initialized correctly."""
-        # Mock the create_all_tables function
-        with patch('database.db_manager.create_all_tables') as mock_create:
-            db_manager = DatabaseManager()
 
-            # Verify create_all_tables was called
-            mock_create.assert_called_once()
+def test_get_connection(db_manager):
+    """Test getting a connection from the pool."""
+    conn1 = db_manager.get_connection()
 
-            # Verify connection was created
-            self.assertIsNotNone(db_manager.get_connection())
+    # Test connection is a SQLite connection
+    assert isinstance(conn1, sqlite3.Connection)
 
-    def test_get_connection(self):
-        """Test getting a connection from the pool."""
-        db_manager = DatabaseManager()
-        conn1 = db_manager.get_connection()
+    # Same thread should get same connection
+    conn2 = db_manager.get_connection()
+    assert conn1 is conn2
 
-        # Test connection is a SQLite connection
-        self.assertIsInstance(conn1, sqlite3.Connection)
 
-        # Same thread should get same connection
-        conn2 = db_manager.get_connection()
-        self.assertIs(conn1, conn2)
+def test_uri_database_path(memory_db_config):
+    """Test that a file: database path is opened as an SQLite URI."""
+    memory_db_config.DATABASE_PATH = 'file:uri_test_db?mode=memory&cache=shared'
+    db_manager = DatabaseManager()
+    try:
+        assert db_manager.use_uri
+        assert db_manager.connection_string == 'file:uri_test_db?mode=memory&cache=shared'
+        assert db_manager.table_exists('users')
+    finally:
+        db_manager.close_all()
 
-    def test_transaction_commit(self):
-        """Test transaction with successful commit."""
-        db_manager = DatabaseManager()
 
-        # Create a test table
-        with db_manager.transaction() as conn:
-            conn.execute("CREATE TABLE test (id INTEGER PRIMARY KEY, value TEXT)")
-            conn.execute("INSERT INTO test (value) VALUES (?)", ("test_value",))
+def test_connection_pragmas(memory_db_config, tmp_path):
+    """Test that performance PRAGMAs are applied to new connections."""
+    memory_db_config.DATABASE_PATH = os.path.join(tmp_path, 'test.db')
+    db_manager = DatabaseManager()
+    try:
+        conn = db_manager.get_connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -65536
+        assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    finally:
+        db_manager.close_all()
 
-        # Verify data was committed
-        result = db_manager.get_one("SELECT value FROM test WHERE id = 1")
-        self.assertEqual(result['value'], "test_value")
 
-    def test_transaction_rollback(self):
-        """Test transaction with rollback on exception."""
-        db_manager = DatabaseManager()
+def test_transaction_commit(seeded_db):
+    """Test transaction with successful commit."""
+    with seeded_db.transaction() as conn:
+        conn.execute("INSERT INTO t (value) VALUES (?)", ("test_value",))
+
+    # Verify data was committed
+    result = seeded_db.get_one("SELECT value FROM t WHERE id = 4")
+    assert result['value'] == "test_value"
 
-        # Create a test table
-        with db_manager.transaction() as conn:
-            conn.execute("CREATE TABLE test_rollback (id INTEGER PRIMARY KEY, value TEXT)")
-
-        # Try a transaction that will raise an exception
-        try:
-            with db_manager.transaction() as conn:
-                conn.execute("INSERT INTO test_rollback (value) VALUES (?)", ("test_value",))
-                # Raise an exception to trigger rollback
-                raise ValueError("Test exception")
-        except ValueError:
-            pass
-
-        # Verify data was not committed
-        result = db_manager.execute_query("SELECT COUNT(*) as count FROM test_rollback")
-        self.assertEqual(result[0]['count'], 0)
-
-    def test_execute_query(self):
-        """Test executing a SELECT query."""
-        db_manager = DatabaseManager()
 
-        # Create a test table and insert data
+def test_transaction_rollback(db_manager):
+    """Test transaction with rollback on exception."""
+    # Create a test table
+    with db_manager.transaction() as conn:
+        conn.execute("CREATE TABLE test_rollback (id INTEGER PRIMARY KEY, value TEXT)")
+
+    # Try a transaction that will raise an exception
+    try:
         with db_manager.transaction() as conn:
-            conn.execute("CREATE TABLE test_query (id INTEGER PRIMARY KEY, value TEXT)")
-            conn.execute("INSERT INTO test_query (value) VALUES (?)", ("value1",))
-            conn.execute("INSERT INTO test_query (value) VALUES (?)", ("value2",))
+            conn.execute("INSERT INTO test_rollback (value) VALUES (?)", ("test_value",))
+            # Raise an exception to trigger rollback
+            raise ValueError("Test exception")
+    except ValueError:
+        pass
 
-        # Execute query
-        results = db_manager.execute_query("SELECT * FROM test_query ORDER BY id")
+    # Verify data was not committed
+    result = db_manager.execute_query("SELECT COUNT(*) as count FROM test_rollback")
+    assert result[0]['count'] == 0
 
-        # Verify results
-        self.assertEqual(len(results), 2)
-        self.assertEqual(results[0]['value'], "value1")
-        self.assertEqual(results[1]['value'], "value2")
 
-    def test_execute_write(self):
-        """Test executing a write query."""
-        db_manager = DatabaseManager()
+def test_execute_query(seeded_db):
+    """Test executing a SELECT query."""
+    results = seeded_db.execute_query("SELECT * FROM t ORDER BY id")
 
-        # Create a test table
-        with db_manager.transaction() as conn:
-            conn.execute("CREATE TABLE test_write (id INTEGER PRIMARY KEY, value TEXT)")
+    # Verify results
+    assert [row['value'] for row in results] == ["v1", "v2", "v3"]
+    assert results[0]['id'] == 1
 
-        # Execute write
-        row_id = db_manager.execute_write(
-            "INSERT INTO test_write (value) VALUES (?)",
-            ("test_value",)
-        )
 
-        # Verify row was inserted
-        self.assertEqual(row_id, 1)
+def test_execute_write(seeded_db):
+    """Test executing a write query."""
+    row_id = seeded_db.execute_write(
+        "INSERT INTO t (value) VALUES (?)",
+        ("test_value",)
+    )
 
-        # Verify data
-        result = db_manager.get_one("SELECT value FROM test_write WHERE id = ?", (row_id,))
-        self.assertEqual(result['value'], "test_value")
+    # Verify row was inserted after the seeded rows
+    assert row_id == 4
 
-    def test_execute_many(self):
-        """Test executing multiple write queries."""
-        db_manager = DatabaseManager()
+    # Verify data
+    result = seeded_db.get_one("SELECT value FROM t WHERE id = ?", (row_id,))
+    assert result['value'] == "test_value"
 
-        # Create a test table
-        with db_manager.transaction() as conn:
-            conn.execute("CREATE TABLE test_many (id INTEGER PRIMARY KEY, value TEXT)")
-
-        # Execute multiple inserts
-        values = [("value1",), ("value2",), ("value3",)]
-        db_manager.execute_many(
-            "INSERT INTO test_many (value) VALUES (?)",
-            values
-        )
-
-        # Verify rows were inserted
-        results = db_manager.execute_query("SELECT value FROM test_many ORDER BY id")
-        self.assertEqual(len(results), 3)
-        self.assertEqual(results[0]['value'], "value1")
-        self.assertEqual(results[1]['value'], "value2")
-        self.assertEqual(results[2]['value'], "value3")
-
-    def test_get_one(self):
-        """Test getting a single result."""
-        db_manager = DatabaseManager()
 
-        # Create a test table and insert data
-        with db_manager.transaction() as conn:
-            conn.execute("CREATE TABLE test_get_one (id INTEGER PRIMARY KEY, value TEXT)")
-            conn.execute("INSERT INTO test_get_one (value) VALUES (?)", ("value1",))
+def test_execute_returning(db_manager):
+    """Test executing a write query with a RETURNING clause."""
+    # Create a test table
+    with db_manager.transaction() as conn:
+        conn.execute("CREATE TABLE test_returning (id INTEGER PRIMARY KEY, value TEXT)")
 
-        # Get one result
-        result = db_manager.get_one("SELECT * FROM test_get_one WHERE id = ?", (1,))
+    # Execute write
+    row = db_manager.execute_returning(
+        "INSERT INTO test_returning (value) VALUES (?) RETURNING *",
+        ("test_value",)
+    )
 
-        # Verify result
-        self.assertEqual(result['id'], 1)
-        self.assertEqual(result['value'], "value1")
+    # Verify returned row
+    assert row == {'id': 1, 'value': "test_value"}
 
-        # Test getting non-existent row
-        result = db_manager.get_one("SELECT * FROM test_get_one WHERE id = ?", (999,))
-        self.assertIsNone(result)
+    # No affected rows returns None
+    row = db_manager.execute_returning(
+        "DELETE FROM test_returning WHERE id = ? RETURNING *",
+        (999,)
+    )
+    assert row is None
 
-    def test_table_exists(self):
-        """Test checking if a table exists."""
-        db_manager = DatabaseManager()
 
-        # Create a test table
-        with db_manager.transaction() as conn:
-            conn.execute("CREATE TABLE test_exists (id INTEGER PRIMARY KEY)")
+def test_execute_many(seeded_db):
+    """Test executing multiple write queries."""
+    values = [("value1",), ("value2",), ("value3",)]
+    seeded_db.execute_many(
+        "INSERT INTO t (value) VALUES (?)",
+        values
+    )
 
-        # Check table exists
-        self.assertTrue(db_manager.table_exists("test_exists"))
-        self.assertFalse(db_manager.table_exists("nonexistent_table"))
+    # Verify rows were inserted after the seeded rows
+    results = seeded_db.execute_query("SELECT value FROM t WHERE id > 3 ORDER BY id")
+    assert [row['value'] for row in results] == ["value1", "value2", "value3"]
 
-    def test_multiple_threads(self):
-        """Test DatabaseManager with multiple threads."""
-        db_manager = DatabaseManager()
 
-        # Create a test table
+def test_get_one(seeded_db):
+    """Test getting a single result."""
+    result = seeded_db.get_one("SELECT * FROM t WHERE id = ?", (1,))
+
+    # Verify result
+    assert result['id'] == 1
+    assert result['value'] == "v1"
+
+    # Test getting non-existent row
+    result = seeded_db.get_one("SELECT * FROM t WHERE id = ?", (999,))
+    assert result is None
+
+
+def test_table_exists(seeded_db):
+    """Test checking if a table exists."""
+    assert seeded_db.table_exists("t")
+    assert not seeded_db.table_exists("nonexistent_table")
+
+
+def test_multiple_threads(db_manager):
+    """Test DatabaseManager with multiple threads."""
+    # Create a test table
+    with db_manager.transaction() as conn:
+        conn.execute("CREATE TABLE test_threads (id INTEGER PRIMARY KEY, thread_id INTEGER)")
+
+    # Function to run in thread
+    def thread_func(thread_id):
+        # Don't get a connection here, let transaction() handle it
         with db_manager.transaction() as conn:
-            conn.execute("CREATE TABLE test_threads (id INTEGER PRIMARY KEY, thread_id INTEGER)")
-
-        # Function to run in thread
-        def thread_func(thread_id):
-            # Don't get a connection here, let transaction() handle it
-            with db_manager.transaction() as conn:
-                conn.execute("INSERT INTO test_threads (thread_id) VALUES (?)", (thread_id,))
-
-        # Start multiple threads
-        threads = []
-        for i in range(5):
-            thread = threading.Thread(target=thread_func, args=(i,))
-            threads.append(thread)
-            thread.start()
-
-        # Wait for all threads to complete
-        for thread in threads:
-            thread.join()
-
-        # Check that all threads inserted data
-        results = db_manager.execute_query("SELECT thread_id FROM test_threads ORDER BY thread_id")
-        self.assertEqual(len(results), 5)
-        # Validate each thread's data was inserted
-        for i in range(5):
-            self.assertEqual(results[i]['thread_id'], i)
-
-    def test_close_all(self):
-        """Test closing all connections."""
-        db_manager = DatabaseManager()
+            conn.execute("INSERT INTO test_threads (thread_id) VALUES (?)", (thread_id,))
 
-        # Get a connection
-        conn = db_manager.get_connection()
+    # Run the inserts on pooled threads
+    futures = [_EXECUTOR.submit(thread_func, i) for i in range(5)]
 
-        # Close all connections
-        db_manager.close_all()
+    # Wait for all threads to complete, surfacing any error raised in them
+    for future in wait(futures).done:
+        future.result()
+
+    # Check that all threads inserted data
+    results = db_manager.execute_query("SELECT thread_id FROM test_threads ORDER BY thread_id")
+    assert len(results) == 5
+    # Validate each thread's data was inserted
+    for i in range(5):
+        assert results[i]['thread_id'] == i
+
+
+def test_close_all(memory_db_config):
+    """Test closing all connections."""
+    db_manager = DatabaseManager()
 
-        # Connection pool should be empty
-        self.assertEqual(len(db_manager.connection_pool), 0)
+    # Get a connection
+    conn = db_manager.get_connection()
 
+    # Close all connections
+    db_manager.close_all()
 
-if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    # Connection pool should be empty
+    assert len(db_manager.connection_pool) == 0
@@ -1,19 +1,19 @@
 import unittest
+
+import pytest
 from flask import session
-from app import app, orchestrator
 
 
 class TestMobileResponsiveness(unittest.TestCase):
-    def setUp(self):
-        app.config['TESTING'] = True
-        app.config['WTF_CSRF_ENABLED'] = False  # Disable CSRF for testing
-        self.client = app.test_client()
+    @pytest.fixture(autouse=True)
+    def _bind_app(self, app_and_orchestrator, seed_user):
+        """Use the session-wide app and orchestrator; the test user is created once per session."""
+        self.app, self.orchestrator = app_and_orchestrator
 
-        # Create test user if needed
-        try:
-            orchestrator.user_service.create_user('testuser', 'Password123!', 'test@example.com')
-        except ValueError:
-            pass  # User already exists
+    def setUp(self):
+        self.app.config['TESTING'] = True
+        self.app.config['WTF_CSRF_ENABLED'] = False  # Disable CSRF for testing
+        self.client = self.app.test_client()
 
         # Login
         self.client.post('/login', data={
@@ -56,6 +56,6 @@ class TestMobileResponsiveness(unittest.TestCase):
         self.assertEqual(response.status_code, 200)
 
         # Verify preference was saved
-        user = orchestrator.user_service.get_user_by_username('testuser')
-        prefs = orchestrator.pref_service.get_preferences_by_category(user['user_id'], 'ui')
+        user = self.orchestrator.user_service.get_user_by_username('testuser')
+        prefs = self.orchestrator.pref_service.get_preferences_by_category(user['user_id'], 'ui')
         self.assertEqual(prefs['mobile_view'], 'compact')
\ No newline at end of file
@@ -53,12 +53,15 @@ class TestModels(unittest.TestCase):
             f"idx_job_states_job_id_user_id",
             f"idx_job_states_state",
             f"idx_job_analysis_job_id_user_id",
-            f"idx_user_preferences_user_id_category"
+            f"idx_user_preferences_user_id_category_name_value"
         ]
 
         for idx in expected_indexes:
             self.assertIn(idx, indexes)
 
+        # The covering index replaces the narrower (user_id, category) one
+        self.assertNotIn("idx_user_preferences_user_id_category", indexes)
+
     def test_users_model(self):
         """Test the Users model."""
         # Create users table
@@ -109,6 +112,24 @@ class TestModels(unittest.TestCase):
         self.assertEqual(deserialized, test_value)
         self.assertEqual(deserialized['nested']['innerkey'], "innervalue")
 
+    def test_user_preferences_json_serialization(self):
+        """Test that preference values are stored as compact JSON."""
+        for value in [["Python", "SQL"], {"state": "relevant"}, 0.7, True, None, "Remote"]:
+            json_value = UserPreferences.json_serialize(value)
+            self.assertIsInstance(json_value, str)
+            self.assertNotIn(", ", json_value)
+            self.assertEqual(UserPreferences.json_deserialize(json_value), value)
+
+        # Values written with the default json separators must still load
+        self.assertEqual(UserPreferences.json_deserialize(json.dumps(["a", "b"])), ["a", "b"])
+
+    def test_user_preferences_json_serialization_without_orjson(self):
+        """Test the standard library fallback used when orjson is unavailable."""
+        with patch('database.models.orjson', None):
+            json_value = UserPreferences.json_serialize({"skills": ["Python", "SQL"]})
+            self.assertEqual(json_value, '{"skills":["Python","SQL"]}')
+            self.assertEqual(UserPreferences.json_deserialize(json_value), {"skills": ["Python", "SQL"]})
+
     def test_job_listings_model(self):
         """Test the JobListings model."""
         # Create job listings table
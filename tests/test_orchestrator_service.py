@@ -30,10 +30,10 @@ class TestOrchestratorService(unittest.TestCase):
         self.mock_scraper_service = MagicMock()
         self.mock_scraper_service_class.return_value = self.mock_scraper_service
 
-        self.analysis_service_patcher = patch('services.orchestrator_service.AnalysisService')
+        self.analysis_service_patcher = patch('services.orchestrator_service.AnalysisServiceFactory')
         self.mock_analysis_service_class = self.analysis_service_patcher.start()
         self.mock_analysis_service = MagicMock()
-        self.mock_analysis_service_class.return_value = self.mock_analysis_service
+        self.mock_analysis_service_class.create_analysis_service.return_value = self.mock_analysis_service
 
         self.scheduler_service_patcher = patch('services.orchestrator_service.SchedulerService')
         self.mock_scheduler_service_class = self.scheduler_service_patcher.start()
@@ -146,6 +146,10 @@ class TestOrchestratorService(unittest.TestCase):
             1, 'scheduling', preferences['scheduling']
         )
 
+        # Verify cached preference reads were dropped for the user
+        self.mock_scraper_service.invalidate_preferences.assert_called_once_with(1)
+        self.mock_scheduler_service.scraper_service.invalidate_preferences.assert_called_once_with(1)
+
         # Verify scheduler was updated for scheduling preferences
         self.mock_scheduler_service.update_schedule.assert_called_once_with(
             1, 'weekly', 'Monday 09:00', True
@@ -278,14 +282,16 @@ class TestOrchestratorService(unittest.TestCase):
             'state_timestamp': '2023-01-01 12:05:00'
         }
 
-        # Reset mocks
-        self.mock_db_service.add_job_state.reset_mock()
-
         # Call the method again
         result = self.orchestrator_service.get_job_details('job123', 1)
+        self.orchestrator_service.flush_pending_writes()
 
-        # Verify job was marked as viewed (state was 'relevant')
-        self.mock_db_service.add_job_state.assert_called_once_with('job123', 1, 'viewed')
+        # Verify job was marked as viewed (state was 'relevant') by the background writer
+        self.mock_db_service.add_job_state.assert_not_called()
+        self.mock_db_service.add_job_states.assert_called_once()
+        (written,), _ = self.mock_db_service.add_job_states.call_args
+        self.assertEqual(len(written), 1)
+        self.assertEqual(written[0][:4], ('job123', 1, 'viewed', None))
 
         # Test job not found
         self.mock_db_service.get_job_by_id.return_value = None
@@ -294,11 +300,24 @@ class TestOrchestratorService(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.orchestrator_service.get_job_details('nonexistent', 1)
 
+    def test_deferred_viewed_writes_are_batched(self):
+        """Test that queued viewed writes are flushed together."""
+        self.mock_db_service.get_job_by_id.return_value = {'job_id': 'job', 'title': 'Data Scientist'}
+        self.mock_db_service.get_current_job_state.return_value = {'state': 'relevant'}
+
+        for i in range(3):
+            self.orchestrator_service.get_job_details(f'job{i}', 1)
+        self.orchestrator_service.flush_pending_writes()
+
+        # All views land in a single executemany batch
+        self.mock_db_service.add_job_states.assert_called_once()
+        (written,), _ = self.mock_db_service.add_job_states.call_args
+        self.assertEqual([state[0] for state in written], ['job0', 'job1', 'job2'])
+
     def test_update_job_state(self):
         """Test updating a job's state."""
         # Mock service responses
-        self.mock_db_service.add_job_state.return_value = 1
-        self.mock_db_service.get_current_job_state.return_value = {
+        self.mock_db_service.add_job_state_returning.return_value = {
             'state': 'saved',
             'state_timestamp': '2023-01-01 12:00:00'
         }
@@ -307,8 +326,8 @@ class TestOrchestratorService(unittest.TestCase):
         result = self.orchestrator_service.update_job_state('job123', 1, 'saved', 'Good fit')
 
         # Verify service was called
-        self.mock_db_service.add_job_state.assert_called_once_with('job123', 1, 'saved', 'Good fit')
-        self.mock_db_service.get_current_job_state.assert_called_once_with('job123', 1)
+        self.mock_db_service.add_job_state_returning.assert_called_once_with('job123', 1, 'saved', 'Good fit')
+        self.mock_db_service.get_current_job_state.assert_not_called()
 
         # Verify result
         self.assertEqual(result['status'], 'success')
@@ -378,15 +397,44 @@ class TestOrchestratorService(unittest.TestCase):
 
     def test_stop_services(self):
         """Test stopping all services."""
+        # Queue a deferred viewed write that must land before shutdown
+        self.mock_db_service.get_job_by_id.return_value = {'job_id': 'job123'}
+        self.mock_db_service.get_current_job_state.return_value = {'state': 'relevant'}
+        self.orchestrator_service.get_job_details('job123', 1)
+
         # Call the method
         self.orchestrator_service.stop_services()
 
+        # Verify the queued write was flushed before the connections closed, and the writer thread stopped
+        self.mock_db_service.add_job_states.assert_called_once()
+        calls = [name for name, _, _ in self.mock_db_service.mock_calls]
+        self.assertLess(calls.index('add_job_states'), calls.index('db_manager.close_all'))
+        self.assertFalse(self.orchestrator_service._writer_thread.is_alive())
+
         # Verify scheduler was stopped
         self.mock_scheduler_service.stop.assert_called_once()
 
         # Verify database connections were closed
         self.mock_db_service.db_manager.close_all.assert_called_once()
 
+    def test_stop_services_twice(self):
+        """Test that stopping again is a no-op and later views are written directly."""
+        self.orchestrator_service.stop_services()
+        self.orchestrator_service.stop_services()
+
+        # The second call returned early
+        self.mock_scheduler_service.stop.assert_called_once()
+        self.mock_db_service.db_manager.close_all.assert_called_once()
+
+        # With the writer stopped, a view is written synchronously and flushing returns at once
+        self.mock_db_service.get_job_by_id.return_value = {'job_id': 'job123'}
+        self.mock_db_service.get_current_job_state.return_value = {'state': 'relevant'}
+        self.orchestrator_service.get_job_details('job123', 1)
+        self.orchestrator_service.flush_pending_writes()
+
+        self.mock_db_service.add_job_state.assert_called_once_with('job123', 1, 'viewed')
+        self.mock_db_service.add_job_states.assert_not_called()
+
     def test_delete_job(self):
         """Test deleting a job through the orchestrator."""
         # Mock job details
@@ -6,7 +6,7 @@ import datetime
 
 from services.preference_service import PreferenceService
 from database.models import UserPreferences
-from tests.mock_db_manager import MockDatabaseManager
+from tests.mock_db_manager import get_mock_db_manager
 
 
 class TestPreferenceService(unittest.TestCase):
@@ -15,7 +15,7 @@ class TestPreferenceService(unittest.TestCase):
     def setUp(self):
         """Set up the test environment before each test method."""
         # Create the mock database manager
-        self.mock_db_manager = MockDatabaseManager()
+        self.mock_db_manager = get_mock_db_manager()
 
         # Patch the DatabaseManager to return our mock
         self.db_manager_patcher = patch('services.preference_service.DatabaseManager')
@@ -170,26 +170,32 @@ class TestPreferenceService(unittest.TestCase):
 
     def test_update_preference_category(self):
         """Test updating multiple preferences in a category."""
-        # Mock set_preference
-        with patch.object(self.pref_service, 'set_preference') as mock_set:
-            # Call the method
-            values = {
-                'required_skills': ['Python', 'SQL'],
-                'preferred_skills': ['TensorFlow', 'PyTorch'],
-                'relevance_threshold': 0.8
-            }
-            self.pref_service.update_preference_category(1, 'analysis', values)
-
-            # Verify set_preference was called for each value
-            self.assertEqual(mock_set.call_count, 3)
-
-            # Verify specific calls
-            expected_calls = [
-                call(1, 'analysis', 'required_skills', ['Python', 'SQL']),
-                call(1, 'analysis', 'preferred_skills', ['TensorFlow', 'PyTorch']),
-                call(1, 'analysis', 'relevance_threshold', 0.8)
-            ]
-            mock_set.assert_has_calls(expected_calls, any_order=True)
+        self.mock_db_manager.execute_many.reset_mock()
+
+        # Call the method
+        values = {
+            'required_skills': ['Python', 'SQL'],
+            'preferred_skills': ['TensorFlow', 'PyTorch'],
+            'relevance_threshold': 0.8
+        }
+        self.pref_service.update_preference_category(1, 'analysis', values)
+
+        # Verify all values were upserted in a single batch
+        self.mock_db_manager.execute_many.assert_called_once()
+        query, params_list = self.mock_db_manager.execute_many.call_args[0]
+        self.assertIn('ON CONFLICT', query)
+        self.assertEqual(len(params_list), 3)
+
+        # Verify specific values
+        written = {params[2]: UserPreferences.json_deserialize(params[3]) for params in params_list}
+        self.assertEqual(written, values)
+        for params in params_list:
+            self.assertEqual(params[:2], (1, 'analysis'))
+
+        # An empty update should not touch the database
+        self.mock_db_manager.execute_many.reset_mock()
+        self.pref_service.update_preference_category(1, 'analysis', {})
+        self.mock_db_manager.execute_many.assert_not_called()
 
     def test_delete_preference(self):
         """Test deleting a preference."""
@@ -0,0 +1,62 @@
+from constants.analysis import AnalysisConstants
+from services.prompt_templates import PromptTemplates
+
+
+class TestPromptTemplates:
+    """Unit tests for the prompt templates used in job analysis."""
+
+    def test_title_prompt_includes_inputs(self):
+        prompt = PromptTemplates.get_title_analysis_prompt(
+            title='ML Engineer', company='Acme', professional_context='a Data Scientist',
+            relevant_patterns=['AI', 'ML'], job_titles=['Data Scientist', 'ML Engineer'],
+            title_match_strictness=0.5
+        )
+        assert 'You are evaluating if a job title is relevant for a Data Scientist.' in prompt
+        assert 'Job Title: "ML Engineer"' in prompt
+        assert 'Company: "Acme"' in prompt
+        assert 'Relevant title patterns to look for: AI, ML' in prompt
+        assert 'Target job titles: Data Scientist, ML Engineer' in prompt
+        assert 'Match strictness level: 0.5' in prompt
+
+    def test_title_prompt_without_job_titles(self):
+        prompt = PromptTemplates.get_title_analysis_prompt(
+            title='ML Engineer', company='Acme', professional_context='a professional',
+            relevant_patterns=['AI']
+        )
+        assert 'Target job titles' not in prompt
+        assert 'Match strictness level: 0.8' in prompt
+
+    def test_description_prompt_includes_inputs(self):
+        prompt = PromptTemplates.get_description_analysis_prompt(
+            title='ML Engineer', company='Acme', description='Build models.',
+            professional_context='a Data Scientist', required_skills=['Python'],
+            preferred_skills=['PyTorch', 'NLP'], job_titles=['ML Engineer'],
+            title_match_strictness=0.6, relevance_threshold=0.75
+        )
+        assert '"Build models."' in prompt
+        assert 'Required skills to look for: Python' in prompt
+        assert 'Preferred skills to look for: PyTorch, NLP' in prompt
+        assert 'Target job titles: ML Engineer' in prompt
+        assert 'Relevance threshold: 0.75' in prompt
+
+    def test_description_prompt_with_empty_skills(self):
+        prompt = PromptTemplates.get_description_analysis_prompt(
+            title='ML Engineer', company='Acme', description='Build models.',
+            professional_context='a professional', required_skills=[], preferred_skills=[]
+        )
+        assert 'Required skills to look for: \n' in prompt
+        assert 'Target job titles' not in prompt
+
+    def test_description_prompt_normalizes_whitespace(self):
+        prompt = PromptTemplates.get_description_analysis_prompt(
+            title='ML Engineer', company='Acme', description='  Build\n\tmodels   and\r\nship them. ',
+            professional_context='a professional', required_skills=['Python'], preferred_skills=[]
+        )
+        assert '"Build models and ship them."' in prompt
+
+    def test_description_prompt_truncates_long_description(self):
+        prompt = PromptTemplates.get_description_analysis_prompt(
+            title='ML Engineer', company='Acme', description='x' * (AnalysisConstants.MAX_DESCRIPTION_LENGTH + 50),
+            professional_context='a professional', required_skills=['Python'], preferred_skills=[]
+        )
+        assert '"' + 'x' * AnalysisConstants.MAX_DESCRIPTION_LENGTH + '..."' in prompt
@@ -23,10 +23,10 @@ class TestSchedulerService(unittest.TestCase):
         self.mock_scraper_service = MagicMock()
         self.mock_scraper_service_class.return_value = self.mock_scraper_service
 
-        self.analysis_service_patcher = patch('services.scheduler_service.AnalysisService')
+        self.analysis_service_patcher = patch('services.scheduler_service.AnalysisServiceFactory')
         self.mock_analysis_service_class = self.analysis_service_patcher.start()
         self.mock_analysis_service = MagicMock()
-        self.mock_analysis_service_class.return_value = self.mock_analysis_service
+        self.mock_analysis_service_class.create_analysis_service.return_value = self.mock_analysis_service
 
         # Mock schedule library
         self.schedule_patcher = patch('services.scheduler_service.schedule')
@@ -39,6 +39,7 @@ class TestSchedulerService(unittest.TestCase):
         # Mock time to avoid sleep delays
         self.time_patcher = patch('services.scheduler_service.time')
         self.mock_time = self.time_patcher.start()
+        self.mock_time.time.return_value = 1672574400.0
 
         # Mock datetime
         self.datetime_patcher = patch('services.scheduler_service.datetime')
@@ -50,10 +51,6 @@ class TestSchedulerService(unittest.TestCase):
         self.logging_patcher = patch('services.scheduler_service.logger')
         self.mock_logger = self.logging_patcher.start()
 
-        # Mock traceback
-        self.traceback_patcher = patch('services.scheduler_service.traceback')
-        self.mock_traceback = self.traceback_patcher.start()
-
         # Create service instance
         self.scheduler_service = SchedulerService()
 
@@ -71,7 +68,6 @@ class TestSchedulerService(unittest.TestCase):
         self.time_patcher.stop()
         self.datetime_patcher.stop()
         self.logging_patcher.stop()
-        self.traceback_patcher.stop()
 
         # Stop any threads that might have been started
         if hasattr(self.scheduler_service, 'stop_event'):
@@ -93,6 +89,23 @@ class TestSchedulerService(unittest.TestCase):
         self.assertIsNone(self.scheduler_service.scheduler_thread)
         self.assertIsInstance(self.scheduler_service.stop_event, MagicMock)
 
+    def test_max_idle_seconds(self):
+        """Test configuring the longest scheduler sleep."""
+        self.assertEqual(self.scheduler_service.max_idle_seconds, 60)
+
+        scheduler_service = SchedulerService(max_idle_seconds=300)
+        scheduler_service._load_schedules = MagicMock()
+        scheduler_service._schedules_dirty = MagicMock()
+        scheduler_service._schedules_dirty.is_set.return_value = False
+        scheduler_service.stop_event = MagicMock()
+        scheduler_service.stop_event.is_set.side_effect = [False, False, True]
+        scheduler_service._reload_event = MagicMock()
+        self.mock_schedule.idle_seconds.side_effect = [None, 3600]
+
+        scheduler_service._scheduler_loop()
+
+        scheduler_service._reload_event.wait.assert_has_calls([call(timeout=300), call(timeout=300)])
+
     def test_start(self):
         """Test starting the scheduler thread."""
         # First call should start thread
@@ -116,6 +129,7 @@ class TestSchedulerService(unittest.TestCase):
         # Set up a mock thread
         mock_thread = MagicMock()
         self.scheduler_service.scheduler_thread = mock_thread
+        self.scheduler_service._reload_event = MagicMock()
 
         # Thread is alive
         mock_thread.is_alive.return_value = True
@@ -123,8 +137,9 @@ class TestSchedulerService(unittest.TestCase):
         # Call stop
         self.scheduler_service.stop()
 
-        # Verify thread was stopped
+        # Verify thread was stopped and woken up
         self.scheduler_service.stop_event.set.assert_called_once()
+        self.scheduler_service._reload_event.set.assert_called_once()
         mock_thread.join.assert_called_once()
         self.assertIsNone(self.scheduler_service.scheduler_thread)
 
@@ -148,10 +163,14 @@ class TestSchedulerService(unittest.TestCase):
 
     def test_scheduler_loop(self):
         """Test the main scheduler loop."""
+        self.scheduler_service._schedules_dirty = MagicMock()
+        self.scheduler_service._schedules_dirty.is_set.return_value = False
+
         # Mock _load_schedules method
         with patch.object(self.scheduler_service, '_load_schedules') as mock_load:
-            # Set up the loop to run once then exit
-            self.scheduler_service.stop_event.is_set.side_effect = [False, True]
+            # Set up the loop to run twice then exit
+            self.scheduler_service.stop_event.is_set.side_effect = [False, False, True]
+            self.mock_schedule.idle_seconds.side_effect = [3600, None]
 
             # Call the method
             self.scheduler_service._scheduler_loop()
@@ -160,10 +179,27 @@ class TestSchedulerService(unittest.TestCase):
             mock_load.assert_called_once()
 
             # Verify schedule.run_pending was called
-            self.mock_schedule.run_pending.assert_called_once()
+            self.assertEqual(self.mock_schedule.run_pending.call_count, 2)
+
+            # Verify the loop waited for the next job (capped) instead of polling
+            self.mock_time.sleep.assert_not_called()
+            self.scheduler_service._reload_event.wait.assert_has_calls([
+                call(timeout=self.scheduler_service.max_idle_seconds),
+                call(timeout=self.scheduler_service.max_idle_seconds)
+            ])
 
-            # Verify sleep was called
-            self.mock_time.sleep.assert_called_once_with(1)
+    def test_scheduler_loop_due_job(self):
+        """Test that the scheduler loop does not sleep when a job is overdue."""
+        self.scheduler_service._schedules_dirty = MagicMock()
+        self.scheduler_service._schedules_dirty.is_set.return_value = False
+
+        with patch.object(self.scheduler_service, '_load_schedules'):
+            self.scheduler_service.stop_event.is_set.side_effect = [False, True]
+            self.mock_schedule.idle_seconds.return_value = -2.5
+
+            self.scheduler_service._scheduler_loop()
+
+            self.scheduler_service._reload_event.wait.assert_called_once_with(timeout=0.0)
 
     def test_load_schedules(self):
         """Test loading schedules from the database."""
@@ -227,14 +263,62 @@ class TestSchedulerService(unittest.TestCase):
         # Verify error was logged
         self.mock_logger.error.assert_called_once()
 
+    def test_load_schedules_only_changes(self):
+        """Test that reloading only touches schedules that changed."""
+        daily = {'user_id': 1, 'schedule_type': ScheduleSettings.TYPE_DAILY, 'execution_time': '08:00'}
+        self.mock_db_service.get_active_schedules.return_value = [daily]
+        self.scheduler_service._load_schedules()
+        self.mock_schedule.clear.assert_called_once_with()
+
+        # Nothing changed: the scheduler is left alone
+        self.mock_schedule.reset_mock()
+        self.scheduler_service._load_schedules()
+        self.mock_schedule.clear.assert_not_called()
+        self.mock_schedule.every.assert_not_called()
+
+        # User 1 moved to 09:00: only that schedule is replaced
+        self.mock_db_service.get_active_schedules.return_value = [
+            dict(daily, execution_time='09:00'),
+            {'user_id': 2, 'schedule_type': ScheduleSettings.TYPE_CUSTOM, 'execution_time': 'interval:6'}
+        ]
+        self.scheduler_service._load_schedules()
+        self.mock_schedule.clear.assert_called_once_with(
+            SchedulerService._schedule_tag(1, ScheduleSettings.TYPE_DAILY, '08:00')
+        )
+        self.mock_schedule.every.return_value.day.at.assert_called_once_with('09:00')
+        self.mock_schedule.every.return_value.day.at.return_value.do.return_value.tag.assert_called_once_with(
+            SchedulerService._schedule_tag(1, ScheduleSettings.TYPE_DAILY, '09:00')
+        )
+        self.mock_schedule.every.return_value.hours.do.assert_called_once()
+
+    def test_load_schedules_weekly_validation(self):
+        """Test that weekly and custom schedules in a bad format are skipped."""
+        self.mock_db_service.get_active_schedules.return_value = [
+            {'user_id': 1, 'schedule_type': ScheduleSettings.TYPE_WEEKLY, 'execution_time': 'Friday 09:30'},
+            {'user_id': 2, 'schedule_type': ScheduleSettings.TYPE_WEEKLY, 'execution_time': 'funday 09:30'},
+            {'user_id': 3, 'schedule_type': ScheduleSettings.TYPE_WEEKLY, 'execution_time': 'monday 9am'},
+            {'user_id': 4, 'schedule_type': ScheduleSettings.TYPE_CUSTOM, 'execution_time': 'interval:abc'},
+            {'user_id': 5, 'schedule_type': ScheduleSettings.TYPE_CUSTOM, 'execution_time': 'hourly'}
+        ]
+
+        self.scheduler_service._load_schedules()
+
+        # Only the valid schedule was added
+        self.mock_schedule.every.return_value.friday.at.assert_called_once_with('09:30')
+        self.mock_schedule.every.return_value.friday.at.return_value.do.assert_called_once()
+        self.mock_schedule.every.return_value.monday.at.assert_not_called()
+        self.mock_schedule.every.return_value.hours.do.assert_not_called()
+        self.assertEqual(self.mock_logger.error.call_count, 4)
+
     def test_run_scheduled_job(self):
         """Test running a scheduled job."""
         # Mock scraper and analyzer results
         self.mock_scraper_service.scrape_jobs.return_value = {'status': 'success', 'jobs_found': 5}
         self.mock_analysis_service.analyze_queued_jobs.return_value = {'analyzed': 5, 'relevant': 3}
 
-        # Mock _set_job_status and _update_job_status
-        with patch.object(self.scheduler_service, '_set_job_status') as mock_set:
+        # Mock _set_job_status, _patch_job_status and _update_job_status
+        with patch.object(self.scheduler_service, '_set_job_status') as mock_set, \
+                patch.object(self.scheduler_service, '_patch_job_status') as mock_patch:
             with patch.object(self.scheduler_service, '_update_job_status') as mock_update:
                 # Call the method
                 self.scheduler_service._run_scheduled_job(1)
@@ -246,7 +330,7 @@ class TestSchedulerService(unittest.TestCase):
                         'status': 'running',
                         'user_id': 1,
                         'type': 'scheduled',
-                        'start_time': '2023-01-01T12:00:00',
+                        'start_time': self.mock_time.time.return_value,
                         'steps': []
                     }
                 )
@@ -257,23 +341,19 @@ class TestSchedulerService(unittest.TestCase):
                 # Verify analyzer was called
                 self.mock_analysis_service.analyze_queued_jobs.assert_called_once()
 
-                # Verify status updates were made
-                self.assertTrue(mock_update.call_count >= 2)
+                # Verify completion was recorded exactly once
+                complete_calls = [c for c in mock_update.call_args_list if c[0][1:3] == ('analyzing', 'complete')]
+                self.assertEqual(complete_calls, [call('scheduled_1_' + str(int(self.mock_time.time.return_value)), 'analyzing', 'complete', {'analyzed': 5, 'relevant': 3})])
 
-                # Verify status was set as completed at end
-                mock_set.assert_any_call(
+                # Verify the running status was marked completed in place
+                self.assertEqual(mock_set.call_count, 1)
+                mock_patch.assert_called_once_with(
                     'scheduled_1_' + str(int(self.mock_time.time.return_value)),
-                    {
-                        'status': 'completed',
-                        'user_id': 1,
-                        'type': 'scheduled',
-                        'start_time': '2023-01-01T12:00:00',
-                        'end_time': '2023-01-01T12:00:00',
-                        'steps': mock_update.return_value,
-                        'result': {
-                            'scraping': {'status': 'success', 'jobs_found': 5},
-                            'analyzing': {'analyzed': 5, 'relevant': 3}
-                        }
+                    status='completed',
+                    end_time=self.mock_time.time.return_value,
+                    result={
+                        'scraping': {'status': 'success', 'jobs_found': 5},
+                        'analyzing': {'analyzed': 5, 'relevant': 3}
                     }
                 )
 
@@ -287,8 +367,8 @@ class TestSchedulerService(unittest.TestCase):
             # Call the method
             self.scheduler_service._run_scheduled_job(1)
 
-            # Verify error was logged
-            self.mock_logger.error.assert_called()
+            # Verify error was logged with its traceback
+            self.mock_logger.exception.assert_called_once()
 
             # Verify status was set as failed
             mock_set.assert_any_call(
@@ -297,39 +377,108 @@ class TestSchedulerService(unittest.TestCase):
                     'status': 'failed',
                     'user_id': 1,
                     'type': 'scheduled',
-                    'start_time': '2023-01-01T12:00:00',
-                    'end_time': '2023-01-01T12:00:00',
+                    'start_time': self.mock_time.time.return_value,
+                    'end_time': self.mock_time.time.return_value,
                     'steps': [],
                     'error': 'Test error'
                 }
             )
 
+    def test_run_scheduled_job_pipelined(self):
+        """Test that scheduled jobs analyze while scraping, like manual jobs."""
+        with patch.object(self.scheduler_service, '_scrape_and_analyze') as mock_pipeline, \
+                patch.object(self.scheduler_service, '_set_job_status'), \
+                patch.object(self.scheduler_service, '_update_job_status'):
+            mock_pipeline.return_value = ({'status': 'success'}, {'analyzed': 1})
+
+            self.scheduler_service._run_scheduled_job(1)
+
+            mock_pipeline.assert_called_once_with(
+                'scheduled_1_' + str(int(self.mock_time.time.return_value)), 1
+            )
+            self.mock_analysis_service.analyze_queued_jobs.assert_not_called()
+
     def test_run_job_now(self):
         """Test running a job immediately."""
-        # Mock is_testing to be False to ensure Thread is created
-        with patch('sys.modules', {'pytest': None, 'unittest': None}):
+        # Mock is_testing to be False to ensure the job goes to the job pool
+        with patch.object(self.scheduler_service, '_is_testing', False), \
+                patch.object(self.scheduler_service, '_submit_job') as mock_submit:
             # Call the method
             job_id = self.scheduler_service.run_job_now(1)
 
-            # Verify a thread was started
-            self.mock_threading.Thread.assert_called_once()
-            self.mock_threading.Thread.return_value.start.assert_called_once()
+            # Verify the job was submitted to the pool
+            mock_submit.assert_called_once_with(self.scheduler_service._run_manual_job, job_id, 1)
 
             # Verify job_id format
             self.assertTrue(job_id.startswith('manual_1_'))
 
             # Test with callback
             mock_callback = MagicMock()
-            self.mock_threading.Thread.reset_mock()
+            mock_submit.reset_mock()
 
             job_id = self.scheduler_service.run_job_now(1, mock_callback)
 
             # Verify callback was registered
             self.assertEqual(self.scheduler_service.callbacks[job_id], mock_callback)
 
-            # Verify thread was started
-            self.mock_threading.Thread.assert_called_once()
-            self.mock_threading.Thread.return_value.start.assert_called_once()
+            # Verify the job was submitted to the pool
+            mock_submit.assert_called_once_with(self.scheduler_service._run_manual_job, job_id, 1)
+
+    def test_submit_job(self):
+        """Test that jobs run on a shared, bounded pool that stop() shuts down."""
+        future = self.scheduler_service._submit_job(lambda x: x * 2, 21)
+        self.assertEqual(future.result(timeout=5), 42)
+
+        executor = self.scheduler_service.job_executor
+        self.assertEqual(executor._max_workers, SchedulerService.MAX_CONCURRENT_JOBS)
+
+        # The pool is reused between jobs
+        self.scheduler_service._submit_job(lambda: None).result(timeout=5)
+        self.assertIs(self.scheduler_service.job_executor, executor)
+
+        # Stopping shuts the pool down; the next job gets a new one
+        self.scheduler_service.stop()
+        self.assertIsNone(self.scheduler_service.job_executor)
+        self.scheduler_service._submit_job(lambda: None).result(timeout=5)
+        self.assertIsNot(self.scheduler_service.job_executor, executor)
+        self.scheduler_service.stop()
+
+    def test_submit_analysis(self):
+        """Test that analysis runs on a pool sized for every concurrent job, which stop() shuts down."""
+        future = self.scheduler_service._submit_analysis(lambda x: x * 2, 21)
+        self.assertEqual(future.result(timeout=5), 42)
+
+        executor = self.scheduler_service.analysis_executor
+        self.assertEqual(executor._max_workers, SchedulerService.MAX_CONCURRENT_JOBS)
+
+        # Stopping shuts the pool down; the next analysis gets a new one
+        self.scheduler_service.stop()
+        self.assertIsNone(self.scheduler_service.analysis_executor)
+        self.assertTrue(executor._shutdown)
+        self.scheduler_service._submit_analysis(lambda: None).result(timeout=5)
+        self.assertIsNot(self.scheduler_service.analysis_executor, executor)
+        self.scheduler_service.stop()
+
+    def test_scheduled_job_runs_on_job_pool(self):
+        """Test that scheduled jobs are handed to the job pool instead of running inline."""
+        self.mock_db_service.get_active_schedules.return_value = [
+            {'user_id': 1, 'schedule_type': ScheduleSettings.TYPE_DAILY, 'execution_time': '08:00'}
+        ]
+        self.scheduler_service._load_schedules()
+
+        # The schedule fires _submit_job with the safe wrapper and the user ID
+        job_args = self.mock_schedule.every.return_value.day.at.return_value.do.call_args[0]
+        self.assertEqual(job_args, (self.scheduler_service._submit_job,
+                                    self.scheduler_service._run_scheduled_job_safely, 1))
+
+    def test_run_scheduled_job_safely(self):
+        """Test that errors in scheduled jobs are logged instead of raised."""
+        with patch.object(self.scheduler_service, '_run_scheduled_job',
+                          side_effect=Exception("Test error")) as mock_run:
+            self.scheduler_service._run_scheduled_job_safely(1)
+
+        mock_run.assert_called_once_with(1)
+        self.mock_logger.exception.assert_called_once()
 
     def test_run_manual_job(self):
         """Test running a manual job in a thread."""
@@ -340,8 +489,9 @@ class TestSchedulerService(unittest.TestCase):
         self.mock_scraper_service.scrape_jobs.return_value = {'status': 'success', 'jobs_found': 5}
         self.mock_analysis_service.analyze_queued_jobs.return_value = {'analyzed': 5, 'relevant': 3}
 
-        # Mock _set_job_status and _update_job_status
-        with patch.object(self.scheduler_service, '_set_job_status') as mock_set:
+        # Mock _set_job_status, _patch_job_status and _update_job_status
+        with patch.object(self.scheduler_service, '_set_job_status') as mock_set, \
+                patch.object(self.scheduler_service, '_patch_job_status') as mock_patch:
             with patch.object(self.scheduler_service, '_update_job_status') as mock_update:
                 # Call the method
                 self.scheduler_service._run_manual_job(job_id, 1)
@@ -353,7 +503,7 @@ class TestSchedulerService(unittest.TestCase):
                         'status': 'running',
                         'user_id': 1,
                         'type': 'manual',
-                        'start_time': '2023-01-01T12:00:00',
+                        'start_time': self.mock_time.time.return_value,
                         'steps': []
                     }
                 )
@@ -364,23 +514,19 @@ class TestSchedulerService(unittest.TestCase):
                 # Verify analyzer was called
                 self.mock_analysis_service.analyze_queued_jobs.assert_called_once()
 
-                # Verify status updates were made
-                self.assertTrue(mock_update.call_count >= 2)
+                # Verify completion was recorded exactly once
+                complete_calls = [c for c in mock_update.call_args_list if c[0][1:3] == ('analyzing', 'complete')]
+                self.assertEqual(complete_calls, [call(job_id, 'analyzing', 'complete', {'analyzed': 5, 'relevant': 3})])
 
-                # Verify status was set as completed at end
-                mock_set.assert_any_call(
+                # Verify the running status was marked completed in place
+                self.assertEqual(mock_set.call_count, 1)
+                mock_patch.assert_called_once_with(
                     job_id,
-                    {
-                        'status': 'completed',
-                        'user_id': 1,
-                        'type': 'manual',
-                        'start_time': '2023-01-01T12:00:00',
-                        'end_time': '2023-01-01T12:00:00',
-                        'steps': mock_update.return_value,
-                        'result': {
-                            'scraping': {'status': 'success', 'jobs_found': 5},
-                            'analyzing': {'analyzed': 5, 'relevant': 3}
-                        }
+                    status='completed',
+                    end_time=self.mock_time.time.return_value,
+                    result={
+                        'scraping': {'status': 'success', 'jobs_found': 5},
+                        'analyzing': {'analyzed': 5, 'relevant': 3}
                     }
                 )
 
@@ -395,8 +541,7 @@ class TestSchedulerService(unittest.TestCase):
             self.scheduler_service._run_manual_job(job_id, 1)
 
             # Verify error was logged
-            self.mock_logger.error.assert_called()
-            self.mock_traceback.print_exc.assert_called_once()
+            self.mock_logger.exception.assert_called_once()
 
             # Verify status was set as failed
             mock_set.assert_any_call(
@@ -405,13 +550,68 @@ class TestSchedulerService(unittest.TestCase):
                     'status': 'failed',
                     'user_id': 1,
                     'type': 'manual',
-                    'start_time': '2023-01-01T12:00:00',
-                    'end_time': '2023-01-01T12:00:00',
+                    'start_time': self.mock_time.time.return_value,
+                    'end_time': self.mock_time.time.return_value,
                     'steps': [],
                     'error': 'Test error'
                 }
             )
 
+    def test_scrape_and_analyze_overlaps(self):
+        """Test that analysis starts while scraping is still running."""
+        analysis_started = threading.Event()
+
+        def analyze(user_id, limit, callback):
+            analysis_started.set()
+            return {'total': 1, 'analyzed': 1, 'relevant': 1, 'not_relevant': 0, 'errors': 0, 'skipped': 0}
+
+        def scrape(user_id, callback):
+            callback('job_found', {'job_id': 'job1'})
+            # Analysis of the first job should begin before scraping finishes
+            self.assertTrue(analysis_started.wait(timeout=5))
+            callback('job_found', {'job_id': 'job2'})
+            return {'status': 'success', 'jobs_found': 2}
+
+        self.mock_scraper_service.scrape_jobs.side_effect = scrape
+        self.mock_analysis_service.analyze_queued_jobs.side_effect = analyze
+
+        scrape_result, analyze_result = self.scheduler_service._scrape_and_analyze('manual_1_1', 1)
+
+        self.assertEqual(scrape_result, {'status': 'success', 'jobs_found': 2})
+        self.assertEqual(self.mock_analysis_service.analyze_queued_jobs.call_count, 2)
+        self.assertEqual(self.mock_analysis_service.analyze_queued_jobs.call_args_list[0][0][:2], (1, 50))
+        self.assertEqual(self.mock_analysis_service.analyze_queued_jobs.call_args_list[1][0][:2], (1, 49))
+        self.assertEqual(analyze_result['analyzed'], 2)
+        self.assertEqual(analyze_result['relevant'], 2)
+
+    def test_scrape_and_analyze_scrape_failure(self):
+        """Test that a scraping failure stops the analysis worker."""
+        self.mock_scraper_service.scrape_jobs.side_effect = Exception("Scrape error")
+
+        with self.assertRaises(Exception):
+            self.scheduler_service._scrape_and_analyze('manual_1_1', 1)
+
+        self.scheduler_service.analysis_executor.shutdown(wait=True)
+        self.mock_analysis_service.analyze_queued_jobs.assert_not_called()
+
+    def test_run_job_now_testing(self):
+        """Test that jobs run synchronously under a test runner."""
+        self.assertTrue(self.scheduler_service._is_testing)
+
+        with patch.object(self.scheduler_service, '_run_manual_job') as mock_run:
+            job_id = self.scheduler_service.run_job_now(1)
+
+        mock_run.assert_called_once_with(job_id, 1)
+        self.mock_threading.Thread.assert_not_called()
+
+    def test_step_status_callback(self):
+        """Test that step callbacks record events for their job and step."""
+        with patch.object(self.scheduler_service, '_update_job_status') as mock_update:
+            callback = self.scheduler_service._step_status_callback('job1', 'scraping')
+            callback('job_found', {'job_id': 'abc'})
+
+        mock_update.assert_called_once_with('job1', 'scraping', 'job_found', {'job_id': 'abc'})
+
     def test_set_job_status(self):
         """Test setting a job's status."""
         # Set up test data
@@ -456,6 +656,48 @@ class TestSchedulerService(unittest.TestCase):
         # Verify error was logged
         self.mock_logger.error.assert_called()
 
+    def test_finished_jobs_are_evicted(self):
+        """Test that only the most recent finished job statuses are kept."""
+        with patch.object(SchedulerService, 'MAX_FINISHED_JOBS', 2):
+            self.scheduler_service._set_job_status('running', {'status': 'running', 'steps': []})
+            for job_id in ('job1', 'job2', 'job3'):
+                self.scheduler_service._set_job_status(job_id, {'status': 'running', 'steps': []})
+                self.scheduler_service._set_job_status(job_id, {'status': 'completed', 'steps': []})
+
+            # The oldest finished job was dropped, the running job is kept
+            self.assertEqual(set(self.scheduler_service.running_jobs), {'running', 'job2', 'job3'})
+            self.assertNotIn('job1', self.scheduler_service._job_locks)
+
+            # Canceling counts as finishing
+            self.scheduler_service.cancel_job('running')
+            self.assertEqual(set(self.scheduler_service.running_jobs), {'job3', 'running'})
+
+            # Late events for a dropped job are ignored
+            self.assertEqual(self.scheduler_service._update_job_status('job1', 'scraping', 'progress', {}), [])
+
+    def test_patch_job_status(self):
+        """Test updating a job's status fields in place."""
+        status = {'status': 'running', 'start_time': 1.0, 'steps': [{'name': 'scraping', 'events': []}]}
+        self.scheduler_service._set_job_status('job1', status)
+        mock_callback = MagicMock()
+        self.scheduler_service.callbacks['job1'] = mock_callback
+
+        result = self.scheduler_service._patch_job_status('job1', status='completed', end_time=2.0)
+
+        # The same status dict is updated, keeping its steps and start time
+        self.assertTrue(result)
+        self.assertIs(self.scheduler_service.running_jobs['job1'], status)
+        self.assertEqual(status['status'], 'completed')
+        self.assertEqual(status['start_time'], 1.0)
+        self.assertEqual(len(status['steps']), 1)
+
+        # Callback was called and removed since the job finished
+        mock_callback.assert_called_once()
+        self.assertNotIn('job1', self.scheduler_service.callbacks)
+
+        # Test job not found
+        self.assertFalse(self.scheduler_service._patch_job_status('nonexistent', status='completed'))
+
     def test_update_job_status(self):
         """Test updating a job's status."""
         # Set up test data
@@ -486,6 +728,20 @@ class TestSchedulerService(unittest.TestCase):
         self.assertEqual(len(job_status['steps'][0]['events']), 2)
         self.assertEqual(job_status['steps'][0]['events'][1]['event'], 'progress')
 
+        # Verify a second step gets its own entry and events keep going to the right step
+        self.scheduler_service._update_job_status(job_id, 'analyzing', 'start', {'total': 5})
+        self.scheduler_service._update_job_status(job_id, 'scraping', 'progress', {'completed': 3})
+        job_status = self.scheduler_service.running_jobs[job_id]
+        self.assertEqual([s['name'] for s in job_status['steps']], ['scraping', 'analyzing'])
+        self.assertEqual(len(job_status['steps'][0]['events']), 3)
+        self.assertEqual(len(job_status['steps'][1]['events']), 1)
+
+        # Steps are only copied out when requested
+        self.assertEqual(self.scheduler_service._update_job_status(job_id, 'scraping', 'progress', {}), [])
+        steps = self.scheduler_service._update_job_status(job_id, 'scraping', 'progress', {}, return_steps=True)
+        self.assertEqual(steps, job_status['steps'])
+        self.assertIsNot(steps, job_status['steps'])
+
         # Test with registered callback
         mock_callback = MagicMock()
         self.scheduler_service.callbacks[job_id] = mock_callback
@@ -514,6 +770,94 @@ class TestSchedulerService(unittest.TestCase):
         self.scheduler_service._update_job_status('nonexistent', 'scraping', 'start', {'total': 5})
         # Should not raise exception
 
+    def test_update_job_status_after_status_replaced(self):
+        """Test that replacing a job's status resets its step index."""
+        job_id = 'test_job_1'
+        self.scheduler_service._set_job_status(job_id, {'status': 'running', 'steps': []})
+        self.scheduler_service._update_job_status(job_id, 'scraping', 'start', {})
+
+        # A new status with its own steps replaces the old one
+        self.scheduler_service._set_job_status(job_id, {
+            'status': 'running',
+            'steps': [{'name': 'scraping', 'events': []}]
+        })
+        self.scheduler_service._update_job_status(job_id, 'scraping', 'progress', {})
+
+        steps = self.scheduler_service.running_jobs[job_id]['steps']
+        self.assertEqual(len(steps), 1)
+        self.assertEqual([e['event'] for e in steps[0]['events']], ['progress'])
+
+    def test_update_job_status_skips_status_lock(self):
+        """Test that events for a known job don't take the shared status lock."""
+        self.scheduler_service._set_job_status('job1', {'status': 'running', 'steps': []})
+        self.scheduler_service.status_lock = MagicMock()
+
+        self.scheduler_service._update_job_status('job1', 'scraping', 'progress', {})
+
+        self.scheduler_service.status_lock.__enter__.assert_not_called()
+        self.assertEqual(len(self.scheduler_service.running_jobs['job1']['steps']), 1)
+
+    def test_update_job_status_per_job_lock(self):
+        """Test that status updates only wait for the lock of their own job."""
+        self.scheduler_service.status_lock = threading.Lock()
+        for job_id in ('job1', 'job2'):
+            self.scheduler_service.running_jobs[job_id] = {'status': 'running', 'steps': []}
+            self.scheduler_service._job_locks[job_id] = threading.Lock()
+
+        job1_updated = threading.Event()
+
+        def update_job1():
+            self.scheduler_service._update_job_status('job1', 'scraping', 'start', {})
+            job1_updated.set()
+
+        with self.scheduler_service._job_locks['job1']:
+            worker = threading.Thread(target=update_job1)
+            worker.start()
+
+            # Another job can be updated while job1 is locked
+            self.scheduler_service._update_job_status('job2', 'scraping', 'start', {})
+            self.assertEqual(len(self.scheduler_service.running_jobs['job2']['steps']), 1)
+            self.assertFalse(job1_updated.wait(timeout=0.1))
+
+        worker.join(timeout=5)
+        self.assertTrue(job1_updated.is_set())
+        self.assertEqual(len(self.scheduler_service.running_jobs['job1']['steps']), 1)
+
+    def test_update_job_status_without_callback(self):
+        """Test that no callback payload is built when no callback is registered."""
+        self.scheduler_service.running_jobs['job1'] = {'status': 'running', 'steps': []}
+
+        with patch('services.scheduler_service._format_timestamp') as mock_format:
+            self.scheduler_service._update_job_status('job1', 'scraping', 'progress', {})
+            mock_format.assert_not_called()
+
+            self.scheduler_service.callbacks['job1'] = MagicMock()
+            self.scheduler_service._update_job_status('job1', 'scraping', 'progress', {})
+            mock_format.assert_called_once()
+            self.scheduler_service.callbacks['job1'].assert_called_once()
+
+    def test_get_job_status_formats_timestamps(self):
+        """Test that stored float timestamps are returned as ISO strings."""
+        self.mock_datetime.datetime.fromtimestamp.side_effect = datetime.datetime.fromtimestamp
+        timestamp = datetime.datetime(2023, 1, 1, 12, 0, 0).timestamp()
+        self.scheduler_service.running_jobs['job1'] = {
+            'status': 'running',
+            'user_id': 1,
+            'start_time': timestamp,
+            'steps': [{'name': 'scraping', 'events': [{'event': 'start', 'data': {}, 'timestamp': timestamp}]}]
+        }
+
+        for status in (self.scheduler_service.get_job_status('job1'),
+                       self.scheduler_service.get_all_job_statuses(1)['job1']):
+            self.assertEqual(status['start_time'], '2023-01-01T12:00:00')
+            self.assertEqual(status['steps'][0]['events'][0]['timestamp'], '2023-01-01T12:00:00')
+
+        # The stored status keeps its floats
+        self.assertEqual(self.scheduler_service.running_jobs['job1']['start_time'], timestamp)
+        self.assertEqual(
+            self.scheduler_service.running_jobs['job1']['steps'][0]['events'][0]['timestamp'], timestamp
+        )
+
     def test_get_job_status(self):
         """Test getting a job's status."""
         # Set up test data
@@ -558,8 +902,21 @@ class TestSchedulerService(unittest.TestCase):
         self.assertIn('job2', result)
         self.assertNotIn('job3', result)
 
+    def test_get_all_job_statuses_snapshot(self):
+        """Test that status writers replace running_jobs instead of changing a dict readers hold."""
+        self.scheduler_service._set_job_status('job1', {'status': 'running', 'user_id': 1, 'steps': []})
+        snapshot = self.scheduler_service.running_jobs
+
+        self.scheduler_service._set_job_status('job2', {'status': 'running', 'user_id': 1, 'steps': []})
+
+        self.assertEqual(set(snapshot), {'job1'})
+        self.assertEqual(set(self.scheduler_service.get_all_job_statuses()), {'job1', 'job2'})
+
     def test_update_schedule(self):
         """Test updating a user's schedule."""
+        self.scheduler_service._schedules_dirty = MagicMock()
+        self.scheduler_service._reload_event = MagicMock()
+
         # Mock _load_schedules
         with patch.object(self.scheduler_service, '_load_schedules') as mock_load:
             # Call the method
@@ -570,8 +927,28 @@ class TestSchedulerService(unittest.TestCase):
                 1, 'daily', '08:00', True
             )
 
-            # Verify schedules were reloaded
-            mock_load.assert_called_once()
+            # Verify the reload was left to the scheduler thread, which was woken up
+            mock_load.assert_not_called()
+            self.scheduler_service._schedules_dirty.set.assert_called_once()
+            self.scheduler_service._reload_event.set.assert_called_once()
+
+    def test_scheduler_loop_reloads_changed_schedules(self):
+        """Test that the scheduler loop reloads schedules once after changes."""
+        self.scheduler_service._schedules_dirty = MagicMock()
+        self.scheduler_service._schedules_dirty.is_set.side_effect = [True, False]
+        self.scheduler_service.stop_event = MagicMock()
+        self.scheduler_service.stop_event.is_set.side_effect = [False, False, True]
+        self.mock_schedule.idle_seconds.return_value = None
+
+        with patch.object(self.scheduler_service, '_load_schedules') as mock_load:
+            self.scheduler_service._scheduler_loop()
+
+            # Initial load plus one reload for the change
+            self.assertEqual(mock_load.call_count, 2)
+            self.scheduler_service.stop_event.wait.assert_called_once_with(
+                timeout=SchedulerService.SCHEDULE_RELOAD_DELAY
+            )
+            self.scheduler_service._schedules_dirty.clear.assert_called_once()
 
     def test_cancel_job(self):
         """Test canceling a running job."""
@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import patch, MagicMock, call, ANY
-import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from services.scraper_service import ScraperService
 from database.models import JobStates
@@ -18,6 +19,13 @@ class TestScraperService(unittest.TestCase):
         self.mock_db_service_class = self.db_service_patcher.start()
         self.mock_db_service = MagicMock()
         self.mock_db_service_class.return_value = self.mock_db_service
+        self.mock_db_service.get_recent_job_ids.return_value = ['job_new', 'job_old']  # Newest first
+
+        # Mock PreferenceService
+        self.pref_service_patcher = patch('services.scraper_service.PreferenceService')
+        self.mock_pref_service_class = self.pref_service_patcher.start()
+        self.mock_pref_service = MagicMock()
+        self.mock_pref_service_class.return_value = self.mock_pref_service
 
         # Mock LinkedinScraper
         self.linkedin_scraper_patcher = patch('services.scraper_service.LinkedinScraper')
@@ -31,13 +39,10 @@ class TestScraperService(unittest.TestCase):
         self.mock_config.DEFAULT_SEARCH_TERMS = ['Python Developer', 'Data Scientist']
         self.mock_config.DEFAULT_LOCATIONS = ['Remote', 'New York']
 
-        # Mock time and random to avoid real delays
+        # Mock time so cache and coalescing windows can be controlled
         self.time_patcher = patch('services.scraper_service.time')
         self.mock_time = self.time_patcher.start()
-
-        self.random_patcher = patch('services.scraper_service.random')
-        self.mock_random = self.random_patcher.start()
-        self.mock_random.uniform.return_value = 0.1  # Fast delay for testing
+        self.mock_time.monotonic.return_value = 100.0
 
         # Mock logging
         self.logging_patcher = patch('services.scraper_service.logger')
@@ -54,10 +59,10 @@ class TestScraperService(unittest.TestCase):
     def tearDown(self):
         """Clean up after each test method."""
         self.db_service_patcher.stop()
+        self.pref_service_patcher.stop()
         self.linkedin_scraper_patcher.stop()
         self.config_patcher.stop()
         self.time_patcher.stop()
-        self.random_patcher.stop()
         self.logging_patcher.stop()
 
     def test_initialize_scraper(self):
@@ -70,6 +75,20 @@ class TestScraperService(unittest.TestCase):
         self.mock_scraper.on.assert_any_call(Events.ERROR, ANY)
         self.mock_scraper.on.assert_any_call(Events.END, ANY)
 
+    def test_scraper_reused_until_chrome_paths_change(self):
+        """Test that the scraper is only rebuilt when the Chrome paths change."""
+        self.mock_pref_service.get_preferences_by_category.return_value = {}
+        scraper = self.scraper_service.scraper
+
+        self.scraper_service._apply_chrome_paths(1)
+        self.assertIs(self.scraper_service.scraper, scraper)
+
+        self.mock_pref_service.get_preferences_by_category.return_value = {
+            'chrome_executable_path': '/usr/bin/chromedriver'
+        }
+        self.scraper_service._apply_chrome_paths(2)
+        self.assertIsNone(self.scraper_service.scraper)
+
     def test_handle_data_new_job(self):
         """Test handling data for a new job."""
         # Setup mocks
@@ -92,19 +111,18 @@ class TestScraperService(unittest.TestCase):
 
         # Call the method
         self.scraper_service._handle_data(event_data)
+        self.scraper_service._flush_callbacks()
 
         # Assertions
         self.assertIn('job1', self.scraper_service.current_jobs)
 
-        # Verify job was added to database
-        self.mock_db_service.add_job_listing.assert_called_once()
-        args = self.mock_db_service.add_job_listing.call_args[0][0]
+        # Verify job and its states were added to database in one call
+        self.mock_db_service.add_scraped_job.assert_called_once()
+        args = self.mock_db_service.add_scraped_job.call_args[0][0]
         self.assertEqual(args['job_id'], 'job1')
         self.assertEqual(args['title'], 'Data Scientist')
-
-        # Verify job states were added
-        self.mock_db_service.add_job_state.assert_any_call('job1', 1, JobStates.STATE_NEW_SCRAPED)
-        self.mock_db_service.add_job_state.assert_any_call('job1', 1, JobStates.STATE_QUEUED_FOR_ANALYSIS)
+        self.assertEqual(self.mock_db_service.add_scraped_job.call_args, call(args, 1, is_new=True))
+        self.mock_db_service.add_job_state.assert_not_called()
 
         # Verify callback was called
         mock_callback.assert_called_once_with('job_found', args)
@@ -134,12 +152,9 @@ class TestScraperService(unittest.TestCase):
         # Assertions
         self.assertIn('job1', self.scraper_service.current_jobs)
 
-        # Verify job was not added again
+        # Verify job was not added again, only its states for the user
         self.mock_db_service.add_job_listing.assert_not_called()
-
-        # Verify job states were added for the user
-        self.mock_db_service.add_job_state.assert_any_call('job1', 1, JobStates.STATE_NEW_SCRAPED)
-        self.mock_db_service.add_job_state.assert_any_call('job1', 1, JobStates.STATE_QUEUED_FOR_ANALYSIS)
+        self.mock_db_service.add_scraped_job.assert_called_once_with(ANY, 1, is_new=False)
 
     def test_handle_data_existing_job_existing_user(self):
         """Test handling data for a job the user has already processed."""
@@ -164,6 +179,38 @@ class TestScraperService(unittest.TestCase):
         # Verify no state changes
         self.mock_db_service.add_job_state.assert_not_called()
 
+    def test_handle_data_known_job_skips_lookup(self):
+        """Test that a cached job ID skips the job existence query."""
+        self.scraper_service.current_user_id = 1
+        self.mock_db_service.get_current_job_state.return_value = None
+
+        event_data = MagicMock(spec=EventData)
+        event_data.job_id = 'job_old'
+        self.scraper_service._handle_data(event_data)
+
+        self.mock_db_service.get_job_by_id.assert_not_called()
+        # The listing insert is kept in case the job was deleted since it was cached
+        self.mock_db_service.add_scraped_job.assert_called_once_with(ANY, 1, is_new=True)
+
+    def test_handle_data_existing_job_remembered(self):
+        """Test that a job found by the existence query is cached for later sightings."""
+        self.scraper_service.current_user_id = 1
+        self.mock_db_service.get_job_by_id.return_value = {'job_id': 'job_stored'}
+        self.mock_db_service.get_current_job_state.return_value = {'state': 'viewed'}
+
+        event_data = MagicMock(spec=EventData)
+        event_data.job_id = 'job_stored'
+        self.scraper_service._handle_data(event_data)
+
+        self.assertTrue(self.scraper_service._is_known_job('job_stored'))
+
+    def test_remember_job_bounded(self):
+        """Test that the known job ID cache evicts the oldest IDs past its limit."""
+        with patch.object(ScraperService, 'KNOWN_JOB_IDS_LIMIT', 2):
+            self.scraper_service._remember_job('job_newest')
+
+        self.assertEqual(list(self.scraper_service._known_ids), ['job_new', 'job_newest'])
+
     def test_handle_data_duplicate_in_run(self):
         """Test handling a job that was already found in the current run."""
         # Setup mocks
@@ -184,6 +231,22 @@ class TestScraperService(unittest.TestCase):
         self.mock_db_service.add_job_listing.assert_not_called()
         self.mock_db_service.add_job_state.assert_not_called()
 
+    def test_handle_data_allowed_ids_early_termination(self):
+        """Test that the scraper stops once every allowed job ID has been found."""
+        self.scraper_service.current_user_id = 1
+        self.scraper_service.allowed_job_ids = frozenset({'job1', 'job2'})
+        self.scraper_service._remaining_ids = {'job1', 'job2'}
+        self.mock_db_service.get_job_by_id.return_value = None
+
+        for job_id in ('job3', 'job1', 'job2'):
+            event_data = MagicMock(spec=EventData)
+            event_data.job_id = job_id
+            self.scraper_service._handle_data(event_data)
+
+        # The job outside the allowed IDs was skipped
+        self.assertEqual(self.scraper_service.current_jobs, {'job1', 'job2'})
+        self.mock_scraper.stop.assert_called_once()
+
     def test_handle_data_no_user_id(self):
         """Test handling data when no user ID is set."""
         # Don't set current_user_id
@@ -212,6 +275,7 @@ class TestScraperService(unittest.TestCase):
         # Call the method
         error = Exception("Scraper error")
         self.scraper_service._handle_error(error)
+        self.scraper_service._flush_callbacks()
 
         # Verify error was logged
         self.mock_logger.error.assert_called_once()
@@ -219,8 +283,33 @@ class TestScraperService(unittest.TestCase):
         # Verify callback was called
         mock_callback.assert_called_once_with('error', {'error': 'Scraper error'})
 
+    def test_callbacks_delivered_off_event_thread(self):
+        """Test that callbacks run in order on the pump thread, not the caller's."""
+        delivered = []
+        self.scraper_service.callback = lambda event, payload: delivered.append(
+            (event, payload, threading.current_thread()))
+
+        self.scraper_service._emit('start', {'queries': 1})
+        self.scraper_service._emit('error', {'error': 'boom'})
+        self.scraper_service._flush_callbacks()
+
+        self.assertEqual([(e, p) for e, p, _ in delivered],
+                         [('start', {'queries': 1}), ('error', {'error': 'boom'})])
+        self.assertTrue(all(t is self.scraper_service._callback_thread for _, _, t in delivered))
+
+    def test_scrape_jobs_init_failure_error_on_pump(self):
+        """Test that the scraper init failure is reported through the callback pump."""
+        delivered = []
+        callback = lambda event, payload: delivered.append((event, threading.current_thread()))
+
+        with patch.object(self.scraper_service, '_ensure_scraper_initialized', return_value=False):
+            result = self.scraper_service.scrape_jobs(1, callback)
+
+        self.assertEqual(result['status'], 'error')
+        self.assertEqual(delivered, [('error', self.scraper_service._callback_thread)])
+
     def test_handle_end(self):
-        """Test handling end of scraping session."""
+        """Test that the end of one query keeps the run's state and doesn't report the run's end."""
         # Setup data
         self.scraper_service.current_jobs.add('job1')
         self.scraper_service.current_jobs.add('job2')
@@ -228,18 +317,20 @@ class TestScraperService(unittest.TestCase):
         # Setup callback
         mock_callback = MagicMock()
         self.scraper_service.callback = mock_callback
+        self.mock_logger.reset_mock()
 
         # Call the method
         self.scraper_service._handle_end()
+        self.scraper_service._flush_callbacks()
 
         # Verify info was logged
         self.mock_logger.info.assert_called_once()
 
-        # Verify callback was called
-        mock_callback.assert_called_once_with('end', {'jobs_found': 2})
+        # Verify the callback was not told the run ended
+        mock_callback.assert_not_called()
 
-        # Verify current_jobs was cleared
-        self.assertEqual(len(self.scraper_service.current_jobs), 0)
+        # Verify current_jobs was kept for the rest of the run
+        self.assertEqual(self.scraper_service.current_jobs, {'job1', 'job2'})
 
     def test_map_experience_level(self):
         """Test mapping experience level strings to LinkedIn filters."""
@@ -261,13 +352,56 @@ class TestScraperService(unittest.TestCase):
         self.assertEqual(internship, ExperienceLevelFilters.INTERNSHIP)
         self.assertEqual(unknown, ExperienceLevelFilters.MID_SENIOR)  # Default
 
-    @patch('services.scraper_service.PreferenceService')
+    def test_get_prefs_cached(self):
+        """Test that repeated preference reads within the TTL hit the cache."""
+        self.mock_pref_service.get_preferences_by_category.return_value = {'locations': ['Remote']}
+
+        first = self.scraper_service._get_prefs(1, 'search')
+        second = self.scraper_service._get_prefs(1, 'search')
+
+        self.assertEqual(first, {'locations': ['Remote']})
+        self.assertIs(first, second)
+        self.mock_pref_service.get_preferences_by_category.assert_called_once_with(1, 'search')
+
+    def test_get_prefs_expired(self):
+        """Test that a cached preference read is refreshed once the TTL passes."""
+        self.mock_pref_service.get_preferences_by_category.side_effect = [{'v': 1}, {'v': 2}]
+
+        self.scraper_service._get_prefs(1, 'search')
+        self.mock_time.monotonic.return_value = 100.0 + ScraperService.PREFERENCE_CACHE_TTL
+
+        self.assertEqual(self.scraper_service._get_prefs(1, 'search'), {'v': 2})
+        self.assertEqual(self.mock_pref_service.get_preferences_by_category.call_count, 2)
+
+    def test_invalidate_preferences(self):
+        """Test that invalidating a user's preferences drops only their cached reads."""
+        self.mock_pref_service.get_preferences_by_category.side_effect = [{'v': 1}, {'v': 1}, {'v': 2}]
+
+        self.scraper_service._get_prefs(1, 'search')
+        self.scraper_service._get_prefs(2, 'search')
+        self.scraper_service.invalidate_preferences(1)
+
+        self.assertEqual(self.scraper_service._get_prefs(1, 'search'), {'v': 2})
+        self.assertEqual(self.scraper_service._get_prefs(2, 'search'), {'v': 1})
+        self.assertEqual(self.mock_pref_service.get_preferences_by_category.call_count, 3)
+
+    def test_update_last_run_coalesced(self):
+        """Test that back-to-back scrapes of a user write last_run once per window."""
+        self.scraper_service._update_last_run(1)
+        self.scraper_service._update_last_run(1)
+        self.mock_db_service.update_last_run.assert_called_once_with(1)
+
+        # Another user, or the same user after the window, is written again
+        self.scraper_service._update_last_run(2)
+        self.mock_time.monotonic.return_value = 100.0 + ScraperService.LAST_RUN_COALESCE_SECONDS
+        self.scraper_service._update_last_run(1)
+        self.assertEqual(self.mock_db_service.update_last_run.call_count, 3)
+
     @patch('services.scraper_service.Query')
-    def test_scrape_jobs(self, mock_query_class, mock_pref_service_class):
+    def test_scrape_jobs(self, mock_query_class):
         """Test scraping jobs based on user preferences."""
         # Setup mocks
-        mock_pref_service = MagicMock()
-        mock_pref_service_class.return_value = mock_pref_service
+        mock_pref_service = self.mock_pref_service
 
         # Setup preferences
         mock_prefs = {
@@ -292,12 +426,13 @@ class TestScraperService(unittest.TestCase):
         self.assertEqual(result['status'], 'success')
         self.assertEqual(result['queries_executed'], 4)
 
-        # Verify queries were created and run
+        # Verify queries were created and handed to the scraper in one run
         self.assertEqual(mock_query_class.call_count, 4)
-        self.assertEqual(self.mock_scraper.run.call_count, 4)
+        self.mock_scraper.run.assert_called_once_with(mock_query_instances)
 
         # Verify callback was called
         mock_callback.assert_any_call('start', {'queries': 4})
+        mock_callback.assert_any_call('end', {'jobs_found': 0})
 
         # Verify user_id and callback were set
         self.assertEqual(self.scraper_service.current_user_id, 1)
@@ -306,15 +441,130 @@ class TestScraperService(unittest.TestCase):
         # Verify last_run was updated
         self.mock_db_service.update_last_run.assert_called_once_with(1)
 
-        # Verify time.sleep was called between queries
-        self.assertEqual(self.mock_time.sleep.call_count, 4)
+    def test_scrape_company_jobs_defaults_to_remote(self):
+        """Test that a company scrape without preferred locations searches remote jobs."""
+        self.mock_pref_service.get_preferences_by_category.return_value = {'locations': []}
+        self.mock_config.DEFAULT_LOCATIONS = ('New York, NY', 'San Francisco, CA')
+
+        result = self.scraper_service.scrape_company_jobs(
+            'https://www.linkedin.com/company/example/jobs', 1, ['job1']
+        )
+
+        self.assertEqual(result['status'], 'success')
+        query = self.mock_scraper.run.call_args[0][0][0]
+        self.assertEqual(query.options.locations, ['Remote'])
 
-    @patch('services.scraper_service.PreferenceService')
-    def test_scrape_jobs_error(self, mock_pref_service_class):
+    def test_scrape_jobs_multiple_queries(self):
+        """Test that the end of one query doesn't end the run while other queries are still going."""
+        self.mock_pref_service.get_preferences_by_category.return_value = {
+            'job_titles': ['Data Scientist', 'Machine Learning Engineer'],
+            'locations': ['Remote'],
+            'experience_levels': ['Entry level'],
+            'remote_preference': True
+        }
+        self.mock_db_service.get_job_by_id.return_value = None
+        first_query_ended = threading.Event()
+
+        def run_query(query):
+            # The scraper emits END after each query; the second query finds its jobs after that
+            if query.query == 'Machine Learning Engineer':
+                first_query_ended.wait(timeout=5)
+
+            for job_id in ('job_shared', f'job_{query.query}'):
+                event_data = MagicMock(spec=EventData)
+                event_data.job_id = job_id
+                event_data.title = query.query
+                event_data.company = 'Company A'
+                event_data.location = 'Remote'
+                event_data.description = 'Job description'
+                event_data.link = 'https://example.com/job'
+                event_data.query = query.query
+                self.scraper_service._handle_data(event_data)
+            self.scraper_service._handle_end()
+
+            if query.query == 'Data Scientist':
+                first_query_ended.set()
+
+        def run(queries):
+            # Like the scraper, run the queries on a pool of workers
+            with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+                list(pool.map(run_query, queries))
+
+        self.mock_scraper.run.side_effect = run
+        mock_callback = MagicMock()
+
+        result = self.scraper_service.scrape_jobs(1, mock_callback)
+
+        # The job found by both queries is saved and counted once
+        self.assertEqual(result['jobs_found'], 3)
+        self.assertEqual(self.mock_db_service.add_scraped_job.call_count, 3)
+
+        # The end is reported once, after every query finished
+        events = [c.args[0] for c in mock_callback.call_args_list]
+        self.assertEqual(events.count('job_found'), 3)
+        self.assertEqual(events.count('end'), 1)
+        self.assertEqual(mock_callback.call_args_list[-1], call('end', {'jobs_found': 3}))
+
+        # The run's state is cleared once the run is over
+        self.assertEqual(self.scraper_service.current_jobs, set())
+
+    def test_overlapping_scheduled_scrapes_keep_their_users(self):
+        """Test that scrapes for two users started together don't mix up users or callbacks."""
+        self.mock_pref_service.get_preferences_by_category.return_value = {
+            'job_titles': ['Data Scientist'],
+            'locations': ['Remote'],
+            'experience_levels': ['Entry level'],
+            'remote_preference': True
+        }
+        self.mock_db_service.get_job_by_id.return_value = None
+
+        first_running = threading.Event()
+        second_running = threading.Event()
+
+        def run(queries):
+            user_id = self.scraper_service.current_user_id
+            if user_id == 1:
+                first_running.set()
+                # Give the second user's scrape the chance to take over the service
+                second_running.wait(timeout=0.2)
+            else:
+                second_running.set()
+
+            event_data = MagicMock(spec=EventData)
+            event_data.job_id = f'job_user{user_id}'
+            event_data.title = 'Data Scientist'
+            event_data.company = 'Company A'
+            event_data.location = 'Remote'
+            event_data.description = 'Job description'
+            event_data.link = 'https://example.com/job'
+            event_data.query = 'Data Scientist'
+            self.scraper_service._handle_data(event_data)
+
+        self.mock_scraper.run.side_effect = run
+        found = {1: [], 2: []}
+
+        def callback_for(user_id):
+            def callback(event, data):
+                if event == 'job_found':
+                    found[user_id].append(data['job_id'])
+            return callback
+
+        # Two scheduled jobs on the job pool, the second starting while the first scrapes
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            first = pool.submit(self.scraper_service.scrape_jobs, 1, callback_for(1))
+            self.assertTrue(first_running.wait(timeout=5))
+            second = pool.submit(self.scraper_service.scrape_jobs, 2, callback_for(2))
+            results = [first.result(timeout=5), second.result(timeout=5)]
+
+        self.assertEqual([result['jobs_found'] for result in results], [1, 1])
+        saved = {(c.args[0]['job_id'], c.args[1]) for c in self.mock_db_service.add_scraped_job.call_args_list}
+        self.assertEqual(saved, {('job_user1', 1), ('job_user2', 2)})
+        self.assertEqual(found, {1: ['job_user1'], 2: ['job_user2']})
+
+    def test_scrape_jobs_error(self):
         """Test handling errors during job scraping."""
         # Setup mocks
-        mock_pref_service = MagicMock()
-        mock_pref_service_class.return_value = mock_pref_service
+        mock_pref_service = self.mock_pref_service
 
         # Setup preferences
         mock_prefs = {
@@ -344,12 +594,10 @@ class TestScraperService(unittest.TestCase):
         # Verify last_run was still updated despite error
         self.mock_db_service.update_last_run.assert_called_once_with(1)
 
-    @patch('services.scraper_service.PreferenceService')
-    def test_scrape_jobs_no_limit(self, mock_pref_service_class):
+    def test_scrape_jobs_no_limit(self):
         """Test scraping jobs without limit."""
         # Setup mocks
-        mock_pref_service = MagicMock()
-        mock_pref_service_class.return_value = mock_pref_service
+        mock_pref_service = self.mock_pref_service
 
         # Setup preferences
         mock_prefs = {
@@ -383,7 +631,7 @@ class TestScraperService(unittest.TestCase):
         self.mock_scraper.run.assert_called_once()
 
         # Verify the query had a higher default limit
-        query = self.mock_scraper.run.call_args[0][0]
+        query = self.mock_scraper.run.call_args[0][0][0]
         self.assertEqual(query.options.limit, 25)  # Default limit should be 25 now
 
 
@@ -1,10 +1,11 @@
+import asyncio
 import unittest
 from unittest.mock import patch, MagicMock, call
 import datetime
 import bcrypt
 
 from services.user_service import UserService
-from tests.mock_db_manager import MockDatabaseManager
+from tests.mock_db_manager import get_mock_db_manager
 
 
 class TestUserService(unittest.TestCase):
@@ -17,7 +18,8 @@ class TestUserService(unittest.TestCase):
         self.mock_db_manager_class = self.db_manager_patcher.start()
 
         # Mock instance of DatabaseManager
-        self.mock_db_manager = MockDatabaseManager()
+        self.mock_db_manager = get_mock_db_manager()
+        self.mock_db_manager.reset_all_mocks()
         self.mock_db_manager_class.return_value = self.mock_db_manager
 
         # Create a mock for PreferenceService
@@ -28,6 +30,10 @@ class TestUserService(unittest.TestCase):
         self.mock_pref_service = MagicMock()
         self.mock_pref_service_class.return_value = self.mock_pref_service
 
+        # Hash with bcrypt unless a test installs an argon2 hasher
+        self.hasher_patcher = patch('services.user_service._PASSWORD_HASHER', None)
+        self.hasher_patcher.start()
+
         # Create UserService instance with mocked dependencies
         self.user_service = UserService()
 
@@ -35,6 +41,7 @@ class TestUserService(unittest.TestCase):
         """Clean up after each test method."""
         self.db_manager_patcher.stop()
         self.pref_service_patcher.stop()
+        self.hasher_patcher.stop()
 
     @patch('services.user_service.bcrypt')
     def test_create_user(self, mock_bcrypt):
@@ -98,6 +105,48 @@ class TestUserService(unittest.TestCase):
         result = self.user_service.authenticate('nonexistent', 'password123')
         self.assertIsNone(result)
 
+    @patch('services.user_service.bcrypt')
+    def test_create_user_async(self, mock_bcrypt):
+        """Test creating a new user with the password hashed off the event loop."""
+        self.mock_db_manager.get_one.return_value = None  # User doesn't exist
+        self.mock_db_manager.execute_write.return_value = 1  # User ID
+        mock_bcrypt.gensalt.return_value = b'fakesalt'
+        mock_bcrypt.hashpw.return_value = b'fakehashedpassword'
+
+        result = asyncio.run(self.user_service.create_user_async('testuser', 'password123'))
+
+        self.assertEqual(result, 1)
+        mock_bcrypt.hashpw.assert_called_once_with(b'password123', b'fakesalt')
+        self.assertEqual(self.mock_db_manager.execute_write.call_args[0][1][1], 'fakehashedpassword')
+        self.mock_pref_service.setup_default_preferences.assert_called_once_with(1)
+
+        # Test with existing username
+        self.mock_db_manager.get_one.return_value = {'user_id': 1}  # User exists
+        with self.assertRaises(ValueError):
+            asyncio.run(self.user_service.create_user_async('testuser', 'password123'))
+
+    @patch('services.user_service.bcrypt')
+    def test_authenticate_async(self, mock_bcrypt):
+        """Test user authentication with the password verified off the event loop."""
+        mock_user = {
+            'user_id': 1,
+            'username': 'testuser',
+            'password_hash': 'fakehashedpassword'
+        }
+        self.mock_db_manager.get_one.return_value = mock_user
+        mock_bcrypt.checkpw.return_value = True
+
+        result = asyncio.run(self.user_service.authenticate_async('testuser', 'password123'))
+
+        self.assertEqual(result['user_id'], 1)
+        mock_bcrypt.checkpw.assert_called_once_with(b'password123', b'fakehashedpassword')
+        self.mock_db_manager.execute_write.assert_called_once()
+
+        # Test failed authentication - wrong password
+        mock_bcrypt.checkpw.return_value = False
+        result = asyncio.run(self.user_service.authenticate_async('testuser', 'wrongpassword'))
+        self.assertIsNone(result)
+
     def test_get_user_by_id(self):
         """Test getting a user by ID."""
         # Setup mock
@@ -197,6 +246,47 @@ class TestUserService(unittest.TestCase):
         result = self.user_service._verify_password('wrongpassword', 'fakehashedpassword')
         self.assertFalse(result)
 
+    @patch('services.user_service.bcrypt')
+    def test_argon2_hashing(self, mock_bcrypt):
+        """Test hashing and verifying with argon2 when it is installed."""
+        mock_hasher = MagicMock()
+        mock_hasher.hash.return_value = '$argon2id$v=19$fakehash'
+        mock_hasher.verify.return_value = True
+
+        with patch('services.user_service._PASSWORD_HASHER', mock_hasher):
+            password_hash = self.user_service._hash_password('password123')
+            is_valid = self.user_service._verify_password('password123', password_hash)
+
+        self.assertEqual(password_hash, '$argon2id$v=19$fakehash')
+        self.assertTrue(is_valid)
+        mock_hasher.verify.assert_called_once_with('$argon2id$v=19$fakehash', 'password123')
+        mock_bcrypt.hashpw.assert_not_called()
+
+        # Without argon2 installed an argon2 hash cannot be verified
+        self.assertFalse(self.user_service._verify_password('password123', password_hash))
+
+    @patch('services.user_service.bcrypt')
+    def test_authenticate_rehashes_bcrypt_hash(self, mock_bcrypt):
+        """Test that a successful login upgrades a legacy bcrypt hash to argon2."""
+        self.mock_db_manager.get_one.return_value = {
+            'user_id': 1,
+            'username': 'testuser',
+            'password_hash': '$2b$12$legacyhash'
+        }
+        mock_bcrypt.checkpw.return_value = True
+        mock_hasher = MagicMock()
+        mock_hasher.hash.return_value = '$argon2id$v=19$newhash'
+
+        with patch('services.user_service._PASSWORD_HASHER', mock_hasher):
+            result = self.user_service.authenticate('testuser', 'password123')
+
+        self.assertEqual(result['user_id'], 1)
+        mock_hasher.hash.assert_called_once_with('password123')
+        # Password rehash plus last login update
+        self.assertEqual(self.mock_db_manager.execute_write.call_count, 2)
+        self.assertEqual(self.mock_db_manager.execute_write.call_args_list[0][0][1],
+                         ('$argon2id$v=19$newhash', 1))
+
     @patch('services.user_service.bcrypt')
     def test_change_password(self, mock_bcrypt):
         """Test changing a user's password."""
@@ -206,13 +296,12 @@ class TestUserService(unittest.TestCase):
 
         # Setup specific return values for each get_one call
         def get_one_side_effect(query, params):
-            if "SELECT user_id, username" in query:
-                return {'user_id': 1, 'username': 'testuser'}
-            elif "SELECT password_hash" in query:
-                return {'password_hash': 'currenthash'}
+            if "SELECT user_id, password_hash" in query:
+                return {'user_id': 1, 'password_hash': 'currenthash'}
             return None
 
         self.mock_db_manager.get_one.side_effect = get_one_side_effect
+        self.mock_db_manager.execute_returning.return_value = {'user_id': 1}
 
         # Mock password verification (success)
         mock_bcrypt.checkpw.return_value = True
@@ -228,7 +317,14 @@ class TestUserService(unittest.TestCase):
         self.assertTrue(result)
         mock_bcrypt.checkpw.assert_called_once()
         mock_bcrypt.hashpw.assert_called_once()
-        self.mock_db_manager.execute_write.assert_called_once()
+        self.mock_db_manager.get_one.assert_called_once()
+        self.assertEqual(self.mock_db_manager.execute_returning.call_args[0][1],
+                         ('newhashedpassword', 1, 'currenthash'))
+
+        # Test a password changed concurrently after it was verified
+        self.mock_db_manager.execute_returning.return_value = None
+        result = self.user_service.change_password(1, 'currentpassword', 'newpassword')
+        self.assertFalse(result)
 
         # Test with incorrect current password
         # Reset mocks
@@ -254,7 +350,7 @@ class TestUserService(unittest.TestCase):
         # We need a new side effect function
         def nonexistent_user_side_effect(query, params):
             # First query for user by ID returns None
-            if "SELECT user_id, username" in query:
+            if "SELECT user_id, password_hash" in query:
                 return None
             # Should never reach other queries, but just in case
             return None
@@ -13,6 +13,11 @@ import urllib.parse
 import html
 from constants.security import SecurityConstants
 
+# Simple check for common URL pattern, compiled once for validate_url
+_URL_RE = re.compile(
+    r'^(https?:\/\/)?(www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b([-a-zA-Z0-9()@:%_\+.~#?&//=]*)$'
+)
+
 
 def generate_secure_token(length: int = 32) -> str:
     """
@@ -121,8 +126,7 @@ def validate_url(url: str) -> bool:
         return False
 
     # Simple check for common URL pattern
-    url_pattern = r'^(https?:\/\/)?(www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b([-a-zA-Z0-9()@:%_\+.~#?&//=]*)$'
-    if not re.match(url_pattern, url):
+    if not _URL_RE.match(url):
         return False
 
     return True